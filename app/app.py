@@ -8,9 +8,13 @@ if str(ROOT) not in sys.path:
 
 import pandas as pd
 import streamlit as st
-from src.data_models import SpeciesParams, RegionParams, Scenario
-from src.simulator import Simulator
+from src.comparison import downsample, gapped_lines, mean_annual_rate_per_ha, scenario_grid
+from src.data_models import Scenario
+from src.parameter_store import ParameterStore
+from src.response_surface import ResponseSurface
+from src.uncertainty import MonteCarloConfig, ParamDistribution, run_monte_carlo
 import plotly.express as px
+import plotly.graph_objects as go
 import numpy as np
 
 st.set_page_config(page_title="Afforestation Impact Modeling", page_icon="🌳", layout="wide")
@@ -35,22 +39,92 @@ st.markdown(
 ROOT = Path(__file__).resolve().parents[1]
 DATA = ROOT / "data"
 
-@st.cache_data
+MAX_YEARS = 40  # upper bound of the Years slider; the response surface covers 0..MAX_YEARS
+MAX_PLOT_POINTS = 20_000  # comparison lines are LTTB-downsampled beyond this many points in total
+
+
+# Shared across sessions and never copied: the catalogs and surface are read-only
+@st.cache_resource
 def load_data():
-    species_df = pd.read_csv(DATA / "species_params.csv")
-    # Prefer calibrated regions if present
-    regions_path = DATA / "regions_calibrated.csv"
-    regions_source = "regions_calibrated.csv" if regions_path.exists() else "regions.csv"
-    if not regions_path.exists():
-        regions_path = DATA / "regions.csv"
-    regions_df = pd.read_csv(regions_path)
-    species = {r["species"]: SpeciesParams(**r) for r in species_df.to_dict(orient="records")}
-    regions = {r["region"]: RegionParams(**r) for r in regions_df.to_dict(orient="records")}
+    # Prefer calibrated regions if present (overlaid on regions.csv)
+    regions_source = "regions_calibrated.csv" if (DATA / "regions_calibrated.csv").exists() else "regions.csv"
+    store = ParameterStore.load(DATA)
+    species, regions = store.species, store.regions
     # Benchmarks optional
     bench_path = DATA / "stand_benchmarks.csv"
     benchmarks_df = pd.read_csv(bench_path) if bench_path.exists() else None
     return species, regions, regions_source, benchmarks_df
 
+@st.cache_resource
+def load_surface() -> ResponseSurface:
+    species, regions, _, _ = load_data()
+    return ResponseSurface.build(species, regions, horizon=MAX_YEARS)
+
+
+# Keyed by scenario, so every session asking for the same inputs reuses the first session's result
+@st.cache_data(max_entries=4096)
+def scenario_frame(species_name: str, region_name: str, trees: int, years: int) -> pd.DataFrame:
+    sc = Scenario(scenario=f"custom-{species_name}-{region_name}", species=species_name, region=region_name,
+                  trees_planted=trees, years=years)
+    df = load_surface().run(sc).to_dataframe()
+    df["annual_increment_tons"] = df["total_co2_tons"].diff().fillna(df["total_co2_tons"]).clip(lower=0)
+    return df
+
+
+@st.cache_data(max_entries=1024)
+def scenario_figures(species_name: str, region_name: str, trees: int, years: int) -> dict:
+    df = scenario_frame(species_name, region_name, trees, years)
+    fig_total = px.line(df, x="year", y="total_co2_tons", title=None, template="plotly_white")
+    fig_total.update_traces(line=dict(width=3))
+    fig_inc = px.bar(df, x="year", y="annual_increment_tons", title=None, template="plotly_white")
+    fig_pt = px.line(df, x="year", y="co2_kg_per_tree", labels={"co2_kg_per_tree": "kg CO₂ per tree"}, template="plotly_white")
+    fig_pt.update_traces(line=dict(width=3))
+    last = df.iloc[-1]
+    pie_df = pd.DataFrame({"component": ["Above-ground", "Below-ground"],
+                           "kg": [last["above_biomass_kg_per_tree"], last["below_biomass_kg_per_tree"]]})
+    fig_pie = px.pie(pie_df, names="component", values="kg", hole=0.45, template="plotly_white")
+    return {"total": fig_total, "increment": fig_inc, "per_tree": fig_pt, "pie": fig_pie}
+
+
+@st.cache_data(max_entries=256)
+def comparison_frame(species_names: tuple, region_names: tuple, tree_counts: tuple, years: int):
+    scenarios = scenario_grid(species_names, region_names, tree_counts, years)
+    return scenarios, load_surface().run_batch(scenarios)
+
+
+@st.cache_data(max_entries=256)
+def monte_carlo_band(species_name: str, region_name: str, trees: int, years: int, r_spread: float, n_draws: int) -> pd.DataFrame:
+    species, regions, _, _ = load_data()
+    config = MonteCarloConfig(n_draws=n_draws, seed=0, r_growth=ParamDistribution("lognormal", r_spread))
+    sc = Scenario(scenario="band", species=species_name, region=region_name, trees_planted=trees, years=years)
+    return run_monte_carlo(species[species_name], regions[region_name], sc, config).to_dataframe()
+
+
+@st.cache_data(max_entries=256)
+def comparison_chart(species_names: tuple, region_names: tuple, tree_counts: tuple, years: int, metric: str,
+                     color_by: str, bands: tuple, r_spread: float, n_draws: int) -> go.Figure:
+    scenarios, results = comparison_frame(species_names, region_names, tree_counts, years)
+    shown = downsample(results, "year", metric, "scenario", MAX_PLOT_POINTS)
+    group = scenarios.set_index("scenario")[color_by].reindex(shown["scenario"]).to_numpy()
+    fig = go.Figure()
+    # One WebGL trace per colour group, its scenarios separated by gaps, instead of one trace per scenario
+    for i, (name, part) in enumerate(shown.groupby(group, sort=False)):
+        x, y, label = gapped_lines(part, "year", metric, "scenario")
+        fig.add_trace(go.Scattergl(x=x, y=y, text=label, mode="lines", name=str(name), opacity=0.7,
+                                   line=dict(width=1.5, color=GREEN_SEQ[i % len(GREEN_SEQ)]),
+                                   hovertemplate="%{text}<br>Year %{x}: %{y:,.2f}<extra></extra>"))
+    for scenario in bands:
+        row = scenarios.set_index("scenario").loc[scenario]
+        band = monte_carlo_band(row["species"], row["region"], int(row["trees_planted"]), years, r_spread, n_draws)
+        fig.add_trace(go.Scattergl(x=band["year"], y=band[f"{metric}_p90"], mode="lines", line=dict(width=0),
+                                   showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scattergl(x=band["year"], y=band[f"{metric}_p10"], mode="lines", line=dict(width=0),
+                                   fill="tonexty", fillcolor="rgba(46, 160, 67, 0.2)", name=f"P10–P90: {scenario}"))
+    fig.update_layout(template="plotly_white", xaxis_title="Year", yaxis_title=metric, legend_title=color_by,
+                      height=520, margin=dict(t=20))
+    return fig
+
+
 species, regions, regions_source, benchmarks_df = load_data()
 
 st.title("Afforestation Impact Modeling")
@@ -58,10 +132,11 @@ st.title("Afforestation Impact Modeling")
 # Sidebar controls and info
 with st.sidebar:
     st.header("Setup")
+    mode = st.radio("Mode", ["Single scenario", "Compare scenarios"], horizontal=True)
     species_name = st.selectbox("Species", list(species.keys()))
     region_name = st.selectbox("Region", list(regions.keys()))
     trees = st.number_input("Trees planted", min_value=100, max_value=200000, value=1000, step=100)
-    years = st.slider("Years", min_value=5, max_value=40, value=20, step=1)
+    years = st.slider("Years", min_value=5, max_value=MAX_YEARS, value=20, step=1)
     st.divider()
     st.caption(f"Regions source: {regions_source}")
     show_per_ha = st.checkbox("Enable per-hectare metrics", value=False)
@@ -86,13 +161,65 @@ with st.sidebar:
             "climate_factor": rg.climate_factor,
         })
 
+if mode == "Compare scenarios":
+    st.subheader("Compare scenarios")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        cmp_species = st.multiselect("Species", list(species.keys()), default=list(species.keys()))
+    with c2:
+        cmp_regions = st.multiselect("Regions", list(regions.keys()), default=list(regions.keys()))
+    with c3:
+        trees_text = st.text_input("Tree counts (comma-separated)", value="1000, 5000, 20000")
+    try:
+        tree_counts = tuple(sorted({int(t) for t in trees_text.replace(" ", "").split(",") if t}))
+    except ValueError:
+        st.error("Tree counts must be whole numbers separated by commas.")
+        st.stop()
+    if not (cmp_species and cmp_regions and tree_counts):
+        st.info("Pick at least one species, region and tree count.")
+        st.stop()
+
+    scenarios, results = comparison_frame(tuple(cmp_species), tuple(cmp_regions), tree_counts, int(years))
+    c4, c5, c6 = st.columns(3)
+    with c4:
+        metric = st.selectbox("Metric", ["total_co2_tons", "co2_kg_per_tree", "living_trees"])
+    with c5:
+        color_by = st.selectbox("Colour by", ["species", "region", "trees_planted"])
+    with c6:
+        bands = st.multiselect("Monte Carlo P10–P90 bands", scenarios["scenario"].tolist(), max_selections=5)
+    r_spread, n_draws = 0.1, 2000
+    if bands:
+        r_spread = st.slider("Growth-rate spread (lognormal σ)", 0.0, 0.5, 0.1, 0.01)
+    st.caption(f"{len(scenarios)} scenarios, {len(results):,} points"
+               + (f" (downsampled to ~{MAX_PLOT_POINTS:,} for display)" if len(results) > MAX_PLOT_POINTS else ""))
+    st.plotly_chart(comparison_chart(tuple(cmp_species), tuple(cmp_regions), tree_counts, int(years), metric, color_by,
+                                     tuple(bands), r_spread, n_draws), use_container_width=True)
+
+    final = results.groupby("scenario", sort=False)["total_co2_tons"].last().rename("final_co2_tons")
+    table = scenarios.set_index("scenario").join(final)
+    if benchmarks_df is not None and show_per_ha and stems_per_ha:
+        table = table.join(mean_annual_rate_per_ha(results, scenarios, stems_per_ha))
+        st.subheader("Annual tCO₂/ha/yr: scenarios vs stand benchmarks")
+        bench = benchmarks_df[benchmarks_df["region_class"].isin(cmp_regions)]
+        fig_bench = go.Figure()
+        fig_bench.add_trace(go.Box(x=table["region"], y=table["tco2_ha_yr"], name="Modeled", marker_color=GREEN_SEQ[0],
+                                   boxpoints="all", text=table.index, hovertemplate="%{text}: %{y:.2f}<extra></extra>"))
+        fig_bench.add_trace(go.Scattergl(x=bench["region_class"], y=bench["cseq_mgc_ha_yr"].astype(float) * (44.0 / 12.0),
+                                         mode="markers", name="Benchmarks", text=bench["forest_type"],
+                                         marker=dict(symbol="diamond", size=11, color="#0b3d2e"),
+                                         hovertemplate="%{text}: %{y:.2f}<extra></extra>"))
+        fig_bench.update_layout(template="plotly_white", yaxis_title="tCO₂/ha/yr", margin=dict(t=20))
+        st.plotly_chart(fig_bench, use_container_width=True)
+    elif benchmarks_df is not None:
+        st.info("Enable per-hectare metrics in the sidebar to compare the scenarios with stand benchmarks.")
+    st.dataframe(table.sort_values("final_co2_tons", ascending=False), use_container_width=True)
+    st.download_button("Download comparison CSV", data=results.to_csv(index=False), file_name="comparison_yearly.csv", mime="text/csv")
+    st.stop()
+
 sc = Scenario(scenario=f"custom-{species_name}-{region_name}", species=species_name, region=region_name, trees_planted=int(trees), years=int(years))
 
-sim = Simulator(species, regions)
-out = sim.run(sc)
-df = out.to_dataframe()
-# Derived metrics
-df["annual_increment_tons"] = df["total_co2_tons"].diff().fillna(df["total_co2_tons"]).clip(lower=0)
+df = scenario_frame(species_name, region_name, int(trees), int(years))
+figures = scenario_figures(species_name, region_name, int(trees), int(years))
 
 # Metrics row
 c1, c2, c3, c4 = st.columns(4)
@@ -115,27 +242,17 @@ overview_tab, per_tree_tab, per_ha_tab, benchmarks_tab = st.tabs([
 
 with overview_tab:
     st.subheader("Total CO₂ sequestered (tons)")
-    fig_total = px.line(df, x="year", y="total_co2_tons", title=None, template="plotly_white")
-    fig_total.update_traces(line=dict(width=3))
-    st.plotly_chart(fig_total, use_container_width=True)
+    st.plotly_chart(figures["total"], use_container_width=True)
 
     st.subheader("Annual CO₂ increment (tons/year)")
-    fig_inc = px.bar(df, x="year", y="annual_increment_tons", title=None, template="plotly_white")
-    st.plotly_chart(fig_inc, use_container_width=True)
+    st.plotly_chart(figures["increment"], use_container_width=True)
 
 with per_tree_tab:
     st.subheader("Per-tree CO₂ (kg)")
-    fig_pt = px.line(df, x="year", y="co2_kg_per_tree", labels={"co2_kg_per_tree": "kg CO₂ per tree"}, template="plotly_white")
-    fig_pt.update_traces(line=dict(width=3))
-    st.plotly_chart(fig_pt, use_container_width=True)
+    st.plotly_chart(figures["per_tree"], use_container_width=True)
 
     st.subheader("Per-tree biomass breakdown (final year)")
-    last = df.iloc[-1]
-    above = last["above_biomass_kg_per_tree"]
-    below = last["below_biomass_kg_per_tree"]
-    pie_df = pd.DataFrame({"component": ["Above-ground", "Below-ground"], "kg": [above, below]})
-    fig_pie = px.pie(pie_df, names="component", values="kg", hole=0.45, template="plotly_white")
-    st.plotly_chart(fig_pie, use_container_width=True)
+    st.plotly_chart(figures["pie"], use_container_width=True)
 
 with per_ha_tab:
     st.subheader("Per-hectare metrics (requires stems/ha)")
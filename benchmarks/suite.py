@@ -0,0 +1,277 @@
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Optional
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from scripts.generate_synthetic_data import write_synthetic
+from src.analysis import summarize_results
+from src.calibration import build_calibration_report, calibrate_climate_factor
+from src.comparison import downsample, gapped_lines, scenario_grid
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.fitting import fit_growth_parameters
+from src.parameter_store import ParameterStore
+from src.response_surface import ResponseSurface
+from src.simulator import Simulator
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# Absolute slack on top of the relative threshold: sub-millisecond cases jitter by more than 25% between runs
+DEFAULT_MIN_DELTA_S = 0.002
+
+# Input sizes per mode; "quick" is for smoke runs and CI, "full" for the stored baseline
+SIZES = {
+    "quick": {"species": 200, "regions": 1_000, "scenarios": 10_000, "benchmarks": 1_000, "scalar_calibrations": 20},
+    "full": {"species": 1_000, "regions": 10_000, "scenarios": 100_000, "benchmarks": 10_000, "scalar_calibrations": 200},
+}
+
+
+@dataclass
+class BenchResult:
+    name: str
+    median_s: float
+    best_s: float
+    rounds: int
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline_s: Optional[float]
+    current_s: float
+    current_best_s: Optional[float] = None
+
+    @property
+    def ratio(self) -> float:
+        return self.current_s / self.baseline_s if self.baseline_s else float("nan")
+
+    def regressed(self, threshold: float, min_delta_s: float = DEFAULT_MIN_DELTA_S) -> bool:
+        """
+        True when even the fastest current round is slower than the baseline median by more than `threshold`
+        and by more than `min_delta_s`: a noisy neighbour slows some rounds, a real regression slows all of them.
+        """
+        if self.baseline_s is None:
+            return False
+        fastest = self.current_s if self.current_best_s is None else self.current_best_s
+        return fastest > self.baseline_s * (1.0 + threshold) and fastest - self.baseline_s > min_delta_s
+
+
+class Context:
+    """
+    Inputs shared by the benchmarks: synthetic CSVs in a temporary directory, the catalogs loaded from
+    them and the example data from data/.
+    """
+
+    def __init__(self, mode: str, seed: int = 0):
+        self.mode = mode
+        self.sizes = SIZES[mode]
+        self._tmp = tempfile.TemporaryDirectory(prefix="bench-")
+        self.data_dir = Path(self._tmp.name)
+        write_synthetic(self.data_dir, self.sizes["species"], self.sizes["regions"], self.sizes["scenarios"],
+                        self.sizes["benchmarks"], seed)
+        self.store = ParameterStore.load(self.data_dir, overrides=False)
+        self.scenarios = pd.read_csv(self.data_dir / "scenarios.csv")
+        self.benchmarks = pd.read_csv(self.data_dir / "stand_benchmarks.csv")
+        self.example = ParameterStore.load(ROOT / "data", overrides=False)
+
+    def close(self) -> None:
+        self._tmp.cleanup()
+
+
+def _run(ctx: Context, years: int, cache_size: int = 0, steps_per_year: int = 1):
+    sim = Simulator(ctx.example, cache_size=cache_size)
+    sc = Scenario(scenario="bench", species="Teak", region="Tropical", trees_planted=1000, years=years,
+                  steps_per_year=steps_per_year)
+    return lambda: sim.run(sc)
+
+
+def _to_dataframe(ctx: Context):
+    out = Simulator(ctx.example).run(Scenario(scenario="bench", species="Teak", region="Tropical", trees_planted=1000, years=100))
+    return out.to_dataframe
+
+
+def _batch(ctx: Context, n: int, few_pairs: bool = False, steps_per_year: int = 1):
+    if few_pairs:
+        # Portfolio over the example catalog: few (species, region) pairs, served from the curve cache
+        base = pd.read_csv(ROOT / "data" / "scenarios.csv")
+        df = pd.concat([base] * -(-n // len(base)), ignore_index=True).iloc[:n]
+        sim = Simulator(ctx.example)
+    else:
+        df = ctx.scenarios.iloc[:n]
+        sim = Simulator(ctx.store)
+    if steps_per_year != 1:
+        df = df.assign(steps_per_year=steps_per_year)
+    return lambda: sim.run_batch(df)
+
+
+def _rotation(ctx: Context, n: int):
+    # 200-year plantations on a 25-year rotation with two thinnings, pools included
+    df = ctx.scenarios.iloc[:n].assign(years=200, rotation_years=25, thinning_ages="8;15")
+    sim = Simulator(ctx.store)
+    return lambda: sim.run_batch(df)
+
+
+def _summarize(ctx: Context, n: int):
+    yearly = Simulator(ctx.store).run_batch(ctx.scenarios.iloc[:n])
+    return lambda: summarize_results(yearly, stems_per_ha=1000.0, establishment_kg_co2_per_tree=20.0)
+
+
+def _calibrate_scalar(ctx: Context):
+    rows = ctx.benchmarks.iloc[: ctx.sizes["scalar_calibrations"]]
+    sps = [ctx.store.species[s] for s in rows["species_group"]]
+    targets = rows["cseq_mgc_ha_yr"].to_numpy() * 44.0 / 12.0
+    stems = rows["stems_per_ha"].to_numpy(dtype=float)
+
+    def fn():
+        return [calibrate_climate_factor(sp, st, tg) for sp, st, tg in zip(sps, stems, targets)]
+    return fn
+
+
+def _calibration_report(ctx: Context):
+    return lambda: build_calibration_report(ctx.store.species, ctx.benchmarks)
+
+
+def _fit_refit(ctx: Context):
+    # Refit after a data drop: warm-start from a fit to slightly different benchmarks
+    previous = ctx.benchmarks.assign(cseq_mgc_ha_yr=ctx.benchmarks["cseq_mgc_ha_yr"] * 0.97)
+    warm = fit_growth_parameters(ctx.store.species, previous)
+    return lambda: fit_growth_parameters(ctx.store.species, ctx.benchmarks, warm_start=warm)
+
+
+def _load_store(ctx: Context):
+    return lambda: ParameterStore.load(ctx.data_dir, overrides=False)
+
+
+def _load_pydantic(ctx: Context):
+    def fn():
+        species_df = pd.read_csv(ctx.data_dir / "species_params.csv")
+        regions_df = pd.read_csv(ctx.data_dir / "regions.csv")
+        species = {r["species"]: SpeciesParams(**r) for r in species_df.to_dict(orient="records")}
+        regions = {r["region"]: RegionParams(**r) for r in regions_df.to_dict(orient="records")}
+        return species, regions
+    return fn
+
+
+def _app_recompute(ctx: Context):
+    # Mirrors what app/app.py does for a scenario no session has requested yet (its caches miss):
+    # a lookup in the startup response surface, the derived column and the figures
+    try:
+        import plotly.express as px
+    except ImportError:
+        px = None
+    surface = ResponseSurface.build(ctx.example, horizon=40)
+
+    def fn():
+        sc = Scenario(scenario="custom-Teak-Tropical", species="Teak", region="Tropical", trees_planted=1000, years=20)
+        df = surface.run(sc).to_dataframe()
+        df["annual_increment_tons"] = df["total_co2_tons"].diff().fillna(df["total_co2_tons"]).clip(lower=0)
+        if px is not None:
+            px.line(df, x="year", y="total_co2_tons", template="plotly_white")
+            px.bar(df, x="year", y="annual_increment_tons", template="plotly_white")
+            px.line(df, x="year", y="co2_kg_per_tree", template="plotly_white")
+        return df.to_csv(index=False)
+    return fn
+
+
+def _app_compare(ctx: Context):
+    # The comparison view's data path: ~500 trajectories from the surface, reduced for a WebGL chart
+    store = ctx.example
+    surface = ResponseSurface.build(store, horizon=40)
+    tree_counts = range(1_000, 28_000, 1_000)
+
+    def fn():
+        results = surface.run_batch(scenario_grid(list(store.species), list(store.regions), tree_counts, 40))
+        return gapped_lines(downsample(results, "year", "total_co2_tons", "scenario", 10_000), "year", "total_co2_tons", "scenario")
+    return fn
+
+
+def benchmarks(ctx: Context) -> dict[str, Callable[[], Callable[[], object]]]:
+    """
+    Benchmark name -> factory returning the callable to time. Setup work happens in the factory.
+    """
+    n_big = ctx.sizes["scenarios"]
+    big = f"{n_big // 1000}k"
+    return {
+        "run_h10": lambda: _run(ctx, 10),
+        "run_h40": lambda: _run(ctx, 40),
+        "run_h100": lambda: _run(ctx, 100),
+        "run_h40_cached": lambda: _run(ctx, 40, cache_size=1024),
+        "run_h100_monthly": lambda: _run(ctx, 100, steps_per_year=12),
+        "to_dataframe_h100": lambda: _to_dataframe(ctx),
+        "batch_1k": lambda: _batch(ctx, 1_000),
+        "batch_1k_monthly": lambda: _batch(ctx, 1_000, steps_per_year=12),
+        "batch_1k_rotation_h200": lambda: _rotation(ctx, 1_000),
+        f"batch_{big}": lambda: _batch(ctx, n_big),
+        f"batch_{big}_few_pairs": lambda: _batch(ctx, n_big, few_pairs=True),
+        f"summarize_{big}": lambda: _summarize(ctx, n_big),
+        "calibrate_climate_factor_scalar": lambda: _calibrate_scalar(ctx),
+        "build_calibration_report": lambda: _calibration_report(ctx),
+        "fit_joint_refit": lambda: _fit_refit(ctx),
+        "load_parameter_store": lambda: _load_store(ctx),
+        "load_pydantic_dicts": lambda: _load_pydantic(ctx),
+        "app_recompute": lambda: _app_recompute(ctx),
+        "app_compare_500": lambda: _app_compare(ctx),
+    }
+
+
+def time_callable(name: str, fn: Callable[[], object], min_time: float = 0.5, min_rounds: int = 5,
+                  max_rounds: int = 200) -> BenchResult:
+    fn()  # warm-up: imports, caches, allocator
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_rounds or (time.perf_counter() - start < min_time and len(times) < max_rounds):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return BenchResult(name, statistics.median(times), min(times), len(times))
+
+
+def run_suite(mode: str = "quick", only: Optional[list[str]] = None, min_time: float = 0.5,
+              progress: Optional[Callable[[BenchResult], None]] = None) -> list[BenchResult]:
+    ctx = Context(mode)
+    try:
+        results = []
+        for name, factory in benchmarks(ctx).items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            result = time_callable(name, factory(), min_time=min_time)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+        return results
+    finally:
+        ctx.close()
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_baseline(results: list[BenchResult], mode: str, path: Path = BASELINE_PATH) -> None:
+    """
+    Store `results` as the baseline for `mode`, keeping other modes' baselines and merging by name.
+    """
+    data = load_baseline(path)
+    entry = data.get(mode, {"results": {}})
+    entry["machine"] = {"python": sys.version.split()[0], "platform": platform.platform(), "processor": platform.machine()}
+    entry["results"].update({r.name: asdict(r) for r in results})
+    data[mode] = entry
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare(results: list[BenchResult], baseline: dict, mode: str) -> list[Comparison]:
+    stored = baseline.get(mode, {}).get("results", {})
+    return [Comparison(r.name, stored.get(r.name, {}).get("median_s"), r.median_s, r.best_s) for r in results]
+
+
+def regressions(comparisons: list[Comparison], threshold: float = DEFAULT_THRESHOLD,
+                min_delta_s: float = DEFAULT_MIN_DELTA_S) -> list[Comparison]:
+    return [c for c in comparisons if c.regressed(threshold, min_delta_s)]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from src.parameter_store import ParameterStore
+from src.simulator import Simulator
+from src.parallel import run_parallel
+
+DATA = ROOT / "data"
+
+parser = argparse.ArgumentParser(description="Measure run_parallel throughput as the worker count grows.")
+parser.add_argument("--scenarios", type=int, default=200_000, help="portfolio size (rows of scenarios.csv repeated)")
+parser.add_argument("--shard-size", type=int, default=10_000)
+parser.add_argument("--workers", type=int, nargs="*", default=None, help="worker counts to try (default: 1, 2, 4, ... up to cpu count)")
+args = parser.parse_args()
+
+scenarios_df = pd.read_csv(DATA / "scenarios.csv")
+sim = Simulator(ParameterStore.load(DATA, overrides=False))
+
+reps = -(-args.scenarios // len(scenarios_df))
+portfolio = pd.concat([scenarios_df] * reps, ignore_index=True).iloc[: args.scenarios]
+portfolio["scenario"] = portfolio["scenario"] + "-" + portfolio.index.astype(str)
+
+cpus = os.cpu_count() or 1
+workers = args.workers or sorted({min(2 ** k, cpus) for k in range(cpus.bit_length() + 1)})
+
+print(f"{len(portfolio)} scenarios, shard size {args.shard_size}, {cpus} CPUs")
+print(f"{'workers':>8} {'seconds':>9} {'scenarios/s':>12} {'speedup':>8}")
+baseline = None
+for n in workers:
+    result = run_parallel(sim, portfolio, n_workers=n, shard_size=args.shard_size)
+    rate = len(portfolio) / result.seconds
+    baseline = baseline or rate
+    print(f"{n:>8} {result.seconds:>9.2f} {rate:>12.0f} {rate / baseline:>7.2f}x")
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.parameter_store import ParameterStore
+from src.service import request_json
+
+parser = argparse.ArgumentParser(description="Closed-loop load test of scripts/serve.py on localhost; reports client-side p50/p95/p99 latency and throughput.")
+parser.add_argument("--connect", metavar="HOST:PORT", help="use a running server instead of starting one")
+parser.add_argument("--endpoint", choices=["simulate", "calibrate", "year_to_reach", "trees_needed", "mixed"], default="simulate")
+parser.add_argument("--requests", type=int, default=5000)
+parser.add_argument("--concurrency", type=int, default=64, help="simultaneous clients, one keep-alive connection each")
+parser.add_argument("--years", type=int, default=40, help="horizon of simulate requests")
+parser.add_argument("--max-batch", type=int, default=256, help="passed to the spawned server")
+parser.add_argument("--max-wait-ms", type=float, default=2.0, help="passed to the spawned server")
+parser.add_argument("--max-queue", type=int, default=10_000, help="passed to the spawned server")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--json", type=Path, help="also write the report here")
+args = parser.parse_args()
+
+store = ParameterStore.load(ROOT / "data")
+species, regions = list(store.species), list(store.regions)
+rng = np.random.default_rng(args.seed)
+PATHS = {"simulate": "/simulate", "calibrate": "/calibrate",
+         "year_to_reach": "/query/year_to_reach", "trees_needed": "/query/trees_needed"}
+
+
+def make_request(i: int) -> tuple[str, dict]:
+    kind = args.endpoint if args.endpoint != "mixed" else list(PATHS)[i % len(PATHS)]
+    sp, rg = species[rng.integers(len(species))], regions[rng.integers(len(regions))]
+    trees = int(rng.integers(100, 5000))
+    if kind == "simulate":
+        body = {"scenario": f"load-{i}", "species": sp, "region": rg, "trees_planted": trees, "years": args.years,
+                "columns": ["year", "total_co2_tons"]}
+    elif kind == "calibrate":
+        body = {"species": sp, "stems_per_ha": 1100.0, "target_cseq_tco2_ha_yr": float(rng.uniform(2, 12))}
+    elif kind == "year_to_reach":
+        body = {"species": sp, "region": rg, "trees_planted": trees, "target_tco2": float(rng.uniform(10, 500))}
+    else:
+        body = {"species": sp, "region": rg, "target_tco2": float(rng.uniform(10, 500)), "year": int(rng.integers(5, 40))}
+    return PATHS[kind], body
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            status, _ = await request_json(reader, writer, "GET", "/health")
+            writer.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"server on {host}:{port} did not become ready")
+        await asyncio.sleep(0.1)
+
+
+async def client(host: str, port: int, work: list, latencies: list, statuses: Counter) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while work:
+            path, body = work.pop()
+            start = time.perf_counter()
+            status, _ = await request_json(reader, writer, "POST", path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def main() -> dict:
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen([sys.executable, str(ROOT / "scripts" / "serve.py"), "--port", str(port),
+                                   "--max-batch", str(args.max_batch), "--max-wait-ms", str(args.max_wait_ms),
+                                   "--max-queue", str(args.max_queue)], stdout=subprocess.DEVNULL)
+    try:
+        await wait_ready(host, port)
+        work = [make_request(i) for i in range(args.requests)][::-1]
+        latencies, statuses = [], Counter()
+        start = time.perf_counter()
+        await asyncio.gather(*(client(host, port, work, latencies, statuses) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        reader, writer = await asyncio.open_connection(host, port)
+        _, metrics = await request_json(reader, writer, "GET", "/metrics")
+        writer.close()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    lat_ms = np.asarray(latencies) * 1e3
+    p50, p95, p99 = np.percentile(lat_ms, [50, 95, 99])
+    return {
+        "endpoint": args.endpoint, "requests": len(latencies), "concurrency": args.concurrency,
+        "seconds": elapsed, "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": lat_ms.max(),
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "server": metrics,
+    }
+
+
+report = asyncio.run(main())
+print(f"{report['requests']} {report['endpoint']} requests, {report['concurrency']} clients: "
+      f"{report['throughput_rps']:,.0f} req/s in {report['seconds']:.2f}s")
+print(f"client latency  p50 {report['p50_ms']:.2f} ms  p95 {report['p95_ms']:.2f} ms  "
+      f"p99 {report['p99_ms']:.2f} ms  max {report['max_ms']:.2f} ms")
+print(f"status codes    {report['status']}")
+for name, b in report["server"]["batchers"].items():
+    if b["batches"]:
+        print(f"server {name:<14} {b['batches']} batches, mean size {b['mean_batch']:.1f}, max {b['max_batch']}, "
+              f"rejected {b['rejected']}, worker busy {b['utilization']:.0%}")
+if args.json:
+    args.json.write_text(json.dumps(report, indent=1, default=float) + "\n")
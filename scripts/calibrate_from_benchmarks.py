@@ -1,4 +1,5 @@
 from __future__ import annotations
+import argparse
 import sys
 from pathlib import Path
 
@@ -7,12 +8,17 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 import pandas as pd
-from src.data_models import SpeciesParams
+from src.instrumentation import add_profile_args, finish_profile, profile_from_args
+from src.parameter_store import ParameterStore
 from src.calibration import build_calibration_report
 
 DATA = ROOT / "data"
 
-species_df = pd.read_csv(DATA / "species_params.csv")
+parser = argparse.ArgumentParser(description="Compare modeled sequestration with data/stand_benchmarks.csv per benchmark row.")
+add_profile_args(parser)
+args = parser.parse_args()
+prof = profile_from_args(args)
+
 bench_df = pd.read_csv(DATA / "stand_benchmarks.csv")
 
 # Map species groups to existing keys if possible; here we assume names match or are simple synonyms
@@ -24,8 +30,7 @@ alias = {
 def normalize_species(s: str) -> str:
     return alias.get(s, s)
 
-species_df["species"] = species_df["species"].astype(str)
-species_map = {row["species"]: SpeciesParams(**row) for row in species_df.to_dict(orient="records")}
+species_map = ParameterStore.load(DATA, overrides=False).species
 bench_df["species_group"] = bench_df["species_group"].map(normalize_species)
 
 report = build_calibration_report(species_map, bench_df, age_years=10)
@@ -36,3 +41,4 @@ report_path = OUT / "calibration_report.csv"
 report.to_csv(report_path, index=False)
 print(f"Wrote calibration report to {report_path}")
 print(report)
+finish_profile(prof, args)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from src.instrumentation import add_profile_args, finish_profile, profile_from_args
+from src.parameter_store import ParameterStore
+from src.calibration import DEFAULT_REGION_REF_SPECIES
+from src.fitting import FitPrior, JointFit, fit_growth_parameters
+
+DATA = ROOT / "data"
+OUT = ROOT / "outputs"
+
+parser = argparse.ArgumentParser(description="Jointly fit species growth parameters and region factors to stand benchmarks.")
+parser.add_argument("--data", type=Path, default=DATA, help="directory laid out like data/")
+parser.add_argument("--out", type=Path, default=OUT)
+parser.add_argument("--age-years", type=float, default=10, help="stand age for benchmark rows without an age_years column")
+parser.add_argument("--prior-weight", type=float, default=1.0, help="strength of the pull toward the catalog values")
+parser.add_argument("--warm-start", type=Path, help="a previous joint_fit.json to start from")
+add_profile_args(parser)
+args = parser.parse_args()
+prof = profile_from_args(args)
+
+bench_df = pd.read_csv(args.data / "stand_benchmarks.csv")
+species_df = pd.read_csv(args.data / "species_params.csv")
+species_map = ParameterStore.load(args.data, overrides=False).species
+warm = JointFit.load(args.warm_start) if args.warm_start else None
+
+fit = fit_growth_parameters(species_map, bench_df, DEFAULT_REGION_REF_SPECIES, age_years=args.age_years,
+                            prior=FitPrior(weight=args.prior_weight), warm_start=warm)
+print(fit.species)
+print(fit.regions)
+print(f"cost {fit.cost:.4g} after {fit.nfev} evaluations ({'converged' if fit.success else 'not converged'})")
+
+args.out.mkdir(parents=True, exist_ok=True)
+fit.save(args.out / "joint_fit.json")
+fit.species_frame(species_df).to_csv(args.out / "species_params_fitted.csv", index=False)
+fit.region_overrides().to_csv(args.out / "region_fit_overrides.csv", index=False)
+fit.residuals.to_csv(args.out / "joint_fit_residuals.csv", index=False)
+print(f"Wrote joint_fit.json, species_params_fitted.csv, region_fit_overrides.csv and joint_fit_residuals.csv to {args.out}")
+finish_profile(prof, args)
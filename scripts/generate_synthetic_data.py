@@ -1,9 +1,10 @@
 from __future__ import annotations
+import argparse
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 # Synthetic but plausible species parameters derived from literature ranges
 species = [
@@ -89,8 +90,99 @@ scenarios = [
     {"scenario": "S-1K-Oak-Temp", "species": "Oak", "region": "Temperate", "trees_planted": 1000, "years": 20},
 ]
 
-pd.DataFrame(species).to_csv(DATA_DIR / "species_params.csv", index=False)
-pd.DataFrame(regions).to_csv(DATA_DIR / "regions.csv", index=False)
-pd.DataFrame(scenarios).to_csv(DATA_DIR / "scenarios.csv", index=False)
 
-print(f"Wrote species, regions, scenarios to {DATA_DIR}")
+
+# Large synthetic catalogs for benchmarks and load tests. Parameters are drawn around the ranges of the
+# literature species above, so the tables exercise the same code paths at much larger sizes.
+
+def synthetic_species(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    models = rng.choice(["logistic", "gompertz", "chapman_richards"], size=n, p=[0.7, 0.15, 0.15])
+    return pd.DataFrame({
+        "species": [f"SP{i:06d}" for i in range(n)],
+        "K_biomass_kg": rng.uniform(250.0, 650.0, n).round(1),
+        "r_growth": rng.uniform(0.18, 0.40, n).round(3),
+        "t0_inflection": rng.uniform(5.0, 11.0, n).round(1),
+        "carbon_fraction": rng.uniform(0.45, 0.50, n).round(3),
+        "root_shoot_ratio": rng.uniform(0.20, 0.40, n).round(3),
+        "growth_model": models,
+    })
+
+
+def synthetic_regions(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    return pd.DataFrame({
+        "region": [f"RG{i:06d}" for i in range(n)],
+        "survival_rate_year1": rng.uniform(0.65, 0.92, n).round(3),
+        "annual_mortality_rate": rng.uniform(0.01, 0.07, n).round(4),
+        "climate_factor": rng.uniform(0.6, 1.3, n).round(3),
+    })
+
+
+def synthetic_scenarios(n: int, species_names, region_names, rng: np.random.Generator,
+                        years: tuple[int, int] = (10, 40)) -> pd.DataFrame:
+    return pd.DataFrame({
+        "scenario": [f"SC{i:07d}" for i in range(n)],
+        "species": rng.choice(np.asarray(species_names, dtype=object), n),
+        "region": rng.choice(np.asarray(region_names, dtype=object), n),
+        "trees_planted": rng.integers(100, 200_000, n),
+        "years": rng.integers(years[0], years[1] + 1, n),
+    })
+
+
+def synthetic_benchmarks(n: int, species_names, region_classes, rng: np.random.Generator) -> pd.DataFrame:
+    stems = rng.integers(300, 2000, n)
+    cseq = rng.uniform(1.0, 8.0, n).round(2)
+    return pd.DataFrame({
+        "forest_type": [f"Synthetic stand {i}" for i in range(n)],
+        "location": "Synthetic",
+        "altitude_m": rng.integers(100, 2500, n),
+        "stems_per_ha": stems,
+        "biomass_mg_ha": (cseq * rng.uniform(40, 80, n)).round(2),
+        "c_stock_mgc_ha": (cseq * rng.uniform(20, 40, n)).round(2),
+        "cseq_mgc_ha_yr": cseq,
+        "species_group": rng.choice(np.asarray(species_names, dtype=object), n),
+        "region_class": rng.choice(np.asarray(region_classes, dtype=object), n),
+        "reference": "synthetic",
+    })
+
+
+def write_synthetic(out_dir: Path, n_species: int, n_regions: int, n_scenarios: int, n_benchmarks: int,
+                    seed: int = 0) -> None:
+    """
+    Write species_params.csv, regions.csv, scenarios.csv and stand_benchmarks.csv of the given sizes to
+    `out_dir`, laid out like data/ so every loader works on it unchanged.
+    """
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sp = synthetic_species(n_species, rng)
+    rg = synthetic_regions(n_regions, rng)
+    sp.to_csv(out_dir / "species_params.csv", index=False)
+    rg.to_csv(out_dir / "regions.csv", index=False)
+    synthetic_scenarios(n_scenarios, sp["species"], rg["region"], rng).to_csv(out_dir / "scenarios.csv", index=False)
+    synthetic_benchmarks(n_benchmarks, sp["species"], rg["region"], rng).to_csv(out_dir / "stand_benchmarks.csv", index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write the example data, or large synthetic tables with --out.")
+    parser.add_argument("--out", type=Path, default=None, help="write synthetic tables here instead of the example data")
+    parser.add_argument("--species", type=int, default=1_000)
+    parser.add_argument("--regions", type=int, default=10_000)
+    parser.add_argument("--scenarios", type=int, default=100_000)
+    parser.add_argument("--benchmarks", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.out is not None:
+        write_synthetic(args.out, args.species, args.regions, args.scenarios, args.benchmarks, args.seed)
+        print(f"Wrote synthetic species, regions, scenarios, benchmarks to {args.out}")
+        return
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(species).to_csv(DATA_DIR / "species_params.csv", index=False)
+    pd.DataFrame(regions).to_csv(DATA_DIR / "regions.csv", index=False)
+    pd.DataFrame(scenarios).to_csv(DATA_DIR / "scenarios.csv", index=False)
+
+    print(f"Wrote species, regions, scenarios to {DATA_DIR}")
+
+
+if __name__ == "__main__":
+    main()
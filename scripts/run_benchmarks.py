@@ -0,0 +1,50 @@
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.suite import BASELINE_PATH, DEFAULT_MIN_DELTA_S, DEFAULT_THRESHOLD, compare, load_baseline, regressions, run_suite, save_baseline
+
+parser = argparse.ArgumentParser(description="Time the simulator, calibration and I/O hot paths and compare against stored baselines.")
+parser.add_argument("--mode", choices=["quick", "full"], default="quick", help="input sizes (full: 100k-scenario portfolios)")
+parser.add_argument("--only", nargs="*", default=None, help="run benchmarks whose name contains any of these")
+parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each benchmark")
+parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_THRESHOLD", DEFAULT_THRESHOLD)),
+                    help="allowed slowdown vs baseline as a fraction (default 0.25, or $BENCH_THRESHOLD)")
+parser.add_argument("--min-delta-ms", type=float,
+                    default=float(os.environ.get("BENCH_MIN_DELTA_MS", DEFAULT_MIN_DELTA_S * 1e3)),
+                    help="slowdowns smaller than this many milliseconds never count as regressions (default 2, or $BENCH_MIN_DELTA_MS)")
+parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+args = parser.parse_args()
+
+print(f"{'benchmark':<34} {'median':>10} {'best':>10} {'rounds':>7} {'baseline':>10} {'ratio':>7}")
+
+
+def report(result) -> None:
+    cmp = compare([result], load_baseline(args.baseline), args.mode)[0]
+    base = f"{cmp.baseline_s * 1e3:8.2f}ms" if cmp.baseline_s else f"{'-':>10}"
+    ratio = f"{cmp.ratio:6.2f}x" if cmp.baseline_s else f"{'-':>7}"
+    flag = "  REGRESSED" if cmp.regressed(args.threshold, args.min_delta_ms / 1e3) else ""
+    print(f"{result.name:<34} {result.median_s * 1e3:8.2f}ms {result.best_s * 1e3:8.2f}ms {result.rounds:>7} {base} {ratio}{flag}")
+
+
+results = run_suite(args.mode, only=args.only, min_time=args.min_time, progress=report)
+
+if args.save_baseline:
+    save_baseline(results, args.mode, args.baseline)
+    print(f"Saved {args.mode} baseline to {args.baseline}")
+    sys.exit(0)
+
+bad = regressions(compare(results, load_baseline(args.baseline), args.mode), args.threshold, args.min_delta_ms / 1e3)
+if bad:
+    print(f"{len(bad)} benchmark(s) slower than baseline by more than {args.threshold:.0%}:")
+    for c in bad:
+        print(f"  {c.name}: {c.baseline_s * 1e3:.2f}ms -> {c.current_s * 1e3:.2f}ms ({c.ratio:.2f}x)")
+    sys.exit(1)
+print("No regressions")
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import argparse
 import sys
 from pathlib import Path
 
@@ -7,33 +8,49 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 import pandas as pd
-from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.data_models import Scenario
+from src.instrumentation import add_profile_args, finish_profile, profile_from_args, stage
+from src.parameter_store import ParameterStore
 from src.simulator import Simulator
-from src.analysis import summarize_simulation
-from src.plotting import plot_total_co2
+from src.analysis import summarize_results
 
 DATA = ROOT / "data"
 OUT = ROOT / "outputs"
 OUT.mkdir(exist_ok=True)
 
-species_df = pd.read_csv(DATA / "species_params.csv")
-regions_df = pd.read_csv(DATA / "regions.csv")
+parser = argparse.ArgumentParser(description="Run every scenario in data/scenarios.csv and write yearly tables, summaries and charts.")
+parser.add_argument("--no-plots", action="store_true", help="skip the PNG charts (and the matplotlib import)")
+parser.add_argument("--stems-per-ha", type=float, default=None,
+                    help="planting density for per-hectare metrics (none without it)")
+parser.add_argument("--establishment-kg-co2", type=float, default=None, help="establishment emissions per tree, for payback years")
+add_profile_args(parser)
+args = parser.parse_args()
+prof = profile_from_args(args)
+
 scenarios_df = pd.read_csv(DATA / "scenarios.csv")
 
-species = {r["species"]: SpeciesParams(**r) for r in species_df.to_dict(orient="records")}
-regions = {r["region"]: RegionParams(**r) for r in regions_df.to_dict(orient="records")}
+sim = Simulator(ParameterStore.load(DATA, overrides=False))
+renderer = None
+if not args.no_plots:
+    from src.plotting import FigureRenderer
 
-sim = Simulator(species, regions)
+    renderer = FigureRenderer("total_co2")
 
+frames = []
 for row in scenarios_df.to_dict(orient="records"):
-    sc = Scenario(**row)
+    sc = Scenario.from_row(row)
     out = sim.run(sc)
     df = out.to_dataframe()
-    df.to_csv(OUT / f"{sc.scenario}_yearly.csv", index=False)
-    fig = plot_total_co2(df, title=f"Total CO₂ (tons): {sc.scenario}")
-    fig.savefig(OUT / f"{sc.scenario}_total_co2.png", dpi=150, bbox_inches="tight")
-    sm = summarize_simulation(df)
-    sm.to_csv(OUT / f"{sc.scenario}_summary.csv", index=False)
-    print(sm.to_string(index=False))
+    with stage("write.csv"):
+        df.to_csv(OUT / f"{sc.scenario}_yearly.csv", index=False)
+    if renderer is not None:
+        renderer.render(df, OUT / f"{sc.scenario}_total_co2.png", title=f"Total CO₂ (tons): {sc.scenario}")
+    frames.append(df.assign(scenario=sc.scenario))
+
+summary = summarize_results(pd.concat(frames, ignore_index=True), stems_per_ha=args.stems_per_ha,
+                            establishment_kg_co2_per_tree=args.establishment_kg_co2)
+summary.to_csv(OUT / "summary.csv", index=False)
+print(summary.sort_values("rank_final_co2").to_string(index=False))
 
 print(f"Results written to {OUT}")
+finish_profile(prof, args)
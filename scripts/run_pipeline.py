@@ -0,0 +1,31 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.instrumentation import add_profile_args, finish_profile, profile_from_args
+from src.pipeline import STAGES, Pipeline
+
+parser = argparse.ArgumentParser(description="Bring calibration, simulations and summaries up to date, redoing only work whose inputs changed.")
+parser.add_argument("--data", type=Path, default=ROOT / "data")
+parser.add_argument("--out", type=Path, default=ROOT / "outputs" / "pipeline")
+parser.add_argument("--until", choices=list(STAGES), action="append", help="run only this stage and its upstream stages (repeatable)")
+parser.add_argument("--force", action="store_true", help="ignore stored hashes and redo everything")
+parser.add_argument("--age-years", type=int, default=10, help="stand age the benchmark rates refer to")
+parser.add_argument("--stems-per-ha", type=float, default=None,
+                    help="planting density for per-hectare metrics (none without it)")
+parser.add_argument("--establishment-kg-co2", type=float, default=None, help="establishment emissions per tree, for payback years")
+add_profile_args(parser)
+args = parser.parse_args()
+prof = profile_from_args(args)
+
+pipeline = Pipeline(args.data, args.out, age_years=args.age_years, stems_per_ha=args.stems_per_ha,
+                    establishment_kg_co2_per_tree=args.establishment_kg_co2)
+for report in pipeline.run(args.until, force=args.force):
+    print(report)
+print(f"Results written to {args.out}")
+finish_profile(prof, args)
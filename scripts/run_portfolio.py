@@ -0,0 +1,45 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from src.instrumentation import add_profile_args, finish_profile, profile_from_args
+from src.parameter_store import ParameterStore
+from src.simulator import Simulator
+from src.streaming import run_streaming
+
+DATA = ROOT / "data"
+
+parser = argparse.ArgumentParser(description="Stream a scenarios CSV through the simulator into partitioned output files.")
+parser.add_argument("--scenarios", type=Path, default=DATA / "scenarios.csv")
+parser.add_argument("--regions", type=Path, default=DATA / "regions.csv", help="e.g. data/regions_calibrated.csv")
+parser.add_argument("--out", type=Path, default=ROOT / "outputs" / "portfolio")
+parser.add_argument("--chunksize", type=int, default=50_000, help="scenario rows held in memory at once")
+parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+parser.add_argument("--summary-only", action="store_true", help="skip the yearly table")
+parser.add_argument("--stems-per-ha", type=float, default=None,
+                    help="planting density for per-hectare metrics (none without it)")
+parser.add_argument("--rank", action="store_true",
+                    help="also write rankings/ (holds three summary columns of every scenario in memory)")
+parser.add_argument("--establishment-kg-co2", type=float, default=None, help="establishment emissions per tree, for payback years")
+add_profile_args(parser)
+args = parser.parse_args()
+prof = profile_from_args(args)
+
+sim = Simulator(ParameterStore.from_frames(pd.read_csv(DATA / "species_params.csv"), pd.read_csv(args.regions)))
+
+
+def report(i: int, counts: dict[str, int]) -> None:
+    print(f"chunk {i}: {counts['scenarios']} scenarios, {counts['yearly']} yearly rows")
+
+
+counts = run_streaming(sim, args.scenarios, args.out, chunksize=args.chunksize, fmt=args.format,
+                       write_yearly=not args.summary_only, progress=report, stems_per_ha=args.stems_per_ha,
+                       establishment_kg_co2_per_tree=args.establishment_kg_co2, rank=args.rank)
+print(f"Results written to {args.out}")
+finish_profile(prof, args)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.parameter_store import ParameterStore
+from src.service import SimulationServer, SimulationService
+
+parser = argparse.ArgumentParser(description="Serve scenario, calibration and query requests over local HTTP with micro-batching.")
+parser.add_argument("--data", type=Path, default=ROOT / "data")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8765)
+parser.add_argument("--max-batch", type=int, default=256, help="largest batch handed to the vectorized path")
+parser.add_argument("--max-wait-ms", type=float, default=2.0, help="how long a batch waits for more requests after its first")
+parser.add_argument("--max-queue", type=int, default=10_000, help="queued requests per endpoint before answering 503")
+args = parser.parse_args()
+
+
+async def main() -> None:
+    service = SimulationService(ParameterStore.load(args.data), max_batch=args.max_batch,
+                                max_wait_s=args.max_wait_ms / 1000.0, max_queue=args.max_queue)
+    server = SimulationServer(service, args.host, args.port)
+    port = await server.start()
+    print(f"Serving on http://{args.host}:{port} (GET /metrics for latency and batching stats)", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    pass
@@ -1,7 +1,24 @@
 __all__ = [
     "data_models",
     "growth_models",
+    "harvest",
+    "instrumentation",
+    "parameter_store",
     "simulator",
+    "response_surface",
+    "calibration",
+    "fitting",
+    "uncertainty",
+    "curve_cache",
+    "queries",
+    "sensitivity",
+    "optimizer",
+    "parallel",
+    "result_store",
+    "streaming",
+    "pipeline",
+    "service",
     "analysis",
+    "comparison",
     "plotting",
 ]
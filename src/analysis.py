@@ -1,14 +1,185 @@
 from __future__ import annotations
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+from .instrumentation import instrumented
+
+# Columns of summarize_simulation / summarize_batch, kept for existing callers
+SUMMARY_COLUMNS = [
+    "years",
+    "final_living_trees",
+    "final_total_co2_tons",
+    "avg_co2_tons_per_year",
+    "peak_yearly_increment_tons",
+]
+
 
 def summarize_simulation(df: pd.DataFrame) -> pd.DataFrame:
-    last = df.sort_values("year").iloc[-1]
-    summary = {
-        "years": int(last["year"]),
-        "final_living_trees": float(last["living_trees"]),
-        "final_total_co2_tons": float(last["total_co2_tons"]),
-        "avg_co2_tons_per_year": float(df["total_co2_tons"].diff().fillna(df["total_co2_tons"]).mean()),
-        "peak_yearly_increment_tons": float(df["total_co2_tons"].diff().max()),
-    }
-    return pd.DataFrame([summary])
+    """
+    One-row summary of a single scenario's yearly table. For many scenarios use summarize_results.
+    """
+    summary = summarize_results(df.assign(_scenario=0), by="_scenario", rank=False)
+    return summary[SUMMARY_COLUMNS].reset_index(drop=True)
+
+
+def summarize_batch(df: pd.DataFrame, by: str = "scenario") -> pd.DataFrame:
+    """
+    summarize_simulation for every scenario of a long-format table (e.g. Simulator.run_batch output)
+    in one grouped pass. Returns one row per scenario, in order of first appearance.
+    """
+    return summarize_results(df, by=by, rank=False)[[by] + SUMMARY_COLUMNS]
+
+
+def _grouped_in_year_order(codes: np.ndarray, year: np.ndarray) -> bool:
+    same = codes[1:] == codes[:-1]
+    # factorize codes run 0..k-1, so rows are contiguous per key exactly when there are k runs
+    return int((~same).sum()) + 1 == int(codes.max()) + 1 and bool((np.diff(year)[same] > 0).all())
+
+
+@instrumented("analysis.summarize")
+def summarize_results(df: pd.DataFrame, by: str = "scenario", stems_per_ha: Optional[float] = None,
+                      establishment_kg_co2_per_tree: Optional[float] = None, rank: bool = True) -> pd.DataFrame:
+    """
+    Per-scenario metrics for a long-format result table (columns `by`, year, living_trees, total_co2_tons,
+    as Simulator.run_batch returns them), one row per scenario in order of first appearance.
+
+    Besides SUMMARY_COLUMNS:
+    - trees_planted: living trees in the first year
+    - peak_increment_year: year of the largest yearly increment (-1 with a single year)
+    - final_tco2_per_ha, avg_tco2_per_ha_per_year: with stems_per_ha, over trees_planted / stems_per_ha hectares
+    - payback_year: with establishment_kg_co2_per_tree, the first year the total repays the planting's
+      establishment emissions (-1 if it never does within the horizon)
+    - rank_final_co2, rank_avg_rate: 1 for the largest final total / average annual rate (per ha if available)
+
+    On a sub-annual grid (a t_years column) only the whole-year rows are used, so the metrics stay per year
+    and match the annual run at the same horizon.
+
+    Rows are reduced by segment (np.*.reduceat) rather than with groupby, and are only sorted when a
+    scenario's rows are not already contiguous and in year order.
+    """
+    if "t_years" in df:
+        t = df["t_years"].to_numpy(dtype=float)
+        whole = np.abs(t - np.round(t)) < 1e-9
+        if not whole.all():
+            df = df[whole]
+    codes, uniques = pd.factorize(df[by], sort=False)
+    year = df["year"].to_numpy(dtype=np.int64)
+    total = df["total_co2_tons"].to_numpy(dtype=float)
+    living = df["living_trees"].to_numpy(dtype=float)
+    n = len(codes)
+    if n == 0:
+        codes = year = np.empty(0, dtype=np.int64)
+        starts = lasts = segment = codes
+    else:
+        if not _grouped_in_year_order(codes, year):
+            order = np.lexsort((year, codes))
+            codes, year, total, living = codes[order], year[order], total[order], living[order]
+        new = np.r_[True, codes[1:] != codes[:-1]]
+        starts = np.flatnonzero(new)
+        lasts = np.r_[starts[1:], n] - 1
+        segment = np.cumsum(new) - 1
+
+    def first_row(mask: np.ndarray) -> np.ndarray:
+        # Index of the first True row in each segment, n where there is none
+        return np.minimum.reduceat(np.where(mask, np.arange(n), n), starts) if n else starts
+
+    increment = np.r_[-np.inf, np.diff(total)]
+    increment[starts] = -np.inf
+    peak = np.maximum.reduceat(increment, starts) if n else total[starts]
+    single = lasts == starts
+    n_rows = lasts - starts + 1
+
+    summary = pd.DataFrame({
+        by: uniques.take(codes[starts]),
+        "years": year[lasts],
+        "final_living_trees": living[lasts],
+        "final_total_co2_tons": total[lasts],
+        # Mean yearly increment with the first year counted in full, i.e. the final total spread over all rows
+        "avg_co2_tons_per_year": total[lasts] / n_rows,
+        "peak_yearly_increment_tons": np.where(single, np.nan, peak),
+        "trees_planted": living[starts],
+        "peak_increment_year": np.where(single, -1, year[np.minimum(first_row(increment == peak[segment]), lasts)]),
+    })
+    if stems_per_ha is not None:
+        area_ha = np.maximum(living[starts] / stems_per_ha, 1e-9)
+        summary["final_tco2_per_ha"] = total[lasts] / area_ha
+        summary["avg_tco2_per_ha_per_year"] = total[lasts] / n_rows / area_ha
+    if establishment_kg_co2_per_tree is not None:
+        target = living[starts] * establishment_kg_co2_per_tree / 1000.0
+        hit = first_row(total >= target[segment])
+        summary["payback_year"] = np.where(hit < n, year[np.minimum(hit, lasts)], -1)
+    return add_rankings(summary) if rank else summary
+
+
+def add_rankings(summary: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add rank_final_co2 and rank_avg_rate (1 = best; ties share the best rank) across all rows of a summary.
+    """
+    rate = "avg_tco2_per_ha_per_year" if "avg_tco2_per_ha_per_year" in summary else "avg_co2_tons_per_year"
+    summary["rank_final_co2"] = summary["final_total_co2_tons"].rank(ascending=False, method="min").astype(np.int64)
+    summary["rank_avg_rate"] = summary[rate].rank(ascending=False, method="min").astype(np.int64)
+    return summary
+
+
+class SummaryAccumulator:
+    """
+    summarize_results over a stream of chunks of one long-format table, e.g. the yearly chunks of
+    run_streaming. Chunks must be consecutive slices of a table whose rows are grouped by scenario in
+    year order: a scenario may straddle a chunk boundary but does not reappear later. The trailing
+    scenario of each chunk is held back until the next chunk completes it, so every scenario is
+    summarized once from all of its rows; rankings are computed over all scenarios in result().
+    With keep=False completed summaries are only returned, not held, so memory stays bounded by the
+    chunk size and result() is unavailable (run_streaming ranks from the parts it wrote instead).
+    """
+
+    def __init__(self, by: str = "scenario", stems_per_ha: Optional[float] = None,
+                 establishment_kg_co2_per_tree: Optional[float] = None, keep: bool = True):
+        self.by = by
+        self.keep = keep
+        self.options = {"stems_per_ha": stems_per_ha, "establishment_kg_co2_per_tree": establishment_kg_co2_per_tree}
+        self._parts: list[pd.DataFrame] = []
+        self._carry: Optional[pd.DataFrame] = None
+
+    def add(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fold in a chunk; returns the summaries (unranked) of the scenarios it completed.
+        """
+        if self._carry is not None:
+            chunk = pd.concat([self._carry, chunk], ignore_index=True)
+        if chunk.empty:
+            return self._summarize(chunk)
+        keys = chunk[self.by].to_numpy()
+        tail = len(keys) - int(np.argmax(keys[::-1] != keys[-1])) if (keys != keys[-1]).any() else 0
+        self._carry = chunk.iloc[tail:]
+        done = self._summarize(chunk.iloc[:tail])
+        if len(done) and self.keep:
+            self._parts.append(done)
+        return done
+
+    def _summarize(self, df: pd.DataFrame) -> pd.DataFrame:
+        return summarize_results(df, by=self.by, rank=False, **self.options)
+
+    def flush(self) -> pd.DataFrame:
+        """
+        Summarize the held-back trailing scenario (call once the stream has ended); returns its summary.
+        """
+        carry, self._carry = self._carry, None
+        if carry is None or carry.empty:
+            return self._summarize(pd.DataFrame(columns=[self.by, "year", "living_trees", "total_co2_tons"]))
+        done = self._summarize(carry)
+        if self.keep:
+            self._parts.append(done)
+        return done
+
+    def result(self) -> pd.DataFrame:
+        """
+        Ranked summaries of every scenario seen so far, including the held-back one.
+        """
+        if not self.keep:
+            raise ValueError("SummaryAccumulator(keep=False) does not hold summaries to rank")
+        self.flush()
+        if not self._parts:
+            return add_rankings(self.flush())
+        return add_rankings(pd.concat(self._parts, ignore_index=True))
@@ -1,11 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Union
 from .data_models import SpeciesParams, co2_from_carbon_kg
-from .growth_models import LogisticGrowth
+from .growth_models import get_growth_model, species_biomass_derivatives
+from .instrumentation import count, instrumented
+from .parameter_store import ParameterTable
+import numpy as np
 import pandas as pd
 
 CO2_PER_C = 44.0 / 12.0
+SPECIES_PARAM_COLUMNS = ["K_biomass_kg", "r_growth", "t0_inflection", "carbon_fraction", "root_shoot_ratio"]
+SPECIES_MODEL_COLUMNS = ["growth_model", "growth_shape"]
 
 
 def modeled_cseq_tco2_ha_per_year(sp: SpeciesParams, climate_factor: float, stems_per_ha: float, age_years: int = 10) -> float:
@@ -13,9 +18,11 @@ def modeled_cseq_tco2_ha_per_year(sp: SpeciesParams, climate_factor: float, stem
     Approximate annual sequestration (tCO2/ha/yr) at a given age by differencing per-tree CO2 between age and age+1.
     Uses above+below biomass via root_shoot_ratio and carbon_fraction.
     """
-    growth = LogisticGrowth(K=sp.K_biomass_kg, r=sp.r_growth * climate_factor, t0=sp.t0_inflection)
-    above_t = growth.biomass_at(age_years)
-    above_t1 = growth.biomass_at(age_years + 1)
+    count("growth_evaluations", 2)
+    growth = get_growth_model(sp.growth_model)
+    r_eff = sp.r_growth * climate_factor
+    above_t = float(growth.biomass(sp.K_biomass_kg, r_eff, sp.t0_inflection, age_years, sp.growth_shape))
+    above_t1 = float(growth.biomass(sp.K_biomass_kg, r_eff, sp.t0_inflection, age_years + 1, sp.growth_shape))
     below_t = above_t * sp.root_shoot_ratio
     below_t1 = above_t1 * sp.root_shoot_ratio
 
@@ -28,6 +35,7 @@ def modeled_cseq_tco2_ha_per_year(sp: SpeciesParams, climate_factor: float, stem
     return tco2_ha_yr
 
 
+@instrumented("calibrate.scalar")
 def calibrate_climate_factor(sp: SpeciesParams, stems_per_ha: float, target_cseq_tco2_ha_yr: float, age_years: int = 10,
                               lo: float = 0.3, hi: float = 3.0, tol: float = 1e-3, max_iter: int = 60) -> tuple[float, float]:
     """
@@ -60,6 +68,7 @@ def calibrate_climate_factor(sp: SpeciesParams, stems_per_ha: float, target_cseq
     a, fa = lo, lo_val
     b, fb = hi, hi_val
     for _ in range(max_iter):
+        count("calibration.bisection_iterations")
         m = 0.5 * (a + b)
         fm = modeled_cseq_tco2_ha_per_year(sp, m, stems_per_ha, age_years)
         if abs(fm - target_cseq_tco2_ha_yr) <= tol:
@@ -72,34 +81,238 @@ def calibrate_climate_factor(sp: SpeciesParams, stems_per_ha: float, target_cseq
     return m, fm
 
 
-def build_calibration_report(species_map: dict[str, SpeciesParams], benchmarks_df: pd.DataFrame, age_years: int = 10) -> pd.DataFrame:
-    rows = []
-    for _, r in benchmarks_df.iterrows():
-        species_key = r.get("species_group")
-        sp: Optional[SpeciesParams] = species_map.get(species_key)
-        if sp is None:
-            rows.append({
-                "species": species_key,
-                "region_class": r.get("region_class"),
-                "stems_per_ha": r.get("stems_per_ha"),
-                "target_cseq_tco2_ha_yr": float(r.get("cseq_mgc_ha_yr", 0.0)) * (44.0/12.0),
-                "modeled_base_tco2_ha_yr": None,
-                "recommended_climate_factor": None,
-                "note": "species not found in species_params.csv"
-            })
-            continue
-        target = float(r.get("cseq_mgc_ha_yr", 0.0)) * (44.0/12.0)
-        stems = float(r.get("stems_per_ha", 0.0))
-        base = modeled_cseq_tco2_ha_per_year(sp, 1.0, stems, age_years)
-        factor, modeled = calibrate_climate_factor(sp, stems, target, age_years)
-        rows.append({
-            "species": species_key,
-            "region_class": r.get("region_class"),
-            "stems_per_ha": stems,
-            "target_cseq_tco2_ha_yr": target,
-            "modeled_base_tco2_ha_yr": base,
-            "recommended_climate_factor": factor,
-            "modeled_at_factor_tco2_ha_yr": modeled,
-            "reference": r.get("reference"),
+@dataclass
+class CalibrationResult:
+    """
+    Per-row output of calibrate_climate_factors. Arrays are aligned with the input rows;
+    rows that could not be evaluated (missing parameters) hold NaN and zero evaluations.
+    """
+    factor: np.ndarray
+    modeled: np.ndarray
+    iterations: np.ndarray
+    evaluations: np.ndarray
+    converged: np.ndarray
+
+    @property
+    def n_evaluations(self) -> int:
+        return int(self.evaluations.sum())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "factor": self.factor,
+            "modeled": self.modeled,
+            "iterations": self.iterations,
+            "evaluations": self.evaluations,
+            "converged": self.converged,
         })
-    return pd.DataFrame(rows)
+
+
+def species_param_table(species_map: Union[dict[str, SpeciesParams], ParameterTable], keys) -> pd.DataFrame:
+    """
+    Species parameters aligned with `keys` (one row per key, NaN where the species is unknown), plus
+    each species' growth_model and growth_shape (NaN meaning the model default).
+    """
+    keys = pd.Series(keys, dtype=object)
+    if isinstance(species_map, ParameterTable):
+        table = species_map.frame()[SPECIES_PARAM_COLUMNS + SPECIES_MODEL_COLUMNS].set_axis(species_map.index)
+    else:
+        table = pd.DataFrame(
+            [[getattr(sp, c) for c in SPECIES_PARAM_COLUMNS] for sp in species_map.values()],
+            index=list(species_map.keys()),
+            columns=SPECIES_PARAM_COLUMNS,
+            dtype=float,
+        )
+        table["growth_model"] = pd.Series([sp.growth_model for sp in species_map.values()], index=table.index, dtype=object)
+        table["growth_shape"] = [np.nan if sp.growth_shape is None else sp.growth_shape for sp in species_map.values()]
+    table = table.reindex(keys.to_numpy()).reset_index(drop=True)
+    table["growth_model"] = table["growth_model"].astype(object).fillna("logistic")
+    return table
+
+
+def modeled_cseq_with_derivative(params, climate_factor, stems_per_ha, age_years: int = 10) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized modeled_cseq_tco2_ha_per_year plus its analytic derivative with respect to climate_factor.
+    `params` is a mapping (or DataFrame) of SPECIES_PARAM_COLUMNS arrays aligned with the other arguments,
+    optionally with SPECIES_MODEL_COLUMNS (logistic otherwise). The effective rate is r * c, so
+    dB/dc = r * dB/dr from the growth model's analytic derivatives.
+    """
+    K = np.asarray(params["K_biomass_kg"], dtype=float)
+    r = np.asarray(params["r_growth"], dtype=float)
+    t0 = np.asarray(params["t0_inflection"], dtype=float)
+    scale = (
+        (1.0 + np.asarray(params["root_shoot_ratio"], dtype=float))
+        * np.asarray(params["carbon_fraction"], dtype=float)
+        * CO2_PER_C
+        * np.asarray(stems_per_ha, dtype=float)
+        / 1000.0
+    )
+    models = params["growth_model"] if "growth_model" in params else "logistic"
+    if not isinstance(models, str):
+        models = np.asarray(models, dtype=object)
+    shape = np.asarray(params["growth_shape"], dtype=float) if "growth_shape" in params else None
+    d_t = species_biomass_derivatives(models, K, r * climate_factor, t0, age_years, shape)
+    d_t1 = species_biomass_derivatives(models, K, r * climate_factor, t0, age_years + 1, shape)
+    b_t, b_t1 = d_t["biomass"], d_t1["biomass"]
+    db_t, db_t1 = d_t["r"] * r, d_t1["r"] * r
+    delta = b_t1 - b_t
+    positive = delta > 0
+    value = np.where(positive, delta, 0.0) * scale
+    deriv = np.where(positive, db_t1 - db_t, 0.0) * scale
+    return value, deriv
+
+
+@instrumented("calibrate.vectorized")
+def calibrate_climate_factors(params, stems_per_ha, target_cseq_tco2_ha_yr, age_years: int = 10,
+                              lo: float = 0.3, hi: float = 3.0, tol: float = 1e-3, max_iter: int = 60) -> CalibrationResult:
+    """
+    Vectorized calibrate_climate_factor over many benchmark rows at once.
+    Same bracketing rules as the scalar version, but each row is solved by Newton steps on the analytic
+    derivative, falling back to bisection whenever a step would leave the current bracket.
+    """
+    target = np.atleast_1d(np.asarray(target_cseq_tco2_ha_yr, dtype=float))
+    n = target.shape[0]
+    stems = np.broadcast_to(np.asarray(stems_per_ha, dtype=float), (n,))
+    cols = {c: np.broadcast_to(np.asarray(params[c], dtype=float), (n,)) for c in SPECIES_PARAM_COLUMNS}
+    extra = {c: np.broadcast_to(np.asarray(params[c], dtype=object if c == "growth_model" else float), (n,))
+             for c in SPECIES_MODEL_COLUMNS if c in params}
+
+    def evaluate(rows, factor):
+        evaluations[rows] += 1
+        count("growth_evaluations", 2 * len(rows))
+        sub = {c: v[rows] for c, v in {**cols, **extra}.items()}
+        return modeled_cseq_with_derivative(sub, factor, stems[rows], age_years)
+
+    evaluations = np.zeros(n, dtype=np.int64)
+    iterations = np.zeros(n, dtype=np.int64)
+    factor = np.full(n, np.nan)
+    modeled = np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+
+    valid = np.isfinite(target) & np.isfinite(stems)
+    for v in cols.values():
+        valid &= np.isfinite(v)
+    rows = np.flatnonzero(valid)
+    if rows.size == 0:
+        return CalibrationResult(factor, modeled, iterations, evaluations, converged)
+
+    # If baseline already close, keep 1.0
+    base, base_d = evaluate(rows, 1.0)
+    done = np.abs(base - target[rows]) <= tol
+    factor[rows[done]] = 1.0
+    modeled[rows[done]] = base[done]
+    converged[rows[done]] = True
+    base, base_d, rows = base[~done], base_d[~done], rows[~done]
+
+    a = np.full(rows.size, lo)
+    b = np.full(rows.size, hi)
+    fa, _ = evaluate(rows, a)
+    fb, _ = evaluate(rows, b)
+    tgt = target[rows]
+    # Expand the bracket where the target lies outside [f(lo), f(hi)]
+    for _ in range(10):
+        grow = fb < tgt
+        if not grow.any():
+            break
+        b[grow] *= 1.5
+        fb[grow], _ = evaluate(rows[grow], b[grow])
+    for _ in range(10):
+        shrink = fa > tgt
+        if not shrink.any():
+            break
+        a[shrink] *= 0.5
+        fa[shrink], _ = evaluate(rows[shrink], a[shrink])
+
+    # Start from the baseline where it lies inside the bracket, else the midpoint
+    x = np.where((a < 1.0) & (1.0 < b), 1.0, 0.5 * (a + b))
+    fx = np.where(x == 1.0, base, np.nan)
+    dfx = np.where(x == 1.0, base_d, np.nan)
+    fresh = np.isnan(fx)
+    if fresh.any():
+        fx[fresh], dfx[fresh] = evaluate(rows[fresh], x[fresh])
+
+    active = np.arange(rows.size)
+    for _ in range(max_iter):
+        iterations[rows[active]] += 1
+        resid = fx[active] - tgt[active]
+        hit = np.abs(resid) <= tol
+        converged[rows[active[hit]]] = True
+        active = active[~hit]
+        if active.size == 0:
+            break
+        resid = resid[~hit]
+        # Response is increasing in factor within the bracket; keep the side that still straddles the target
+        below = resid < 0
+        a[active[below]] = x[active[below]]
+        b[active[~below]] = x[active[~below]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x[active] - resid / dfx[active]
+        ok = np.isfinite(step) & (step > a[active]) & (step < b[active])
+        x[active] = np.where(ok, step, 0.5 * (a[active] + b[active]))
+        fx[active], dfx[active] = evaluate(rows[active], x[active])
+
+    factor[rows] = x
+    modeled[rows] = fx
+    count("calibration.newton_iterations", iterations.sum())
+    count("calibration.rows", n)
+    return CalibrationResult(factor, modeled, iterations, evaluations, converged)
+
+
+@instrumented("calibrate.report")
+def build_calibration_report(species_map: dict[str, SpeciesParams], benchmarks_df: pd.DataFrame, age_years: int = 10) -> pd.DataFrame:
+    species_keys = benchmarks_df["species_group"].reset_index(drop=True)
+    params = species_param_table(species_map, species_keys)
+    found = species_keys.isin(list(species_map)).to_numpy()
+    target = benchmarks_df["cseq_mgc_ha_yr"].astype(float).to_numpy() * CO2_PER_C
+    stems = benchmarks_df["stems_per_ha"].astype(float).to_numpy()
+
+    base, _ = modeled_cseq_with_derivative(params, 1.0, stems, age_years)
+    result = calibrate_climate_factors(params, stems, target, age_years)
+
+    report = pd.DataFrame({
+        "species": species_keys,
+        "region_class": benchmarks_df["region_class"].to_numpy(),
+        "stems_per_ha": stems,
+        "target_cseq_tco2_ha_yr": target,
+        "modeled_base_tco2_ha_yr": base,
+        "recommended_climate_factor": result.factor,
+        "modeled_at_factor_tco2_ha_yr": result.modeled,
+        "solver_evaluations": result.evaluations,
+        "reference": np.where(found, benchmarks_df["reference"].to_numpy(), None) if "reference" in benchmarks_df else None,
+        "note": np.where(found, None, "species not found in species_params.csv"),
+    })
+    report.attrs["solver_evaluations"] = result.n_evaluations
+    return report
+
+
+# Species whose parameters stand in for benchmark rows of an unknown species, per region class
+DEFAULT_REGION_REF_SPECIES = {
+    "Subtropical": "Sal",
+    "Temperate": "Oak",
+    "Tropical": "Teak",
+}
+
+
+@instrumented("calibrate.regions")
+def recommend_region_factors(species_map: dict[str, SpeciesParams], benchmarks_df: pd.DataFrame,
+                             region_ref_species: dict[str, str], age_years: int = 10) -> pd.DataFrame:
+    """
+    Calibrate every usable benchmark row in one pass and average the factors per region class.
+    Benchmarks whose species is unknown borrow the reference species of their region class.
+    """
+    bench = benchmarks_df.reset_index(drop=True)
+    species_keys = bench["species_group"].where(bench["species_group"].isin(list(species_map)))
+    species_keys = species_keys.fillna(bench["region_class"].map(region_ref_species))
+    params = species_param_table(species_map, species_keys)
+    stems = pd.to_numeric(bench["stems_per_ha"], errors="coerce").to_numpy(dtype=float)
+    cseq = pd.to_numeric(bench["cseq_mgc_ha_yr"], errors="coerce").to_numpy(dtype=float)
+    usable = params["K_biomass_kg"].notna().to_numpy() & np.isfinite(cseq) & np.isfinite(stems) & (stems > 0)
+
+    result = calibrate_climate_factors(params[usable], stems[usable], cseq[usable] * CO2_PER_C, age_years)
+    factors = pd.DataFrame({"region": bench.loc[usable, "region_class"].to_numpy(), "factor": result.factor})
+    overrides = (
+        factors.groupby("region", sort=True)["factor"]
+        .agg(recommended_climate_factor="mean", n_benchmarks="size")
+        .reset_index()
+    )
+    overrides.attrs["solver_evaluations"] = result.n_evaluations
+    return overrides
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from itertools import product
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+
+
+def scenario_grid(species: Iterable[str], regions: Iterable[str], trees: Iterable[int], years: int) -> pd.DataFrame:
+    """
+    Scenarios table for every species x region x tree-count combination, all over the same horizon.
+    """
+    rows = list(product(species, regions, trees))
+    return pd.DataFrame({
+        "scenario": [f"{s} | {r} | {t:,}" for s, r, t in rows],
+        "species": [s for s, _, _ in rows],
+        "region": [r for _, r, _ in rows],
+        "trees_planted": np.array([t for _, _, t in rows], dtype=np.int64),
+        "years": years,
+    })
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets indices for series sharing the x axis: `y` is (series, points) and the
+    result is (series, n_out) column indices, always keeping the first and last point. The bucket loop
+    runs once for all series, so the cost is O(points) array work regardless of the series count.
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    x = np.asarray(x, dtype=float)
+    m, n = y.shape
+    if n_out >= n:
+        return np.tile(np.arange(n), (m, 1))
+    if n_out < 3:
+        raise ValueError("lttb needs n_out >= 3")
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    rows = np.arange(m)
+    out = np.empty((m, n_out), dtype=np.int64)
+    out[:, 0], out[:, -1] = 0, n - 1
+    a = np.zeros(m, dtype=np.int64)
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(hi, edges[i + 2])
+            cx, cy = x[nxt].mean(), y[:, nxt].mean(axis=1)
+        else:
+            cx, cy = x[n - 1], y[:, n - 1]
+        ax, ay = x[a], y[rows, a]
+        area = np.abs((ax - cx)[:, None] * (y[:, lo:hi] - ay[:, None]) - (ax[:, None] - x[lo:hi]) * (cy - ay)[:, None])
+        a = lo + np.argmax(area, axis=1)
+        out[:, i + 1] = a
+    return out
+
+
+@instrumented("compare.downsample")
+def downsample(df: pd.DataFrame, x: str, y: str, by: str, max_points: int, min_per_series: int = 16) -> pd.DataFrame:
+    """
+    Reduce a long-format table of trajectories (one series per `by` value, rows in x order) to about
+    `max_points` rows with LTTB, splitting the budget evenly across series. Series of equal length are
+    reduced together. Returns `df` unchanged when it is already within budget.
+    """
+    if len(df) <= max_points:
+        return df
+    codes, _ = pd.factorize(df[by], sort=False)
+    n_series = codes.max() + 1
+    per_series = max(max_points // n_series, min_per_series)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, len(df)])
+    xs, ys = df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float)
+    keep = []
+    for length in np.unique(lengths):
+        first = starts[lengths == length]
+        block = first[:, None] + np.arange(length)
+        # Horizons are shared within a block in practice; LTTB uses the first series' x axis
+        keep.append((first[:, None] + lttb(xs[block[0]], ys[block], per_series)).ravel())
+    return df.iloc[np.sort(np.concatenate(keep))]
+
+
+def gapped_lines(df: pd.DataFrame, x: str, y: str, by: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (x, y, label) arrays for drawing every series of a long-format table as one trace: series are joined
+    with a NaN row, which plotting libraries render as a break in the line. One trace for hundreds of
+    series keeps a WebGL chart fast where one trace per series would not be.
+    """
+    labels = df[by].to_numpy()
+    breaks = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+    xs = np.insert(df[x].to_numpy(dtype=float), breaks, np.nan)
+    ys = np.insert(df[y].to_numpy(dtype=float), breaks, np.nan)
+    return xs, ys, np.insert(labels.astype(object), breaks, None)
+
+
+def mean_annual_rate_per_ha(results: pd.DataFrame, scenarios_df: pd.DataFrame, stems_per_ha: float) -> pd.Series:
+    """
+    Average annual sequestration (tCO2/ha/yr) per scenario as the single-scenario view computes it: the
+    mean non-negative yearly increment of total_co2_tons over the area trees_planted / stems_per_ha.
+    """
+    total = results["total_co2_tons"]
+    increment = total.groupby(results["scenario"], sort=False).diff().fillna(total).clip(lower=0)
+    mean = increment.groupby(results["scenario"], sort=False).mean()
+    trees = scenarios_df.set_index("scenario")["trees_planted"].reindex(mean.index).to_numpy(dtype=float)
+    area_ha = np.maximum(trees / stems_per_ha, 1e-9)
+    return pd.Series(mean.to_numpy() / area_ha, index=mean.index, name="tco2_ha_yr")
@@ -0,0 +1,165 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Callable, Hashable
+
+import numpy as np
+
+from .data_models import SpeciesParams, RegionParams, co2_from_carbon_kg
+from .growth_models import continuous_survival, get_growth_model, survival_array
+from .instrumentation import count, instrumented
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    extensions: int = 0
+    evictions: int = 0
+
+
+class LRUCache:
+    """
+    Small bounded mapping with least-recently-used eviction. `maxsize=0` disables storage.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+@dataclass(frozen=True)
+class GrowthCurve:
+    """
+    Per-tree biomass, carbon and CO2 for the points of a time grid. Arrays are read-only because they are shared.
+    """
+    above_kg: np.ndarray
+    below_kg: np.ndarray
+    carbon_kg: np.ndarray
+    co2_kg: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.above_kg)
+
+    def head(self, n: int) -> "GrowthCurve":
+        return GrowthCurve(self.above_kg[:n], self.below_kg[:n], self.carbon_kg[:n], self.co2_kg[:n])
+
+    @staticmethod
+    def concat(a: "GrowthCurve", b: "GrowthCurve") -> "GrowthCurve":
+        return GrowthCurve(*(_frozen(np.concatenate([x, y])) for x, y in zip(
+            (a.above_kg, a.below_kg, a.carbon_kg, a.co2_kg),
+            (b.above_kg, b.below_kg, b.carbon_kg, b.co2_kg),
+        )))
+
+
+@instrumented("growth")
+def compute_growth_curve(sp: SpeciesParams, r_eff: float, years: np.ndarray) -> GrowthCurve:
+    count("growth_evaluations", len(years))
+    model = get_growth_model(sp.growth_model)
+    above_kg = model.biomass(sp.K_biomass_kg, r_eff, sp.t0_inflection, years, sp.growth_shape)
+    below_kg = above_kg * sp.root_shoot_ratio
+    carbon_kg = (above_kg + below_kg) * sp.carbon_fraction
+    co2_kg = co2_from_carbon_kg(carbon_kg)
+    return GrowthCurve(_frozen(above_kg), _frozen(below_kg), _frozen(carbon_kg), _frozen(co2_kg))
+
+
+@instrumented("survival")
+def compute_survival_curve(rg: RegionParams, years: np.ndarray) -> np.ndarray:
+    survival = continuous_survival if years.dtype.kind == "f" else survival_array
+    return _frozen(survival(1.0, years, rg.survival_rate_year1, rg.annual_mortality_rate))
+
+
+def _grid(start: int, stop: int, steps_per_year: int) -> np.ndarray:
+    steps = np.arange(start, stop)
+    return steps if steps_per_year == 1 else steps / steps_per_year
+
+
+class CurveCache:
+    """
+    Memoizes per-tree growth curves keyed by (species parameters, effective growth rate) and
+    per-tree survival curves keyed by region survival parameters. Scenario results are these
+    curves scaled by trees_planted. A request for a longer horizon than cached extends the
+    stored curve with only the missing years. Sub-annual grids (steps_per_year > 1) are cached
+    separately per resolution.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.growth = LRUCache(maxsize)
+        self.survival = LRUCache(maxsize)
+
+    @staticmethod
+    def _lookup(cache: LRUCache, key: Hashable, n: int, compute: Callable[[np.ndarray], object], concat, head,
+                steps_per_year: int = 1):
+        cached = cache.get(key)
+        if cached is not None and len(cached) >= n:
+            cache.stats.hits += 1
+            count("curve_cache.hits")
+            return head(cached, n)
+        if cached is None:
+            cache.stats.misses += 1
+            count("curve_cache.misses")
+            value = compute(_grid(0, n, steps_per_year))
+        else:
+            cache.stats.extensions += 1
+            count("curve_cache.extensions")
+            value = concat(cached, compute(_grid(len(cached), n, steps_per_year)))
+        cache.put(key, value)
+        return value
+
+    def growth_curve(self, sp: SpeciesParams, r_eff: float, years: int, steps_per_year: int = 1) -> GrowthCurve:
+        key = (sp.species, sp.growth_model, sp.growth_shape, sp.K_biomass_kg, sp.t0_inflection, sp.carbon_fraction,
+               sp.root_shoot_ratio, r_eff)
+        return self._lookup(
+            self.growth, key if steps_per_year == 1 else key + (steps_per_year,), years * steps_per_year + 1,
+            lambda t: compute_growth_curve(sp, r_eff, t),
+            GrowthCurve.concat,
+            GrowthCurve.head,
+            steps_per_year,
+        )
+
+    def survival_curve(self, rg: RegionParams, years: int, steps_per_year: int = 1) -> np.ndarray:
+        key = (rg.region, rg.survival_rate_year1, rg.annual_mortality_rate)
+        return self._lookup(
+            self.survival, key if steps_per_year == 1 else key + (steps_per_year,), years * steps_per_year + 1,
+            lambda t: compute_survival_curve(rg, t),
+            lambda a, b: _frozen(np.concatenate([a, b])),
+            lambda a, n: a[:n],
+            steps_per_year,
+        )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: {**asdict(cache.stats), "size": len(cache)}
+            for name, cache in (("growth", self.growth), ("survival", self.survival))
+        }
+
+    def clear(self) -> None:
+        self.growth.clear()
+        self.survival.clear()
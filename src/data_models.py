@@ -1,6 +1,12 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field, field_validator
-from typing import Literal, Optional
+from collections.abc import Sequence
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_serializer, model_validator
+from typing import Literal, Optional, Union, get_args, get_origin
+
+import numpy as np
+
+from .instrumentation import instrumented
 
 CarbonUnit = Literal["kgCO2", "tCO2"]
 
@@ -12,6 +18,16 @@ class SpeciesParams(BaseModel):
     t0_inflection: float = Field(description="Inflection year for logistic growth")
     carbon_fraction: float = Field(gt=0, lt=1, description="Fraction of dry biomass that is carbon (~0.47)")
     root_shoot_ratio: float = Field(gt=0, description="Below-ground to above-ground biomass ratio (0.2–0.4 typical)")
+    # Yield-curve form from growth_models.GROWTH_MODELS; t0_inflection is the inflection year for all of them
+    growth_model: str = Field(default="logistic", description="Registered growth model name")
+    growth_shape: Optional[float] = Field(default=None, gt=0, description="Shape exponent for chapman_richards (default 3)")
+
+    @field_validator("growth_model")
+    @classmethod
+    def _known_growth_model(cls, v: str) -> str:
+        from .growth_models import get_growth_model
+        get_growth_model(v)
+        return v
 
 class RegionParams(BaseModel):
     region: str
@@ -19,12 +35,80 @@ class RegionParams(BaseModel):
     annual_mortality_rate: float = Field(ge=0, lt=1, description="Probability a tree dies each year after year 1")
     climate_factor: float = Field(gt=0, description="Multiplier on growth rate due to climate/soil (e.g., 0.8–1.2)")
 
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def parse_ages(value):
+    """
+    List of ages from a list, a "10;20" string (as CSV cells hold them) or a missing value (None).
+    """
+    if isinstance(value, str):
+        return [float(v) for v in value.replace(",", ";").split(";") if v.strip()] or None
+    if _is_missing(value):
+        return None
+    return value
+
+
 class Scenario(BaseModel):
     scenario: str
     species: str
     region: str
     trees_planted: int = Field(gt=0)
-    years: int = Field(ge=1, le=100)
+    years: int = Field(ge=1, le=200)
+    steps_per_year: int = Field(default=1, ge=1, le=365, description="Time steps per year; 12 gives monthly rows, 4 quarterly")
+    # Trees planted in each year from 0; None means a single cohort of trees_planted in year 0
+    planting_schedule: Optional[list[int]] = Field(default=None, description="Trees planted per year, starting at year 0")
+    replant_first_year_losses: bool = Field(default=False, description="Replant each cohort's first-year losses the following year")
+    # Management: removals feed harvested-wood-product and dead-wood pools with first-order decay
+    rotation_years: Optional[int] = Field(default=None, ge=1, description="Clear-fell and replant every this many years")
+    thinning_ages: Optional[list[float]] = Field(default=None, description="Stand ages (years) of thinnings in each rotation")
+    thinning_fraction: float = Field(default=0.3, gt=0, lt=1, description="Share of living trees removed by each thinning")
+    product_fraction: float = Field(default=0.5, ge=0, le=1, description="Share of removed above-ground biomass going to wood products")
+    product_half_life_years: float = Field(default=30.0, gt=0)
+    deadwood_half_life_years: float = Field(default=10.0, gt=0)
+
+    @field_validator("thinning_ages", mode="before")
+    @classmethod
+    def _parse_ages(cls, value):
+        return parse_ages(value)
+
+    @property
+    def managed(self) -> bool:
+        return self.rotation_years is not None or bool(self.thinning_ages)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _trees_from_schedule(cls, data):
+        if isinstance(data, dict) and "planting_schedule" in data:
+            data = dict(data)
+            # Same list syntax as thinning_ages; the list[int] field then rejects fractional counts
+            data["planting_schedule"] = parse_ages(data["planting_schedule"])
+            if data["planting_schedule"] is not None and _is_missing(data.get("trees_planted")):
+                data["trees_planted"] = sum(data["planting_schedule"])
+        return data
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Scenario":
+        """
+        Scenario from a scenarios-table record (e.g. pd.read_csv(...).to_dict(orient="records")), where blank
+        optional cells arrive as NaN: those fields take their defaults.
+        """
+        return cls(**{k: v for k, v in row.items() if not _is_missing(v)})
+
+    @model_validator(mode="after")
+    def _check_schedule(self):
+        if self.planting_schedule is not None:
+            if any(n < 0 for n in self.planting_schedule):
+                raise ValueError("planting_schedule entries must be >= 0")
+            if len(self.planting_schedule) > self.years + 1:
+                raise ValueError("planting_schedule is longer than the simulated horizon")
+            if sum(self.planting_schedule) != self.trees_planted:
+                raise ValueError("trees_planted must equal the sum of planting_schedule")
+        for age in self.thinning_ages or []:
+            if age <= 0 or (self.rotation_years is not None and age >= self.rotation_years):
+                raise ValueError("thinning_ages must be > 0 and before the end of the rotation")
+        return self
 
 class YearlyResult(BaseModel):
     year: int
@@ -35,13 +119,168 @@ class YearlyResult(BaseModel):
     co2_kg_per_tree: float
     total_co2_tons: float
 
+YEARLY_FIELDS = tuple(YearlyResult.model_fields)
+# Present only on managed scenarios (rotation or thinnings)
+MANAGEMENT_FIELDS = ("removed_co2_tons", "products_co2_tons", "deadwood_co2_tons", "stored_co2_tons")
+# t_years is present only on sub-annual grids (steps_per_year > 1), where `year` is the whole year a step falls in
+OPTIONAL_FIELDS = ("t_years",) + MANAGEMENT_FIELDS
+
+
+class YearlyColumns(Sequence):
+    """
+    Columnar store of yearly results: one contiguous NumPy array per YearlyResult field, plus t_years
+    (age in fractional years) for sub-annual grids.
+    Indexing and iteration build YearlyResult objects on demand; to_dataframe wraps the arrays without copying.
+    """
+
+    __slots__ = ("_columns",)
+
+    def __init__(self, **columns):
+        missing = [f for f in YEARLY_FIELDS if f not in columns]
+        if missing:
+            raise ValueError(f"missing yearly columns: {missing}")
+        self._columns = {
+            f: np.ascontiguousarray(columns[f], dtype=np.int64 if f == "year" else np.float64)
+            for f in YEARLY_FIELDS
+        }
+        for f in OPTIONAL_FIELDS:
+            if columns.get(f) is not None:
+                self._columns[f] = np.ascontiguousarray(columns[f], dtype=np.float64)
+        lengths = {len(a) for a in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("yearly columns must all have the same length")
+
+    @classmethod
+    def from_results(cls, results) -> "YearlyColumns":
+        rows = [r.model_dump() if isinstance(r, BaseModel) else r for r in results]
+        optional = [f for f in OPTIONAL_FIELDS if rows and f in rows[0]]
+        return cls(**{f: [row[f] for row in rows] for f in YEARLY_FIELDS + tuple(optional)})
+
+    def __len__(self) -> int:
+        return len(self._columns["year"])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return YearlyColumns(**{f: a[i] for f, a in self._columns.items()})
+        return YearlyResult.model_construct(**{f: a[i].item() for f, a in self._columns.items()})
+
+    def __getattr__(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self) -> str:
+        return f"YearlyColumns(n={len(self)})"
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return dict(self._columns)
+
+    def rows(self) -> list[dict]:
+        cols = {f: a.tolist() for f, a in self._columns.items()}
+        return [dict(zip(cols, vals)) for vals in zip(*cols.values())]
+
+    def to_results(self) -> list[YearlyResult]:
+        return [YearlyResult.model_construct(**row) for row in self.rows()]
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self._columns, columns=list(self._columns), copy=False)
+
+
 class SimulationOutput(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     scenario: Scenario
-    yearly: list[YearlyResult]
+    columns: YearlyColumns
+
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_yearly_list(cls, data):
+        # Older callers construct SimulationOutput(scenario=..., yearly=[YearlyResult, ...])
+        if isinstance(data, dict) and "yearly" in data and "columns" not in data:
+            data = dict(data)
+            data["columns"] = YearlyColumns.from_results(data.pop("yearly"))
+        return data
 
+    @model_serializer
+    def _dump(self) -> dict:
+        # Dumps keep the original layout, {"scenario": ..., "yearly": [YearlyResult fields per year]}
+        return {"scenario": self.scenario.model_dump(), "yearly": self.columns.rows()}
+
+    @cached_property
+    def yearly(self) -> list[YearlyResult]:
+        return self.columns.to_results()
+
+    @instrumented("to_dataframe")
     def to_dataframe(self):
-        import pandas as pd
-        return pd.DataFrame([r.model_dump() for r in self.yearly])
+        return self.columns.to_dataframe()
+
+_BOUND_CHECKS = {
+    "gt": (np.greater, ">"),
+    "ge": (np.greater_equal, ">="),
+    "lt": (np.less, "<"),
+    "le": (np.less_equal, "<="),
+}
+
+
+def _scalar_annotation(annotation):
+    # Optional[float] -> float; anything else unchanged
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+@instrumented("validate_frame")
+def validate_frame(model: type[BaseModel], df):
+    """
+    Column-wise counterpart of constructing `model(**row)` for every row of `df`.
+    Coerces str/int/float fields (and their Optional forms, which allow NaN) in bulk and enforces
+    their Field bounds (gt/ge/lt/le).
+    Returns a new DataFrame holding the model's columns; raises ValueError naming the offending rows.
+    """
+    import pandas as pd
+
+    out = {}
+    errors = []
+    for name, info in model.model_fields.items():
+        if name not in df.columns:
+            if info.is_required():
+                errors.append(f"{name}: missing column")
+            continue
+        col = df[name]
+        annotation = _scalar_annotation(info.annotation)
+        if annotation is str:
+            missing = col.isna()
+            bad = missing & info.is_required()
+            values = col.astype(str).where(~missing)
+        elif annotation in (int, float):
+            values = pd.to_numeric(col, errors="coerce")
+            # Unparseable entries are always errors; blanks only where the field is required
+            bad = values.isna() & (col.notna() | info.is_required())
+            if annotation is int:
+                bad |= values.notna() & (values != values.round())
+        else:
+            out[name] = col
+            continue
+        for meta in info.metadata:
+            for attr, (op, symbol) in _BOUND_CHECKS.items():
+                bound = getattr(meta, attr, None)
+                if bound is not None:
+                    failed = values.notna() & ~op(values, bound)
+                    if failed.any():
+                        errors.append(f"{name}: must be {symbol} {bound} (rows {list(df.index[failed][:5])})")
+        if bad.any():
+            errors.append(f"{name}: invalid {annotation.__name__} (rows {list(df.index[bad][:5])})")
+        if annotation is int and not bad.any() and not values.isna().any():
+            values = values.astype(np.int64)
+        out[name] = values
+    if errors:
+        raise ValueError(f"{len(df)} {model.__name__} rows failed validation:\n" + "\n".join(errors))
+    return pd.DataFrame(out, index=df.index)
+
 
 # Utility
 def co2_from_carbon_kg(c_kg: float) -> float:
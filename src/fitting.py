@@ -0,0 +1,241 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+import json
+
+import numpy as np
+import pandas as pd
+
+from .calibration import DEFAULT_REGION_REF_SPECIES, species_param_table
+from .growth_models import species_biomass_derivatives
+from .instrumentation import count, instrumented
+
+FITTED_COLUMNS = ["K_biomass_kg", "r_growth", "t0_inflection"]
+OBSERVED_COLUMNS = {"cseq_mgc_ha_yr": "rate", "c_stock_mgc_ha": "stock"}
+
+
+@dataclass(frozen=True)
+class FitPrior:
+    """
+    Ridge terms pulling the fit toward the catalog: per species log K, log r and t0 around their
+    species_params.csv values, per region class the log climate factor around 1. `weight` scales all
+    of them against the benchmark residuals (relative errors, so a 10% miss counts 0.1).
+    """
+    log_K_sd: float = 0.5
+    log_r_sd: float = 0.5
+    t0_sd_years: float = 5.0
+    log_factor_sd: float = 0.25
+    weight: float = 1.0
+
+
+@dataclass
+class JointFit:
+    """
+    Result of fit_growth_parameters.
+
+    - species: fitted FITTED_COLUMNS per species (index), with the catalog values as `*_prior` and n_benchmarks
+    - regions: region, recommended_climate_factor, n_benchmarks (the layout of recommend_region_factors)
+    - residuals: one row per benchmark used, observed and modeled rate and stock
+    """
+    species: pd.DataFrame
+    regions: pd.DataFrame
+    residuals: pd.DataFrame = field(default_factory=pd.DataFrame)
+    cost: float = 0.0
+    nfev: int = 0
+    success: bool = True
+
+    def species_frame(self, species_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        A species_params.csv frame with the fitted columns replaced for the species that were fitted.
+        """
+        out = species_df.copy()
+        fitted = out["species"].map(lambda s: s in self.species.index).to_numpy(dtype=bool)
+        for c in FITTED_COLUMNS:
+            out.loc[fitted, c] = self.species.loc[out.loc[fitted, "species"], c].to_numpy()
+        return out
+
+    def region_overrides(self) -> pd.DataFrame:
+        return self.regions.copy()
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps({
+            "species": self.species.reset_index().to_dict(orient="records"),
+            "regions": self.regions.to_dict(orient="records"),
+            "cost": self.cost,
+            "nfev": self.nfev,
+            "success": self.success,
+        }, indent=1) + "\n")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "JointFit":
+        """
+        A saved fit (without its residuals), e.g. as the warm start of the next refit.
+        """
+        data = json.loads(Path(path).read_text())
+        species = pd.DataFrame(data["species"], columns=["species"] + FITTED_COLUMNS).set_index("species")
+        regions = pd.DataFrame(data["regions"], columns=["region", "recommended_climate_factor", "n_benchmarks"])
+        return cls(species, regions, cost=data["cost"], nfev=data["nfev"], success=data["success"])
+
+
+def _observations(bench: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # (row, is_stock, value) for every positive observation of OBSERVED_COLUMNS
+    rows, stock, values = [], [], []
+    for column, kind in OBSERVED_COLUMNS.items():
+        if column not in bench:
+            continue
+        y = pd.to_numeric(bench[column], errors="coerce").to_numpy(dtype=float)
+        ok = np.flatnonzero(np.isfinite(y) & (y > 0))
+        rows.append(ok)
+        stock.append(np.full(ok.size, kind == "stock"))
+        values.append(y[ok])
+    if not rows:
+        raise ValueError(f"benchmarks need at least one of {list(OBSERVED_COLUMNS)}")
+    return np.concatenate(rows), np.concatenate(stock), np.concatenate(values)
+
+
+@instrumented("fit.joint")
+def fit_growth_parameters(species_map, benchmarks_df: pd.DataFrame, region_ref_species: Optional[dict[str, str]] = None,
+                          age_years: float = 10, prior: FitPrior = FitPrior(), warm_start: Optional[JointFit] = None,
+                          fit_regions: bool = True, max_nfev: Optional[int] = None) -> JointFit:
+    """
+    Fit K_biomass_kg, r_growth and t0_inflection per species and a climate factor per region class jointly to
+    every benchmark row: sequestration rate (cseq_mgc_ha_yr, differenced between age and age + 1 as in
+    calibration) and carbon stock (c_stock_mgc_ha) at the row's stand age (an `age_years` column, else
+    `age_years`), in relative terms, plus the FitPrior ridge terms.
+
+    Rows of an unknown species borrow the reference species of their region class, as in
+    recommend_region_factors, but only inform the region factor: species parameters are fitted to rows
+    of their own species. The problem is solved with scipy's trust-region least squares on a sparse
+    analytic Jacobian (from the growth models' derivatives), starting from `warm_start` where it has
+    values, else from the catalog.
+    """
+    from scipy.optimize import least_squares
+    from scipy.sparse import csr_matrix
+
+    refs = DEFAULT_REGION_REF_SPECIES if region_ref_species is None else region_ref_species
+    bench = benchmarks_df.reset_index(drop=True)
+    own = bench["species_group"].isin(list(species_map)).to_numpy()
+    keys = bench["species_group"].where(own, bench["region_class"].map(refs))
+    params = species_param_table(species_map, keys)
+    stems = pd.to_numeric(bench["stems_per_ha"], errors="coerce").to_numpy(dtype=float)
+    ages = (pd.to_numeric(bench["age_years"], errors="coerce").fillna(age_years).to_numpy(dtype=float)
+            if "age_years" in bench else np.full(len(bench), float(age_years)))
+    obs_row, obs_stock, obs = _observations(bench)
+    usable = params["K_biomass_kg"].notna().to_numpy() & np.isfinite(stems) & (stems > 0) & np.isfinite(ages)
+    keep = usable[obs_row]
+    obs_row, obs_stock, obs = obs_row[keep], obs_stock[keep], obs[keep]
+    rows = np.unique(obs_row)
+    if rows.size == 0:
+        raise ValueError("no usable benchmark rows to fit")
+    obs_row = np.searchsorted(rows, obs_row)
+
+    p = params.iloc[rows].reset_index(drop=True)
+    own, stems, ages = own[rows], stems[rows], ages[rows]
+    keys = keys.iloc[rows].to_numpy()
+    scale = (1.0 + p["root_shoot_ratio"].to_numpy()) * p["carbon_fraction"].to_numpy() * stems / 1000.0
+    models = p["growth_model"].to_numpy(dtype=object)
+    shape = p["growth_shape"].to_numpy(dtype=float)
+
+    species = pd.Index(pd.unique(keys[own]), name="species")
+    regions = pd.Index(sorted(pd.unique(bench["region_class"].iloc[rows])) if fit_regions else [], name="region")
+    ns, nr = len(species), len(regions)
+    sp_col = np.where(own, species.get_indexer(keys), -1)
+    rg_col = regions.get_indexer(bench["region_class"].iloc[rows]) if nr else np.full(rows.size, -1)
+    catalog = species_param_table(species_map, species)
+    prior_x = np.concatenate([np.log(catalog["K_biomass_kg"]), np.log(catalog["r_growth"]),
+                              catalog["t0_inflection"], np.zeros(nr)])
+    sd = np.concatenate([np.full(ns, prior.log_K_sd), np.full(ns, prior.log_r_sd),
+                         np.full(ns, prior.t0_sd_years), np.full(nr, prior.log_factor_sd)])
+    x0 = prior_x.copy()
+    if warm_start is not None:
+        start = warm_start.species.reindex(species)
+        for k, (c, fn) in enumerate(zip(FITTED_COLUMNS, (np.log, np.log, np.asarray))):
+            values = fn(start[c].to_numpy(dtype=float))
+            x0[k * ns:(k + 1) * ns] = np.where(np.isfinite(values), values, x0[k * ns:(k + 1) * ns])
+        if nr:
+            factors = warm_start.regions.set_index("region")["recommended_climate_factor"].reindex(regions)
+            x0[3 * ns:] = np.where(factors.notna(), np.log(factors.to_numpy(dtype=float)), 0.0)
+    n_obs, n_x = obs.size, x0.size
+
+    def unpack(x: np.ndarray):
+        K, r, t0 = p["K_biomass_kg"].to_numpy(), p["r_growth"].to_numpy(), p["t0_inflection"].to_numpy()
+        fitted = sp_col >= 0
+        K = np.where(fitted, np.exp(x[np.maximum(sp_col, 0)]), K)
+        r = np.where(fitted, np.exp(x[ns + np.maximum(sp_col, 0)]), r)
+        t0 = np.where(fitted, x[2 * ns + np.maximum(sp_col, 0)], t0)
+        factor = np.exp(x[3 * ns + rg_col]) if nr else np.ones(rows.size)
+        return K, r * factor, t0
+
+    cache: dict[bytes, tuple[np.ndarray, csr_matrix, np.ndarray]] = {}
+
+    def evaluate(x: np.ndarray):
+        key = x.tobytes()
+        if key not in cache:
+            count("growth_evaluations", 2 * rows.size)
+            K, r_eff, t0 = unpack(x)
+            d0 = species_biomass_derivatives(models, K, r_eff, t0, ages, shape)
+            d1 = species_biomass_derivatives(models, K, r_eff, t0, ages + 1, shape)
+            # d(model)/d(log K, log r_eff, t0) per row for the rate and the stock, in MgC/ha
+            rate = np.stack([K * (d1["K"] - d0["K"]), r_eff * (d1["r"] - d0["r"]), d1["t0"] - d0["t0"]]) * scale
+            stock = np.stack([K * d0["K"], r_eff * d0["r"], d0["t0"]]) * scale
+            modeled = np.where(obs_stock, d0["biomass"][obs_row], (d1["biomass"] - d0["biomass"])[obs_row]) * scale[obs_row]
+            grad = np.where(obs_stock, stock[:, obs_row], rate[:, obs_row]) / obs
+
+            i = np.arange(n_obs)
+            fitted = sp_col[obs_row] >= 0
+            cols = [sp_col[obs_row] + k * ns for k in range(3)]
+            ii = [i[fitted]] * 3
+            jj = [c[fitted] for c in cols]
+            vv = [grad[k][fitted] for k in range(3)]
+            if nr:
+                # Region factors scale r_eff, so they share the log r derivative
+                ii.append(i)
+                jj.append(3 * ns + rg_col[obs_row])
+                vv.append(grad[1])
+            w = prior.weight / sd
+            ii.append(n_obs + np.arange(n_x))
+            jj.append(np.arange(n_x))
+            vv.append(w)
+            jac = csr_matrix((np.concatenate(vv), (np.concatenate(ii), np.concatenate(jj))), shape=(n_obs + n_x, n_x))
+            residual = np.concatenate([modeled / obs - 1.0, w * (x - prior_x)])
+            cache.clear()
+            cache[key] = (residual, jac, modeled)
+        return cache[key]
+
+    result = least_squares(lambda x: evaluate(x)[0], x0, jac=lambda x: evaluate(x)[1], method="trf",
+                           tr_solver="lsmr", x_scale="jac", max_nfev=max_nfev)
+    count("fit.function_evaluations", result.nfev)
+    x = result.x
+    modeled = evaluate(x)[2]
+
+    n_rows = pd.Series(keys[own]).value_counts()
+    fitted_species = pd.DataFrame({
+        "K_biomass_kg": np.exp(x[:ns]),
+        "r_growth": np.exp(x[ns:2 * ns]),
+        "t0_inflection": x[2 * ns:3 * ns],
+        **{f"{c}_prior": catalog[c].to_numpy() for c in FITTED_COLUMNS},
+        "n_benchmarks": n_rows.reindex(species).to_numpy(dtype=np.int64),
+    }, index=species)
+    region_class = bench["region_class"].iloc[rows]
+    fitted_regions = pd.DataFrame({
+        "region": regions,
+        "recommended_climate_factor": np.exp(x[3 * ns:]),
+        "n_benchmarks": region_class.value_counts().reindex(regions).to_numpy(dtype=np.int64),
+    })
+
+    residuals = pd.DataFrame({
+        "species": keys,
+        "region_class": region_class.to_numpy(),
+        "age_years": ages,
+    })
+    for column, kind in OBSERVED_COLUMNS.items():
+        sel = obs_stock == (kind == "stock")
+        observed = np.full(rows.size, np.nan)
+        fitted_value = np.full(rows.size, np.nan)
+        observed[obs_row[sel]] = obs[sel]
+        fitted_value[obs_row[sel]] = modeled[sel]
+        residuals[f"observed_{column}"] = observed
+        residuals[f"modeled_{column}"] = fitted_value
+    return JointFit(fitted_species, fitted_regions, residuals, cost=float(result.cost), nfev=int(result.nfev),
+                    success=bool(result.success))
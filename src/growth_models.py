@@ -1,6 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from math import exp
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
 
 @dataclass
 class LogisticGrowth:
@@ -12,6 +16,197 @@ class LogisticGrowth:
         # Logistic function: K / (1 + exp(-r (t - t0)))
         return self.K / (1.0 + exp(-self.r * (t_years - self.t0)))
 
+    def time_to_biomass(self, biomass_kg):
+        """
+        Analytic inverse of biomass_at: t = t0 - ln(K / B - 1) / r. Accepts scalars or arrays.
+        Targets at or above K are never reached (inf); targets <= 0 give -inf.
+        """
+        return logistic_time_to_biomass(self.K, self.r, self.t0, biomass_kg)
+
+
+def logistic_biomass(K, r, t0, t_years):
+    """
+    Vectorized LogisticGrowth.biomass_at. All arguments broadcast as NumPy arrays,
+    so one call evaluates many (parameter set, age) pairs at once.
+    """
+    return K / (1.0 + np.exp(-r * (t_years - t0)))
+
+
+def logistic_time_to_biomass(K, r, t0, biomass_kg):
+    """
+    Vectorized inverse of logistic_biomass with respect to time.
+    """
+    B = np.asarray(biomass_kg, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = t0 - np.log(K / B - 1.0) / r
+    t = np.where(B >= K, np.inf, t)
+    t = np.where(B <= 0, -np.inf, t)
+    return t if t.ndim else float(t)
+
+
+# Growth-model registry ------------------------------------------------------
+#
+# Every model is written in terms of the scaled age u = r (t - t0), so that t0 is the inflection year and
+# r the rate for all of them: B(t) = K * shape(u). Derivatives then follow from the chain rule,
+# dB/dr = K shape'(u) (t - t0), dB/dt = K shape'(u) r, dB/dt0 = -K shape'(u) r, dB/dK = shape(u).
+
+
+@dataclass(frozen=True)
+class GrowthModel:
+    """
+    A yield-curve form B(t) = K * shape(u), u = r (t - t0), evaluated as NumPy kernels.
+    `shape`, `shape_du` and `inverse` take (u or fraction, shape_param); shape_param is only used by
+    models with a free shape exponent and falls back to `default_shape`.
+    """
+    name: str
+    shape: Callable[[np.ndarray, float], np.ndarray]
+    shape_du: Callable[[np.ndarray, float], np.ndarray]
+    inverse: Callable[[np.ndarray, float], np.ndarray]
+    default_shape: Optional[float] = None
+
+    def _p(self, shape_param):
+        return self.default_shape if shape_param is None else shape_param
+
+    def biomass(self, K, r, t0, t_years, shape_param=None):
+        return K * self.shape(r * (t_years - t0), self._p(shape_param))
+
+    def derivatives(self, K, r, t0, t_years, shape_param=None) -> dict[str, np.ndarray]:
+        """
+        Analytic partial derivatives of biomass with respect to K, r, t0 and t.
+        """
+        dt = t_years - t0
+        u = r * dt
+        g = self.shape(u, self._p(shape_param))
+        dg = K * self.shape_du(u, self._p(shape_param))
+        return {"K": g, "r": dg * dt, "t0": -dg * r, "t": dg * r}
+
+    def time_to_biomass(self, K, r, t0, biomass_kg, shape_param=None):
+        frac = np.asarray(biomass_kg, dtype=float) / K
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = t0 + self.inverse(frac, self._p(shape_param)) / r
+        t = np.where(frac >= 1.0, np.inf, t)
+        t = np.where(frac <= 0.0, -np.inf, t)
+        return t if t.ndim else float(t)
+
+
+def _logistic_shape(u, _p):
+    return 1.0 / (1.0 + np.exp(-u))
+
+
+def _logistic_du(u, _p):
+    g = 1.0 / (1.0 + np.exp(-u))
+    return g * (1.0 - g)
+
+
+def _gompertz_shape(u, _p):
+    return np.exp(-np.exp(-u))
+
+
+def _gompertz_du(u, _p):
+    e = np.exp(-u)
+    return np.exp(-e) * e
+
+
+def _chapman_richards_shape(u, p):
+    # Shifted so the inflection (1 - e^-v = (p - 1) / p at v = ln p) lands on u = 0
+    v = u + np.log(p)
+    return np.where(v > 0, (-np.expm1(-np.maximum(v, 0.0))) ** p, 0.0)
+
+
+def _chapman_richards_du(u, p):
+    v = np.maximum(u + np.log(p), 0.0)
+    return np.where(u + np.log(p) > 0, p * (-np.expm1(-v)) ** (p - 1.0) * np.exp(-v), 0.0)
+
+
+def _chapman_richards_inverse(frac, p):
+    return -np.log1p(-frac ** (1.0 / p)) - np.log(p)
+
+
+GROWTH_MODELS: dict[str, GrowthModel] = {}
+
+
+def register_growth_model(model: GrowthModel) -> GrowthModel:
+    GROWTH_MODELS[model.name] = model
+    return model
+
+
+def get_growth_model(name: str) -> GrowthModel:
+    try:
+        return GROWTH_MODELS[name]
+    except KeyError:
+        raise ValueError(f"unknown growth model '{name}'; registered: {sorted(GROWTH_MODELS)}") from None
+
+
+register_growth_model(GrowthModel(
+    "logistic", _logistic_shape, _logistic_du, lambda g, _p: np.log(g / (1.0 - g)),
+))
+register_growth_model(GrowthModel(
+    "gompertz", _gompertz_shape, _gompertz_du, lambda g, _p: -np.log(-np.log(g)),
+))
+register_growth_model(GrowthModel(
+    "chapman_richards", _chapman_richards_shape, _chapman_richards_du, _chapman_richards_inverse, default_shape=3.0,
+))
+# von Bertalanffy weight growth is Chapman-Richards with the exponent fixed at 3
+register_growth_model(GrowthModel(
+    "von_bertalanffy",
+    lambda u, _p: _chapman_richards_shape(u, 3.0),
+    lambda u, _p: _chapman_richards_du(u, 3.0),
+    lambda g, _p: _chapman_richards_inverse(g, 3.0),
+    default_shape=3.0,
+))
+
+
+def species_biomass(models, K, r, t0, t_years, shape_param=None):
+    """
+    Biomass for arrays of species that may use different growth models. `models` is a model name or an
+    array of names aligned with the parameter arrays; each distinct model is evaluated in one kernel call.
+    `shape_param` may hold NaN where a species uses its model's default.
+    """
+    if isinstance(models, str):
+        return get_growth_model(models).biomass(K, r, t0, t_years, shape_param)
+    return _dispatch(models, lambda m, sel: m.biomass(*sel), K, r, t0, t_years, shape_param)
+
+
+def species_biomass_derivatives(models, K, r, t0, t_years, shape_param=None) -> dict[str, np.ndarray]:
+    """
+    species_biomass plus its partial derivatives (keys: biomass, K, r, t0, t).
+    """
+    def both(m, sel):
+        return {"biomass": m.biomass(*sel), **m.derivatives(*sel)}
+
+    if isinstance(models, str):
+        return both(get_growth_model(models), (K, r, t0, t_years, shape_param))
+    return _dispatch(models, both, K, r, t0, t_years, shape_param)
+
+
+def _dispatch(models, fn, K, r, t0, t_years, shape_param):
+    models = np.asarray(models, dtype=object)
+    shape_param = np.nan if shape_param is None else shape_param
+    arrays = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (K, r, t0, t_years, shape_param))
+    )
+    models = np.broadcast_to(models.reshape(models.shape + (1,) * (arrays[0].ndim - models.ndim)), arrays[0].shape)
+    if models.size == 0:
+        return fn(get_growth_model("logistic"), arrays)
+    # Hash-based factorize: sorting an object array of names (np.unique) dominates large batches
+    codes, names = pd.factorize(models.ravel())
+    codes = codes.reshape(models.shape)
+    out = None
+    for k, name in enumerate(names):
+        model = get_growth_model(name)
+        mask = codes == k
+        K_, r_, t0_, t_, p_ = (a[mask] for a in arrays)
+        p_ = np.where(np.isnan(p_), np.nan if model.default_shape is None else model.default_shape, p_)
+        res = fn(model, (K_, r_, t0_, t_, p_))
+        if out is None:
+            out = {k: np.empty(arrays[0].shape) for k in res} if isinstance(res, dict) else np.empty(arrays[0].shape)
+        if isinstance(res, dict):
+            for k, v in res.items():
+                out[k][mask] = v
+        else:
+            out[mask] = res
+    return out
+
 
 def annual_survival(starting: float, year: int, p_year1: float, p_mortality: float) -> float:
     """
@@ -27,3 +222,62 @@ def annual_survival(starting: float, year: int, p_year1: float, p_mortality: flo
         return starting * p_year1
     # year >= 2
     return starting * p_year1 * ((1.0 - p_mortality) ** (year - 1))
+
+
+def survival_array(starting, year, p_year1, p_mortality):
+    """
+    Vectorized annual_survival over broadcastable arrays of cohorts and years.
+    Applies the multiplications in the same order as the scalar version so results match exactly.
+    """
+    year = np.asarray(year)
+    starting = np.asarray(starting, dtype=float)
+    later = starting * p_year1 * np.power(1.0 - np.asarray(p_mortality, dtype=float), np.maximum(year - 1, 0))
+    return np.where(year <= 0, starting, later)
+
+
+def continuous_survival(starting, t_years, p_year1, p_mortality):
+    """
+    survival_array for fractional ages, from a piecewise-constant hazard: -ln(p_year1) per year during the
+    first year and -ln(1 - p_mortality) per year after it, i.e. S(t) = p_year1^min(t, 1) * (1 - p_mortality)^(t - 1)
+    for t > 1. At whole years this is exactly survival_array.
+    """
+    t = np.asarray(t_years, dtype=float)
+    starting = np.asarray(starting, dtype=float)
+    later = (starting * np.power(np.asarray(p_year1, dtype=float), np.clip(t, 0.0, 1.0))
+             * np.power(1.0 - np.asarray(p_mortality, dtype=float), np.maximum(t - 1.0, 0.0)))
+    return np.where(t <= 0, starting, later)
+
+
+def time_grid(years: int, steps_per_year: int = 1) -> np.ndarray:
+    """
+    Ages 0, 1/steps_per_year, ..., years. Whole years fall exactly on integers; steps_per_year=1 gives the
+    integer year grid.
+    """
+    steps = np.arange(years * steps_per_year + 1)
+    return steps if steps_per_year == 1 else steps / steps_per_year
+
+
+def convolve_cohorts(schedule, per_tree, n: int, fft_threshold: int = 512):
+    """
+    Portfolio trajectory for cohorts planted on `schedule` (trees per year from year 0), given a
+    single-cohort per-tree curve indexed by age: out[t] = sum_k schedule[k] * per_tree[t - k].
+    Returns the first `n` entries. Long horizons switch to FFT convolution.
+    """
+    schedule = np.asarray(schedule, dtype=float)[:n]
+    per_tree = np.asarray(per_tree, dtype=float)[:n]
+    if min(len(schedule), len(per_tree)) >= fft_threshold:
+        from scipy.signal import fftconvolve
+        return fftconvolve(schedule, per_tree)[:n]
+    return np.convolve(schedule, per_tree)[:n]
+
+
+def replanting_schedule(schedule, p_year1: float, n: int):
+    """
+    Effective planting per year when every cohort's first-year losses are replanted the following year
+    (replacements are replanted too): e[k] = s[k] + (1 - p_year1) * e[k - 1], i.e. s convolved with a geometric kernel.
+    """
+    padded = np.zeros(n)
+    schedule = np.asarray(schedule, dtype=float)[:n]
+    padded[: len(schedule)] = schedule
+    kernel = (1.0 - p_year1) ** np.arange(n)
+    return convolve_cohorts(padded, kernel, n)
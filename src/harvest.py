@@ -0,0 +1,191 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .curve_cache import GrowthCurve
+from .data_models import Scenario, parse_ages
+from .growth_models import convolve_cohorts
+
+
+@dataclass(frozen=True)
+class StandCycle:
+    """
+    Where each step of a managed cohort sits in its rotation, for flattened (scenario, step) rows.
+
+    - age: stand age in steps after any removal at that step (0 right after a clear-fell and replanting)
+    - kept: share of the cohort left by this rotation's thinnings so far, so living = planted * S(age) * kept
+    - removed: share of the cohort cut at this step, valued at cut_age: removed trees = planted * S(cut_age) * removed
+    - cut_age: stand age of the cut trees (the rotation length for a clear-fell, the stand age for a thinning)
+    """
+    age: np.ndarray
+    kept: np.ndarray
+    removed: np.ndarray
+    cut_age: np.ndarray
+
+
+def stand_cycle(step, rotation_steps, thinning_fraction, thin_rows=None, thin_steps=None, row_ids=None) -> StandCycle:
+    """
+    StandCycle for rows at `step` (steps since planting). `rotation_steps` is per row, 0 for no clear-fell;
+    thinnings are given as pairs (thin_rows, thin_steps): the scenario id (matching `row_ids`) and stand age
+    in steps of each thinning. Thinnings at or beyond the rotation length are ignored.
+    """
+    step = np.asarray(step, dtype=np.int64)
+    rotation = np.broadcast_to(np.asarray(rotation_steps, dtype=np.int64), step.shape)
+    f = np.broadcast_to(np.asarray(thinning_fraction, dtype=float), step.shape)
+    row_ids = np.zeros(step.shape, dtype=np.int64) if row_ids is None else np.asarray(row_ids, dtype=np.int64)
+
+    rotating = rotation > 0
+    period = np.where(rotating, rotation, 1)
+    age = np.where(rotating, step % period, step)
+    harvest = rotating & (step > 0) & (age == 0)
+
+    if thin_steps is None or len(thin_steps) == 0:
+        n_le = n_before_cut = np.zeros(step.shape, dtype=np.int64)
+        thinned = np.zeros(step.shape, dtype=bool)
+    else:
+        # Count each row's thinnings at ages <= a with one searchsorted over (scenario, age) keys
+        span = int(max(step.max(initial=0), np.max(thin_steps))) + 2
+        keys = np.unique(np.asarray(thin_rows, dtype=np.int64) * span + np.asarray(thin_steps, dtype=np.int64))
+        first = np.searchsorted(keys, row_ids * span, side="left")
+
+        def count_le(a: np.ndarray) -> np.ndarray:
+            return np.searchsorted(keys, row_ids * span + a, side="right") - first
+
+        limit = np.where(rotating, rotation - 1, span - 1)
+        n_le = count_le(np.minimum(age, limit))
+        thinned = (age > 0) & (age <= limit) & (n_le > count_le(np.maximum(age - 1, 0)))
+        n_before_cut = count_le(limit)
+    keep = 1.0 - f
+    kept = np.power(keep, n_le)
+    removed = np.where(harvest, np.power(keep, n_before_cut), np.where(thinned, np.power(keep, n_le - 1) * f, 0.0))
+    cut_age = np.where(harvest, rotation, np.where(thinned, age, 0))
+    return StandCycle(age=age, kept=kept, removed=removed, cut_age=cut_age)
+
+
+def decay_kernel(half_life_years, n: int, steps_per_year: int = 1) -> np.ndarray:
+    """
+    Share of a pool input still present after 0..n-1 steps under first-order decay. Broadcasts over
+    an array of half-lives (one kernel row each).
+    """
+    half_life = np.asarray(half_life_years, dtype=float)
+    return np.power(0.5, np.arange(n) / (half_life[..., None] * steps_per_year))
+
+
+def pool_stock(inflow, half_life_years, steps_per_year: int = 1) -> np.ndarray:
+    """
+    Stock of a first-order decaying pool fed by `inflow` per step: stock[t] = sum_s inflow[s] * kernel[t - s],
+    i.e. inflow convolved with decay_kernel. A 2-D inflow (series, steps) is convolved row by row in one
+    FFT call, with one half-life per row.
+    """
+    inflow = np.asarray(inflow, dtype=float)
+    n = inflow.shape[-1]
+    kernel = decay_kernel(half_life_years, n, steps_per_year)
+    if inflow.ndim == 1:
+        return convolve_cohorts(inflow, kernel, n)
+    from scipy.signal import fftconvolve
+    kernel = np.broadcast_to(kernel, inflow.shape)
+    # FFT round-off can leave tiny negatives where the true stock is zero
+    return np.maximum(fftconvolve(inflow, kernel, axes=-1)[..., :n], 0.0)
+
+
+def carbon_pools(removed_above_tco2, removed_below_tco2, living_tco2, product_fraction, product_half_life_years,
+                 deadwood_half_life_years, steps_per_year: int = 1) -> dict[str, np.ndarray]:
+    """
+    MANAGEMENT_FIELDS columns from removals per step. `product_fraction` of the removed above-ground biomass
+    becomes harvested wood products; the rest of it and all below-ground biomass (stumps, roots, slash) is
+    dead wood. Inputs are 1-D series or (series, steps) arrays with per-series parameters.
+    """
+    above = np.asarray(removed_above_tco2, dtype=float)
+    below = np.asarray(removed_below_tco2, dtype=float)
+    share = np.asarray(product_fraction, dtype=float)
+    if above.ndim == 2:
+        share = np.broadcast_to(share, above.shape[:1])[:, None]
+    products = pool_stock(above * share, product_half_life_years, steps_per_year)
+    deadwood = pool_stock(above * (1.0 - share) + below, deadwood_half_life_years, steps_per_year)
+    return {
+        "removed_co2_tons": above + below,
+        "products_co2_tons": products,
+        "deadwood_co2_tons": deadwood,
+        "stored_co2_tons": living_tco2 + products + deadwood,
+    }
+
+
+def above_share(above_kg, below_kg) -> np.ndarray:
+    total = np.asarray(above_kg) + np.asarray(below_kg)
+    return np.divide(above_kg, total, out=np.ones_like(total, dtype=float), where=total > 0)
+
+
+def thinning_steps(thinning_ages: Optional[list[float]], steps_per_year: int = 1) -> np.ndarray:
+    steps = np.round(np.asarray(thinning_ages or [], dtype=float) * steps_per_year).astype(np.int64)
+    return steps[steps > 0]
+
+
+def managed_cohort(curve: GrowthCurve, survival: np.ndarray, scenario: Scenario) -> tuple[GrowthCurve, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-planted-tree series of a managed single cohort from its unmanaged curves over the same grid:
+    (per-tree curves at the stand age, living share, removed above-ground tCO2, removed below-ground tCO2).
+    Everything is an index into the input curves, so rotations cost no extra growth evaluations.
+    """
+    steps = scenario.steps_per_year
+    thin = thinning_steps(scenario.thinning_ages, steps)
+    cycle = stand_cycle(np.arange(len(survival)), (scenario.rotation_years or 0) * steps, scenario.thinning_fraction,
+                        np.zeros(len(thin), dtype=np.int64), thin)
+    a, c = cycle.age, cycle.cut_age
+    managed = GrowthCurve(curve.above_kg[a], curve.below_kg[a], curve.carbon_kg[a], curve.co2_kg[a])
+    removed_tco2 = survival[c] * cycle.removed * curve.co2_kg[c] / 1000.0
+    share = above_share(curve.above_kg[c], curve.below_kg[c])
+    return managed, survival[a] * cycle.kept, removed_tco2 * share, removed_tco2 * (1.0 - share)
+
+
+@dataclass(frozen=True)
+class ManagementTable:
+    """
+    Management columns of a scenarios table as arrays (defaults from Scenario where a column is absent),
+    with thinnings flattened to (scenario row, age) pairs.
+    """
+    managed: np.ndarray
+    rotation_years: np.ndarray
+    thinning_fraction: np.ndarray
+    product_fraction: np.ndarray
+    product_half_life_years: np.ndarray
+    deadwood_half_life_years: np.ndarray
+    thin_rows: np.ndarray
+    thin_ages: np.ndarray
+
+    @classmethod
+    def from_frame(cls, scenarios_df: pd.DataFrame) -> Optional["ManagementTable"]:
+        """
+        None when no row has a rotation or thinnings.
+        """
+        n = len(scenarios_df)
+
+        def column(name: str) -> np.ndarray:
+            default = Scenario.model_fields[name].default
+            if name not in scenarios_df:
+                return np.full(n, np.nan if default is None else default, dtype=float)
+            values = pd.to_numeric(scenarios_df[name], errors="raise").to_numpy(dtype=float)
+            return values if default is None else np.where(np.isnan(values), default, values)
+
+        rotation = column("rotation_years")
+        if "thinning_ages" in scenarios_df:
+            ages = pd.Series([parse_ages(v) for v in scenarios_df["thinning_ages"]], dtype=object).explode().dropna()
+            thin_rows, thin_ages = ages.index.to_numpy(dtype=np.int64), ages.to_numpy(dtype=float)
+        else:
+            thin_rows, thin_ages = np.empty(0, dtype=np.int64), np.empty(0)
+        managed = ~np.isnan(rotation)
+        managed[thin_rows] = True
+        if not managed.any():
+            return None
+        return cls(
+            managed=managed,
+            rotation_years=np.nan_to_num(rotation, nan=0.0).astype(np.int64),
+            thinning_fraction=column("thinning_fraction"),
+            product_fraction=column("product_fraction"),
+            product_half_life_years=column("product_half_life_years"),
+            deadwood_half_life_years=column("deadwood_half_life_years"),
+            thin_rows=thin_rows,
+            thin_ages=thin_ages,
+        )
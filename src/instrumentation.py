@@ -0,0 +1,245 @@
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from functools import wraps
+from pathlib import Path
+from typing import Optional, Union
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# The active Profiler, or None. Every hook checks this one global first, so with profiling off a stage
+# costs a function call returning a shared no-op context manager and a counter costs a single comparison.
+_ACTIVE: Optional["Profiler"] = None
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    # With allocation tracking: net bytes still allocated at exit, and the peak above the entry level
+    net_bytes: int = 0
+    peak_bytes: int = 0
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start", "mem_start", "child_peak")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        p = self.profiler
+        if p.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if p._stack:
+                parent = p._stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+            self.child_peak = 0
+        p._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        p = self.profiler
+        p._stack.pop()
+        stats = p.stages.get(self.name)
+        if stats is None:
+            stats = p.stages[self.name] = StageStats()
+        elapsed = end - self.start
+        stats.calls += 1
+        stats.total_s += elapsed
+        stats.max_s = max(stats.max_s, elapsed)
+        if p.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.child_peak)
+            stats.net_bytes += current - self.mem_start
+            stats.peak_bytes = max(stats.peak_bytes, peak - self.mem_start)
+            if p._stack:
+                parent = p._stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+        p._record(self.name, self.start, elapsed)
+        return False
+
+
+class Profiler:
+    """
+    Opt-in collector of per-stage wall times, counters and (optionally) tracemalloc allocation figures.
+
+        with Profiler(track_allocations=True) as prof:
+            sim.run_batch(df)
+        prof.write_json("profile.json")
+        prof.write_chrome_trace("trace.json")   # open in chrome://tracing or https://ui.perfetto.dev
+
+    Only one profiler is active at a time (process-wide). Stage events for the Chrome trace are kept up to
+    `max_events`; totals keep counting after that.
+    """
+
+    def __init__(self, track_allocations: bool = False, max_events: int = 1_000_000):
+        self.track_allocations = track_allocations
+        self.max_events = max_events
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, int] = {}
+        self.events: list[tuple[str, float, float, int]] = []
+        self.dropped_events = 0
+        self._stack: list[_Stage] = []
+        self._t0 = 0.0
+        self._wall_s = 0.0
+        self._started_tracemalloc = False
+        self._previous: Optional[Profiler] = None
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self) -> "Profiler":
+        global _ACTIVE
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._previous = _ACTIVE
+        self._t0 = time.perf_counter()
+        _ACTIVE = self
+        return self
+
+    def stop(self) -> None:
+        global _ACTIVE
+        self._wall_s = time.perf_counter() - self._t0
+        _ACTIVE = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _record(self, name: str, start: float, elapsed: float) -> None:
+        if len(self.events) < self.max_events:
+            self.events.append((name, start, elapsed, threading.get_ident()))
+        else:
+            self.dropped_events += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_s": self._wall_s,
+            "stages": {k: asdict(v) for k, v in sorted(self.stages.items(), key=lambda kv: -kv[1].total_s)},
+            "counters": dict(sorted(self.counters.items())),
+            "track_allocations": self.track_allocations,
+            "dropped_events": self.dropped_events,
+        }
+
+    def write_json(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def chrome_trace(self) -> dict:
+        """
+        Trace Event Format: one complete ("X") event per stage call, plus final counter values.
+        """
+        pid = os.getpid()
+        events = [
+            {"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+             "ts": (start - self._t0) * 1e6, "dur": elapsed * 1e6}
+            for name, start, elapsed, tid in self.events
+        ]
+        end_us = self._wall_s * 1e6
+        events += [{"name": name, "ph": "C", "pid": pid, "ts": end_us, "args": {"value": value}}
+                   for name, value in self.counters.items()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.chrome_trace()))
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<32} {'calls':>8} {'total s':>9} {'max ms':>9}" + (f" {'peak MiB':>9}" if self.track_allocations else "")]
+        for name, s in sorted(self.stages.items(), key=lambda kv: -kv[1].total_s):
+            line = f"{name:<32} {s.calls:>8} {s.total_s:>9.3f} {s.max_s * 1e3:>9.2f}"
+            if self.track_allocations:
+                line += f" {s.peak_bytes / 2 ** 20:>9.2f}"
+            lines.append(line)
+        lines += [f"{name:<32} {value:>8}" for name, value in sorted(self.counters.items())]
+        return "\n".join(lines)
+
+
+def stage(name: str):
+    """
+    Context manager timing one stage under the active profiler; a shared no-op when profiling is off.
+    """
+    p = _ACTIVE
+    if p is None:
+        return _NULL_STAGE
+    return _Stage(p, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    p = _ACTIVE
+    if p is not None:
+        p.counters[name] = p.counters.get(name, 0) + int(n)
+
+
+def enabled() -> bool:
+    return _ACTIVE is not None
+
+
+def instrumented(name: str):
+    """
+    Decorator form of stage(): times every call of the wrapped function as `name`.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            p = _ACTIVE
+            if p is None:
+                return fn(*args, **kwargs)
+            with _Stage(p, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_profile_args(parser) -> None:
+    """
+    Add --profile / --trace / --trace-malloc to a script's argparse parser.
+    """
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", type=Path, default=None, help="write per-stage timings and counters as JSON")
+    group.add_argument("--trace", type=Path, default=None, help="write a Chrome trace (chrome://tracing, Perfetto)")
+    group.add_argument("--trace-malloc", action="store_true", help="also track allocations per stage (slower)")
+
+
+def profile_from_args(args) -> Optional[Profiler]:
+    """
+    Start a Profiler when the script was given --profile or --trace; None (nothing enabled) otherwise.
+    """
+    if args.profile is None and args.trace is None:
+        return None
+    return Profiler(track_allocations=args.trace_malloc).start()
+
+
+def finish_profile(prof: Optional[Profiler], args) -> None:
+    if prof is None:
+        return
+    prof.stop()
+    if args.profile is not None:
+        prof.write_json(args.profile)
+    if args.trace is not None:
+        prof.write_chrome_trace(args.trace)
+    print(prof.summary())
@@ -0,0 +1,212 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_models import co2_from_carbon_kg
+from .growth_models import species_biomass, survival_array
+
+if TYPE_CHECKING:
+    from .simulator import Simulator
+
+Method = Literal["lp", "greedy"]
+
+
+@dataclass
+class Allocation:
+    """
+    Optimizer result. `table` has one row per funded (species, region) pair with trees_planted,
+    cost and tco2 at the horizon; totals are over the whole allocation.
+    """
+    table: pd.DataFrame
+    horizon: int
+    total_tco2: float
+    total_cost: float
+    method: str
+
+    def to_scenarios(self, prefix: str = "opt") -> pd.DataFrame:
+        """
+        The allocation as a scenarios table (data/scenarios.csv columns) for Simulator.run_batch.
+        """
+        t = self.table[self.table["trees_planted"] > 0]
+        return pd.DataFrame({
+            "scenario": [f"{prefix}-{s}-{r}" for s, r in zip(t["species"], t["region"])],
+            "species": t["species"].to_numpy(),
+            "region": t["region"].to_numpy(),
+            "trees_planted": t["trees_planted"].to_numpy(dtype=np.int64),
+            "years": self.horizon,
+        })
+
+
+def per_tree_tco2_at(sim: "Simulator", species, region, horizon: int) -> np.ndarray:
+    """
+    Expected tCO2 per planted tree at `horizon` for aligned arrays of species and region names,
+    evaluated in one array pass (no per-pair simulations).
+    """
+    sp_codes, sp_names = pd.factorize(pd.Series(species, dtype=object))
+    rg_codes, rg_names = pd.factorize(pd.Series(region, dtype=object))
+    sps = [sim.species[n] for n in sp_names]
+    rgs = [sim.regions[n] for n in rg_names]
+
+    def col(items, attr, codes):
+        return np.array([getattr(x, attr) for x in items], dtype=float)[codes]
+
+    models = np.array([sp.growth_model for sp in sps], dtype=object)[sp_codes]
+    shape = np.array([np.nan if sp.growth_shape is None else sp.growth_shape for sp in sps])[sp_codes]
+    above = species_biomass(
+        models,
+        col(sps, "K_biomass_kg", sp_codes),
+        col(sps, "r_growth", sp_codes) * col(rgs, "climate_factor", rg_codes),
+        col(sps, "t0_inflection", sp_codes),
+        horizon,
+        shape,
+    )
+    co2_kg = co2_from_carbon_kg((above + above * col(sps, "root_shoot_ratio", sp_codes)) * col(sps, "carbon_fraction", sp_codes))
+    surv = survival_array(1.0, horizon, col(rgs, "survival_rate_year1", rg_codes), col(rgs, "annual_mortality_rate", rg_codes))
+    return surv * co2_kg / 1000.0
+
+
+def _caps(limits, keys: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Group codes for `keys` plus a cap per group (inf where no limit is given).
+    """
+    codes, names = pd.factorize(keys)
+    caps = pd.Series(limits if limits is not None else {}, dtype=float).reindex(names).fillna(np.inf).to_numpy()
+    return codes, caps
+
+
+def optimize_portfolio(sim: "Simulator", costs: pd.DataFrame, horizon: int, budget: Optional[float] = None,
+                       target_tco2: Optional[float] = None, region_limits=None, species_limits=None,
+                       method: Method = "lp") -> Allocation:
+    """
+    Allocate trees_planted across (species, region) pairs.
+
+    `costs` lists the allowed pairs with columns species, region, cost_per_tree and optionally max_trees.
+    Give `budget` to maximize tCO2 at `horizon`, or `target_tco2` to reach that total at minimum cost.
+    `region_limits` / `species_limits` map names to the most trees (stems) allowed.
+
+    Total tCO2 is linear in tree counts, so the problem is an LP over one precomputed per-tree value per pair,
+    solved with HiGHS (method="lp") or by filling pairs in order of value per cost (method="greedy",
+    a fast heuristic that is exact when only the budget or target binds).
+    """
+    if (budget is None) == (target_tco2 is None):
+        raise ValueError("give exactly one of budget or target_tco2")
+    pairs = costs.reset_index(drop=True)
+    value = per_tree_tco2_at(sim, pairs["species"], pairs["region"], horizon)
+    cost = pairs["cost_per_tree"].to_numpy(dtype=float)
+    upper = pairs["max_trees"].to_numpy(dtype=float) if "max_trees" in pairs else np.full(len(pairs), np.inf)
+    rg_codes, rg_caps = _caps(region_limits, pairs["region"])
+    sp_codes, sp_caps = _caps(species_limits, pairs["species"])
+
+    if method == "lp":
+        trees = _solve_lp(value, cost, upper, rg_codes, rg_caps, sp_codes, sp_caps, budget, target_tco2)
+    elif method == "greedy":
+        trees = _solve_greedy(value, cost, upper, rg_codes, rg_caps, sp_codes, sp_caps, budget, target_tco2)
+    else:
+        raise ValueError(f"unknown method: {method}")
+
+    # Whole trees: round down so the budget and every cap still hold, then top a target back up
+    trees = np.floor(trees + 1e-9)
+    if target_tco2 is not None:
+        trees = _top_up(trees, value, cost, upper, rg_codes, rg_caps, sp_codes, sp_caps, target_tco2)
+    table = pd.DataFrame({
+        "species": pairs["species"].to_numpy(),
+        "region": pairs["region"].to_numpy(),
+        "trees_planted": trees.astype(np.int64),
+        "cost": trees * cost,
+        "tco2": trees * value,
+        "tco2_per_tree": value,
+    })
+    table = table[table["trees_planted"] > 0].sort_values("tco2", ascending=False).reset_index(drop=True)
+    return Allocation(table, horizon, float(table["tco2"].sum()), float(table["cost"].sum()), method)
+
+
+def _solve_lp(value, cost, upper, rg_codes, rg_caps, sp_codes, sp_caps, budget, target_tco2) -> np.ndarray:
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_matrix, vstack
+
+    n = len(value)
+    cols = np.arange(n)
+    rows = []
+    rhs = []
+    for codes, caps in ((rg_codes, rg_caps), (sp_codes, sp_caps)):
+        limited = np.isfinite(caps)
+        if limited.any():
+            keep = limited[codes]
+            remap = np.cumsum(limited) - 1
+            rows.append(csr_matrix((np.ones(keep.sum()), (remap[codes[keep]], cols[keep])), shape=(int(limited.sum()), n)))
+            rhs.append(caps[limited])
+    if budget is not None:
+        c = -value
+        rows.append(csr_matrix(cost[None, :]))
+        rhs.append([budget])
+    else:
+        c = cost
+        rows.append(csr_matrix(-value[None, :]))
+        rhs.append([-target_tco2])
+    res = linprog(
+        c,
+        A_ub=vstack(rows).tocsr(),
+        b_ub=np.concatenate([np.asarray(r, dtype=float) for r in rhs]),
+        bounds=np.column_stack([np.zeros(n), np.where(np.isfinite(upper), upper, np.inf)]),
+        method="highs",
+    )
+    if res.status != 0:
+        raise ValueError(f"portfolio LP failed: {res.message}")
+    return res.x
+
+
+def _solve_greedy(value, cost, upper, rg_codes, rg_caps, sp_codes, sp_caps, budget, target_tco2) -> np.ndarray:
+    trees = np.zeros(len(value))
+    rg_left = rg_caps.copy()
+    sp_left = sp_caps.copy()
+    with np.errstate(divide="ignore"):
+        ratio = value / cost
+    remaining = budget if budget is not None else target_tco2
+    for p in np.argsort(-ratio, kind="stable"):
+        if remaining <= 0:
+            break
+        if value[p] <= 0:
+            continue
+        per_unit = cost[p] if budget is not None else value[p]
+        n = min(upper[p], rg_left[rg_codes[p]], sp_left[sp_codes[p]], remaining / per_unit)
+        if n <= 0:
+            continue
+        trees[p] = n
+        rg_left[rg_codes[p]] -= n
+        sp_left[sp_codes[p]] -= n
+        remaining -= n * per_unit
+    if target_tco2 is not None and remaining > 1e-9 * max(target_tco2, 1.0):
+        raise ValueError("target_tco2 cannot be reached within the given limits")
+    return trees
+
+
+def _top_up(trees, value, cost, upper, rg_codes, rg_caps, sp_codes, sp_caps, target_tco2) -> np.ndarray:
+    """
+    Add whole trees to a rounded-down allocation until it reaches `target_tco2`, filling the cheapest
+    tCO2 first and never exceeding a pair's max_trees or a region/species cap.
+    """
+    trees = trees.copy()
+    rg_left = rg_caps - np.bincount(rg_codes, weights=trees, minlength=len(rg_caps))
+    sp_left = sp_caps - np.bincount(sp_codes, weights=trees, minlength=len(sp_caps))
+    short = target_tco2 - float(trees @ value)
+    with np.errstate(divide="ignore"):
+        ratio = value / cost
+    for p in np.argsort(-ratio, kind="stable"):
+        if short <= 1e-9 * max(target_tco2, 1.0):
+            break
+        if value[p] <= 0:
+            continue
+        room = np.floor(min(upper[p] - trees[p], rg_left[rg_codes[p]], sp_left[sp_codes[p]]) + 1e-9)
+        n = min(room, np.ceil(short / value[p] - 1e-9))
+        if n <= 0:
+            continue
+        trees[p] += n
+        rg_left[rg_codes[p]] -= n
+        sp_left[sp_codes[p]] -= n
+        short -= n * value[p]
+    if short > 1e-9 * max(target_tco2, 1.0):
+        raise ValueError("target_tco2 cannot be reached with whole trees within the given limits")
+    return trees
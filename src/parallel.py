@@ -0,0 +1,136 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import multiprocessing as mp
+import os
+import time
+import traceback
+
+import pandas as pd
+
+from .simulator import Simulator
+
+# Per-process state. With the fork start method these are set in the parent right before the pool
+# starts, so workers inherit the parameter tables and the scenario table instead of receiving pickles.
+_WORKER_SIM: Optional[Simulator] = None
+_WORKER_SCENARIOS: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class ShardReport:
+    shard: int
+    start: int
+    stop: int
+    n_rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ParallelResult:
+    frame: pd.DataFrame
+    shards: list[ShardReport] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list[ShardReport]:
+        return [s for s in self.shards if not s.ok]
+
+
+class PortfolioError(RuntimeError):
+    def __init__(self, failed: list[ShardReport]):
+        self.failed = failed
+        lines = [f"shard {s.shard} (rows {s.start}:{s.stop}): {s.error.strip().splitlines()[-1]}" for s in failed]
+        super().__init__(f"{len(failed)} shard(s) failed:\n" + "\n".join(lines))
+
+
+def shard_ranges(n_rows: int, shard_size: int) -> list[tuple[int, int]]:
+    return [(start, min(start + shard_size, n_rows)) for start in range(0, n_rows, shard_size)]
+
+
+def _init_worker(sim: Optional[Simulator], scenarios: Optional[pd.DataFrame]) -> None:
+    global _WORKER_SIM, _WORKER_SCENARIOS
+    if sim is not None:
+        _WORKER_SIM = sim
+    if scenarios is not None:
+        _WORKER_SCENARIOS = scenarios
+
+
+def _run_shard(shard: int, start: int, stop: int, rows: Optional[pd.DataFrame] = None):
+    report = ShardReport(shard=shard, start=start, stop=stop)
+    t = time.perf_counter()
+    frame = None
+    try:
+        if rows is None:
+            rows = _WORKER_SCENARIOS.iloc[start:stop]
+        frame = _WORKER_SIM.run_batch(rows)
+        report.n_rows = len(frame)
+    except Exception:
+        report.error = traceback.format_exc()
+    report.seconds = time.perf_counter() - t
+    return report, frame
+
+
+def run_parallel(sim: Simulator, scenarios_df: pd.DataFrame, n_workers: Optional[int] = None, shard_size: int = 10_000,
+                 progress: Optional[Callable[[ShardReport], None]] = None, raise_on_error: bool = True) -> ParallelResult:
+    """
+    Split a scenarios table into shards of `shard_size` rows and run them through Simulator.run_batch
+    on a process pool. Output rows follow the input order regardless of completion order.
+    `progress` is called with each ShardReport as shards finish. Failed shards are collected; with
+    raise_on_error a PortfolioError lists them, otherwise the successful shards are returned.
+    """
+    global _WORKER_SIM, _WORKER_SCENARIOS
+    t_start = time.perf_counter()
+    scenarios_df = scenarios_df.reset_index(drop=True)
+    n_workers = n_workers or os.cpu_count() or 1
+    ranges = shard_ranges(len(scenarios_df), shard_size)
+    results: list[Optional[tuple[ShardReport, Optional[pd.DataFrame]]]] = [None] * len(ranges)
+
+    def record(i: int, outcome) -> None:
+        results[i] = outcome
+        if progress is not None:
+            progress(outcome[0])
+
+    try:
+        if n_workers == 1 or len(ranges) <= 1:
+            _init_worker(sim, scenarios_df)
+            for i, (start, stop) in enumerate(ranges):
+                record(i, _run_shard(i, start, stop))
+        else:
+            forked = "fork" in mp.get_all_start_methods()
+            ctx = mp.get_context("fork" if forked else None)
+            if forked:
+                # Children inherit these globals; tasks then carry only (shard, start, stop)
+                _init_worker(sim, scenarios_df)
+                initargs = (None, None)
+            else:
+                initargs = (sim, None)
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx, initializer=_init_worker, initargs=initargs) as pool:
+                futures = {
+                    pool.submit(_run_shard, i, start, stop, None if forked else scenarios_df.iloc[start:stop]): i
+                    for i, (start, stop) in enumerate(ranges)
+                }
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    try:
+                        outcome = fut.result()
+                    except Exception:
+                        start, stop = ranges[i]
+                        outcome = (ShardReport(shard=i, start=start, stop=stop, error=traceback.format_exc()), None)
+                    record(i, outcome)
+    finally:
+        _WORKER_SIM = None
+        _WORKER_SCENARIOS = None
+
+    reports = [r for r, _ in results]
+    failed = [r for r in reports if not r.ok]
+    if failed and raise_on_error:
+        raise PortfolioError(failed)
+    frames = [f for _, f in results if f is not None]
+    frame = pd.concat(frames, ignore_index=True) if frames else sim.run_batch(scenarios_df.iloc[0:0])
+    return ParallelResult(frame=frame, shards=reports, seconds=time.perf_counter() - t_start)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from .data_models import SpeciesParams, RegionParams, validate_frame
+from .growth_models import GROWTH_MODELS
+from .instrumentation import instrumented, stage
+
+
+class ParameterTable(Mapping):
+    """
+    Columnar catalog of one parameter model (SpeciesParams or RegionParams).
+
+    Each field is a typed NumPy array (float64 / int64, object for strings, NaN for unset optionals) and
+    rows have integer ids 0..n-1 with a name -> id index, so batch code gathers parameters by id instead of
+    hashing names per scenario. As a Mapping it still returns model instances by name; those are built
+    on first access without re-validation, since the columns were validated in bulk on load.
+    """
+
+    def __init__(self, model: type[BaseModel], key: str, columns: dict[str, np.ndarray]):
+        self.model = model
+        self.key = key
+        self.columns = columns
+        self.names = columns[key]
+        self.index = pd.Index(self.names)
+        if not self.index.is_unique:
+            dupes = self.index[self.index.duplicated()].unique().tolist()
+            raise ValueError(f"duplicate {key} names: {dupes[:5]}")
+        self._rows: dict[int, BaseModel] = {}
+
+    @classmethod
+    def from_frame(cls, model: type[BaseModel], key: str, df: pd.DataFrame) -> "ParameterTable":
+        """
+        Validate `df` column-wise against `model` (see data_models.validate_frame), fill defaults for
+        optional columns that are absent or blank, and store the result as arrays.
+        """
+        valid = validate_frame(model, df.reset_index(drop=True))
+        columns = {}
+        for name, info in model.model_fields.items():
+            if name in valid and not info.is_required() and info.default is not None:
+                values = valid[name].fillna(info.default)
+            elif name in valid:
+                values = valid[name]
+            else:
+                values = pd.Series(np.nan if info.default is None else info.default, index=valid.index)
+            dtype = object if values.dtype == object or pd.api.types.is_string_dtype(values) else None
+            columns[name] = values.to_numpy(dtype=dtype)
+        return cls(model, key, columns)
+
+    @classmethod
+    def from_models(cls, model: type[BaseModel], key: str, items) -> "ParameterTable":
+        """
+        Table over already-validated model instances (e.g. the values of a name -> params dict).
+        """
+        items = list(items)
+        columns = {}
+        for name, info in model.model_fields.items():
+            values = [getattr(x, name) for x in items]
+            if info.annotation is str:
+                columns[name] = np.array(values, dtype=object)
+            else:
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        table = cls(model, key, columns)
+        table._rows = dict(enumerate(items))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.index
+
+    def __getitem__(self, name: str) -> BaseModel:
+        i = self.index.get_indexer([name])[0]
+        if i < 0:
+            raise KeyError(name)
+        return self.row(int(i))
+
+    def ids(self, names) -> np.ndarray:
+        """
+        Integer ids for an array of names in one vectorized lookup; raises KeyError on unknown names.
+        """
+        ids = self.index.get_indexer(pd.Index(np.asarray(names, dtype=object)))
+        if (ids < 0).any():
+            unknown = pd.unique(np.asarray(names, dtype=object)[ids < 0])
+            raise KeyError(f"unknown {self.key}: {list(unknown[:5])}")
+        return ids
+
+    def row(self, i: int) -> BaseModel:
+        cached = self._rows.get(i)
+        if cached is None:
+            values = {}
+            for name, col in self.columns.items():
+                v = col[i]
+                v = v.item() if isinstance(v, np.generic) else v
+                values[name] = None if isinstance(v, float) and np.isnan(v) else v
+            cached = self._rows[i] = self.model.model_construct(**values)
+        return cached
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, copy=False)
+
+
+def _check_growth_models(table: ParameterTable) -> None:
+    unknown = pd.unique(table.columns["growth_model"][~np.isin(table.columns["growth_model"], list(GROWTH_MODELS))])
+    if len(unknown):
+        raise ValueError(f"unknown growth model(s) {list(unknown[:5])}; registered: {sorted(GROWTH_MODELS)}")
+
+
+def apply_region_overrides(regions_df: pd.DataFrame, overrides_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Overlay `overrides_df` on `regions_df` by region name: non-blank override values replace the base
+    ones and regions only present in the overrides are appended. Accepts regions_calibrated.csv or the
+    recommended_climate_factor column written by scripts/calibrate_regions.py.
+    """
+    overrides = overrides_df.rename(columns={"recommended_climate_factor": "climate_factor"})
+    keep = ["region"] + [c for c in RegionParams.model_fields if c != "region" and c in overrides]
+    base = regions_df.set_index("region")
+    over = overrides[keep].set_index("region")
+    merged = over.combine_first(base)
+    merged = merged.reindex(list(base.index) + [r for r in over.index if r not in base.index])
+    return merged.reset_index()
+
+
+@dataclass
+class ParameterStore:
+    """
+    Species and region catalogs as ParameterTables. Pass it straight to Simulator; see ParameterStore.load.
+    """
+    species: ParameterTable
+    regions: ParameterTable
+
+    @classmethod
+    @instrumented("load.parameters")
+    def from_frames(cls, species_df: pd.DataFrame, regions_df: pd.DataFrame,
+                    region_overrides: Optional[pd.DataFrame] = None) -> "ParameterStore":
+        if region_overrides is not None:
+            regions_df = apply_region_overrides(regions_df, region_overrides)
+        species = ParameterTable.from_frame(SpeciesParams, "species", species_df)
+        _check_growth_models(species)
+        return cls(species, ParameterTable.from_frame(RegionParams, "region", regions_df))
+
+    @classmethod
+    def from_dicts(cls, species: dict[str, SpeciesParams], regions: dict[str, RegionParams]) -> "ParameterStore":
+        return cls(
+            ParameterTable.from_models(SpeciesParams, "species", species.values()),
+            ParameterTable.from_models(RegionParams, "region", regions.values()),
+        )
+
+    @classmethod
+    def load(cls, data_dir: Union[str, Path], overrides: Union[bool, str, Path] = True) -> "ParameterStore":
+        """
+        Read species_params.csv and regions.csv from `data_dir`. With overrides=True, regions_calibrated.csv
+        is overlaid when present; pass a path to overlay a different file, or False to skip.
+        """
+        data_dir = Path(data_dir)
+        with stage("load.read_csv"):
+            region_overrides = None
+            if overrides is True:
+                path = data_dir / "regions_calibrated.csv"
+                region_overrides = pd.read_csv(path) if path.exists() else None
+            elif overrides:
+                region_overrides = pd.read_csv(overrides)
+            species_df = pd.read_csv(data_dir / "species_params.csv")
+            regions_df = pd.read_csv(data_dir / "regions.csv")
+        return cls.from_frames(species_df, regions_df, region_overrides)
+
+
+def indexed(params, names, model: type[BaseModel], key: str) -> tuple[ParameterTable, np.ndarray]:
+    """
+    (table, ids) for an array of names against either a ParameterTable (vectorized id lookup) or a
+    plain name -> params dict (a small table over just the names that occur).
+    """
+    if isinstance(params, ParameterTable):
+        return params, params.ids(names)
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object), sort=False)
+    return ParameterTable.from_models(model, key, [params[n] for n in uniques]), codes
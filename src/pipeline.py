@@ -0,0 +1,247 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .analysis import add_rankings, summarize_results
+from .calibration import DEFAULT_REGION_REF_SPECIES, recommend_region_factors
+from .data_models import Scenario, validate_frame
+from .instrumentation import stage
+from .parameter_store import ParameterStore, ParameterTable
+from .result_store import MODEL_VERSION, content_hash
+from .simulator import Simulator
+
+# Stage -> upstream stages. Each stage reads the files its upstreams write.
+STAGES: dict[str, tuple[str, ...]] = {
+    "calibrate": (),
+    "regions": ("calibrate",),
+    "simulate": ("regions",),
+    "summary": ("simulate",),
+}
+
+
+@dataclass
+class StageReport:
+    stage: str
+    ran: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        def names(items: list[str]) -> str:
+            return ", ".join(items[:5]) + (f", ... (+{len(items) - 5})" if len(items) > 5 else "")
+
+        parts = [f"ran {len(self.ran)}" + (f" [{names(self.ran)}]" if self.ran else ""),
+                 f"skipped {len(self.skipped)}"]
+        if self.removed:
+            parts.append(f"removed {len(self.removed)} [{names(self.removed)}]")
+        return f"{self.stage:<10} {'; '.join(parts)} ({self.seconds:.2f}s)"
+
+
+def _write_if_changed(df: pd.DataFrame, path: Path) -> bool:
+    # Unchanged files keep their mtime, so tools watching data/ or outputs/ only see real changes
+    text = df.to_csv(index=False)
+    if path.exists() and path.read_text() == text:
+        return False
+    path.write_text(text)
+    return True
+
+
+def _row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+class Pipeline:
+    """
+    Incremental data -> calibration -> simulation -> summary pipeline over a data directory laid out
+    like data/ (species_params.csv, regions.csv, stand_benchmarks.csv, scenarios.csv).
+
+    Stages form a DAG (STAGES) and each unit of work is keyed by a content hash of exactly what it
+    reads, stored in `out_dir/.pipeline.json`:
+    - calibrate: per region class, its benchmark rows, the species they resolve to, the reference
+      species, age_years and MODEL_VERSION; only changed classes are recalibrated
+    - regions: regions.csv overlaid with the overrides (cheap, rewritten only when the content changes)
+    - simulate: per scenario, its row plus its species and calibrated region parameters; only changed
+      scenarios are re-simulated and their `<scenario>_yearly.csv` rewritten
+    - summary: summary.csv, reusing the previous rows of scenarios that were not re-simulated
+
+    Unlike run_demo.py, scenarios are simulated against the calibrated regions.
+    """
+
+    def __init__(self, data_dir: Union[str, Path], out_dir: Union[str, Path], age_years: int = 10,
+                 region_ref_species: Optional[dict[str, str]] = None, stems_per_ha: Optional[float] = None,
+                 establishment_kg_co2_per_tree: Optional[float] = None):
+        self.data_dir = Path(data_dir)
+        self.out_dir = Path(out_dir)
+        self.age_years = age_years
+        self.region_ref_species = dict(DEFAULT_REGION_REF_SPECIES if region_ref_species is None else region_ref_species)
+        self.summary_options = {"stems_per_ha": stems_per_ha, "establishment_kg_co2_per_tree": establishment_kg_co2_per_tree}
+        self.manifest_path = self.out_dir / ".pipeline.json"
+        self.overrides_path = self.data_dir / "region_calibration_overrides.csv"
+        self.calibrated_path = self.data_dir / "regions_calibrated.csv"
+        self.summary_path = self.out_dir / "summary.csv"
+        self._resimulated: Optional[set[str]] = None
+
+    def run(self, targets: Optional[Iterable[str]] = None, force: bool = False) -> list[StageReport]:
+        """
+        Bring `targets` (default: every stage) and their upstream stages up to date. force=True ignores the
+        stored hashes and redoes all work. Returns one report per stage run, in execution order.
+        """
+        wanted = set(STAGES) if targets is None else self._with_upstream(targets)
+        manifest = {} if force or not self.manifest_path.exists() else json.loads(self.manifest_path.read_text())
+        if manifest.get("version") != MODEL_VERSION:
+            manifest = {"version": MODEL_VERSION}
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        reports = []
+        for name in TopologicalSorter(STAGES).static_order():
+            if name not in wanted:
+                continue
+            start = time.perf_counter()
+            with stage(f"pipeline.{name}"):
+                report = getattr(self, f"_{name}")(manifest.setdefault(name, {}))
+            report.seconds = time.perf_counter() - start
+            reports.append(report)
+            self._save(manifest)
+        return reports
+
+    def _with_upstream(self, targets: Iterable[str]) -> set[str]:
+        wanted, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in STAGES:
+                raise ValueError(f"unknown stage {name!r}; stages: {list(STAGES)}")
+            if name not in wanted:
+                wanted.add(name)
+                todo.extend(STAGES[name])
+        return wanted
+
+    def _save(self, manifest: dict) -> None:
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n")
+        os.replace(tmp, self.manifest_path)
+
+    def _species(self) -> ParameterTable:
+        return ParameterStore.load(self.data_dir, overrides=False).species
+
+    # Stages ---------------------------------------------------------------
+
+    def _calibrate(self, state: dict) -> StageReport:
+        report = StageReport("calibrate")
+        species = self._species()
+        bench = pd.read_csv(self.data_dir / "stand_benchmarks.csv")
+        columns = ["region", "recommended_climate_factor", "n_benchmarks"]
+        if not self.overrides_path.exists():
+            state.clear()
+        previous = pd.read_csv(self.overrides_path) if self.overrides_path.exists() else pd.DataFrame(columns=columns)
+        previous = previous.set_index("region")
+
+        hashes, dirty = {}, []
+        for region, rows in bench.groupby("region_class", sort=True):
+            keys = rows["species_group"].where(rows["species_group"].isin(list(species)), self.region_ref_species.get(region))
+            hashes[region] = content_hash({
+                "version": MODEL_VERSION,
+                "age_years": self.age_years,
+                "reference": self.region_ref_species.get(region),
+                "rows": rows.drop(columns="region_class").to_dict(orient="records"),
+                "species": {k: species[k].model_dump() for k in sorted(set(keys.dropna())) if k in species},
+            })
+            if state.get(region) != hashes[region]:
+                dirty.append(region)
+            else:
+                report.skipped.append(region)
+        report.ran = dirty
+        report.removed = sorted(set(state) - set(hashes))
+
+        # Classes without usable benchmarks have no overrides row to keep
+        kept = [r for r in report.skipped if r in previous.index]
+        parts = [previous.loc[kept].reset_index()[columns]] if kept else []
+        if dirty:
+            parts.append(recommend_region_factors(species, bench[bench["region_class"].isin(dirty)],
+                                                  self.region_ref_species, age_years=self.age_years)[columns])
+        overrides = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+        _write_if_changed(overrides.sort_values("region", ignore_index=True), self.overrides_path)
+        state.clear()
+        state.update(hashes)
+        return report
+
+    def _regions(self, state: dict) -> StageReport:
+        report = StageReport("regions")
+        regions = pd.read_csv(self.data_dir / "regions.csv")
+        overrides = pd.read_csv(self.overrides_path)
+        calibrated = regions.merge(overrides[["region", "recommended_climate_factor"]], on="region", how="left")
+        calibrated["climate_factor"] = calibrated.pop("recommended_climate_factor").fillna(calibrated["climate_factor"])
+        (report.ran if _write_if_changed(calibrated, self.calibrated_path) else report.skipped).append(self.calibrated_path.name)
+        return report
+
+    def _simulate(self, state: dict) -> StageReport:
+        report = StageReport("simulate")
+        store = ParameterStore.from_frames(pd.read_csv(self.data_dir / "species_params.csv"), pd.read_csv(self.calibrated_path))
+        scenarios = validate_frame(Scenario, pd.read_csv(self.data_dir / "scenarios.csv"))
+        sp = store.species.frame().iloc[store.species.ids(scenarios["species"])].add_prefix("species.")
+        rg = store.regions.frame().iloc[store.regions.ids(scenarios["region"])].add_prefix("region.")
+        key_frame = pd.concat([scenarios.reset_index(drop=True), sp.reset_index(drop=True), rg.reset_index(drop=True)], axis=1)
+        key_frame["version"] = MODEL_VERSION
+        hashes = dict(zip(scenarios["scenario"], (f"{h:016x}" for h in _row_hashes(key_frame.astype(str)))))
+
+        names = scenarios["scenario"].to_numpy()
+        changed = np.array([state.get(n) != hashes[n] or not self._yearly_path(n).exists() for n in names], dtype=bool)
+        report.ran = list(names[changed])
+        report.skipped = list(names[~changed])
+        report.removed = sorted(set(state) - set(hashes))
+        for name in report.removed:
+            self._yearly_path(name).unlink(missing_ok=True)
+
+        todo = scenarios[changed]
+        if len(todo):
+            sim = Simulator(store)
+            cohort = todo["planting_schedule"].isna() if "planting_schedule" in todo else pd.Series(True, index=todo.index)
+            if cohort.any():
+                yearly = sim.run_batch(todo[cohort])
+                for name, df in yearly.groupby("scenario", sort=False):
+                    self._write_yearly(name, df.drop(columns="scenario"))
+            for row in todo[~cohort].to_dict(orient="records"):
+                self._write_yearly(row["scenario"], sim.run(Scenario.from_row(row)).to_dataframe())
+        self._resimulated = set(report.ran)
+        state.clear()
+        state.update(hashes)
+        return report
+
+    def _yearly_path(self, scenario: str) -> Path:
+        return self.out_dir / f"{scenario}_yearly.csv"
+
+    def _write_yearly(self, scenario: str, df: pd.DataFrame) -> None:
+        df.to_csv(self._yearly_path(scenario), index=False)
+
+    def _summary(self, state: dict) -> StageReport:
+        report = StageReport("summary")
+        scenarios = pd.read_csv(self.data_dir / "scenarios.csv")["scenario"]
+        options = content_hash(self.summary_options)
+        previous = None
+        if state.get("options") == options and self.summary_path.exists():
+            previous = pd.read_csv(self.summary_path).set_index("scenario")
+        stale = self._resimulated or set()
+        reuse = [s for s in scenarios if previous is not None and s in previous.index and s not in stale]
+        reused = set(reuse)
+        todo = [s for s in scenarios if s not in reused]
+        report.ran, report.skipped = todo, reuse
+        if not todo and previous is not None and len(previous) == len(scenarios):
+            return report
+
+        fresh = []
+        if todo:
+            yearly = pd.concat([pd.read_csv(self._yearly_path(s)).assign(scenario=s) for s in todo], ignore_index=True)
+            fresh.append(summarize_results(yearly, rank=False, **self.summary_options))
+        if reuse:
+            fresh.append(previous.loc[reuse].reset_index().drop(columns=["rank_final_co2", "rank_avg_rate"]))
+        summary = pd.concat(fresh, ignore_index=True).set_index("scenario").loc[list(scenarios)].reset_index()
+        _write_if_changed(add_rankings(summary), self.summary_path)
+        state["options"] = options
+        return report
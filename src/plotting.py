@@ -1,26 +1,128 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-sns.set(style="whitegrid")
+from .instrumentation import instrumented
 
+# matplotlib and seaborn are imported on first use so headless batch jobs that never draw skip their startup cost
+_STYLED = False
 
-def plot_total_co2(df: pd.DataFrame, title: str = "Total CO₂ (tons)"):
+# (column, y label, default title) for each supported chart
+CHARTS = {
+    "total_co2": ("total_co2_tons", "CO₂ (tons)", "Total CO₂ (tons)"),
+    "per_tree_co2": ("co2_kg_per_tree", "CO₂ per tree (kg)", "Per-tree CO₂ (kg)"),
+}
+
+
+def _pyplot():
+    global _STYLED
+    import matplotlib.pyplot as plt
+
+    if not _STYLED:
+        import seaborn as sns
+
+        sns.set(style="whitegrid")
+        _STYLED = True
+    return plt
+
+
+def _line_chart(df: pd.DataFrame, chart: str, title: Optional[str]):
+    import seaborn as sns
+
+    plt = _pyplot()
+    column, ylabel, default_title = CHARTS[chart]
     plt.figure(figsize=(8, 4))
-    sns.lineplot(data=df, x="year", y="total_co2_tons")
-    plt.title(title)
+    sns.lineplot(data=df, x="year", y=column)
+    plt.title(title or default_title)
     plt.xlabel("Year")
-    plt.ylabel("CO₂ (tons)")
+    plt.ylabel(ylabel)
     plt.tight_layout()
     return plt.gcf()
 
 
+def plot_total_co2(df: pd.DataFrame, title: str = "Total CO₂ (tons)"):
+    """
+    New pyplot figure of total_co2_tons by year. Close it (plt.close(fig)) when done; for many
+    scenarios use FigureRenderer, which does not accumulate figures.
+    """
+    return _line_chart(df, "total_co2", title)
+
+
 def plot_per_tree_co2(df: pd.DataFrame, title: str = "Per-tree CO₂ (kg)"):
-    plt.figure(figsize=(8, 4))
-    sns.lineplot(data=df, x="year", y="co2_kg_per_tree")
-    plt.title(title)
-    plt.xlabel("Year")
-    plt.ylabel("CO₂ per tree (kg)")
-    plt.tight_layout()
-    return plt.gcf()
+    return _line_chart(df, "per_tree_co2", title)
+
+
+class FigureRenderer:
+    """
+    Writes line-chart PNGs for many scenarios through one Agg figure and canvas.
+
+    The figure lives outside pyplot's registry and its axes and line are reused between renders
+    (only the data, limits and title change), so memory stays flat however many files are written.
+    Each render is one Agg draw whose pixel buffer is written straight to PNG; savefig would draw twice.
+    """
+
+    def __init__(self, chart: str = "total_co2", figsize=(8, 4), dpi: int = 150, compress_level: int = 6):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        _pyplot()  # apply the shared style before the axes are created
+        self.column, ylabel, self.default_title = CHARTS[chart]
+        self.compress_level = compress_level
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        (self.line,) = self.ax.plot([], [])
+        self.ax.set_xlabel("Year")
+        self.ax.set_ylabel(ylabel)
+        self._laid_out = False
+
+    @instrumented("plot.render")
+    def render(self, df: pd.DataFrame, path: Union[str, Path], title: Optional[str] = None) -> Path:
+        from PIL import Image
+
+        self.line.set_data(df["year"].to_numpy(), df[self.column].to_numpy())
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(title or self.default_title)
+        if not self._laid_out:
+            # Margins depend only on the labels, so one layout pass serves every render
+            self.figure.tight_layout()
+            self._laid_out = True
+        self.canvas.draw()
+        size = self.canvas.get_width_height()
+        Image.frombuffer("RGBA", size, self.canvas.buffer_rgba(), "raw", "RGBA", 0, 1).save(
+            path, format="PNG", compress_level=self.compress_level
+        )
+        return Path(path)
+
+
+# Per-process renderer for render_pngs workers
+_WORKER_RENDERER: Optional[FigureRenderer] = None
+
+
+def _init_worker(chart: str, dpi: int) -> None:
+    global _WORKER_RENDERER
+    import matplotlib
+
+    matplotlib.use("Agg")
+    _WORKER_RENDERER = FigureRenderer(chart, dpi=dpi)
+
+
+def _render_job(job: tuple) -> Path:
+    return _WORKER_RENDERER.render(*job)
+
+
+def render_pngs(jobs: Iterable[tuple], chart: str = "total_co2", dpi: int = 150, n_workers: int = 1,
+                chunksize: int = 16) -> list[Path]:
+    """
+    Render (df, path[, title]) jobs to PNG files. n_workers=1 draws in-process on one reused figure;
+    more workers each hold their own Agg renderer and jobs are streamed to them in chunks.
+    """
+    if n_workers <= 1:
+        renderer = FigureRenderer(chart, dpi=dpi)
+        return [renderer.render(*job) for job in jobs]
+    with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(chart, dpi)) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=chunksize))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from .data_models import co2_from_carbon_kg
+from .growth_models import get_growth_model
+
+if TYPE_CHECKING:
+    from .simulator import Simulator
+
+
+def _pair_groups(species, region, *arrays):
+    """
+    Broadcast species/region names with the other arguments and group positions by (species, region).
+    """
+    species, region, *arrays = np.broadcast_arrays(np.asarray(species, dtype=object), np.asarray(region, dtype=object), *arrays)
+    keys = pd.MultiIndex.from_arrays([species.ravel(), region.ravel()])
+    codes, uniques = pd.factorize(keys)
+    return species.shape, codes, uniques, [a.ravel() for a in arrays]
+
+
+def per_tree_tco2_curve(sim: "Simulator", species: str, region: str, years: int) -> np.ndarray:
+    """
+    Expected tCO2 per planted tree for years 0..years (survival x per-tree CO2), from the simulator's curve cache.
+    """
+    sp = sim.species[species]
+    rg = sim.regions[region]
+    curve = sim.curves.growth_curve(sp, sp.r_growth * rg.climate_factor, years)
+    return sim.curves.survival_curve(rg, years) * curve.co2_kg / 1000.0
+
+
+def age_to_reach_per_tree_co2(sim: "Simulator", species, region, co2_kg_per_tree):
+    """
+    Continuous age (years) at which one tree holds `co2_kg_per_tree`, from the analytic inverse of the
+    species' growth model.
+    Arguments broadcast; unreachable targets (at or above the CO2 asymptote) give inf.
+    """
+    shape, codes, uniques, (target,) = _pair_groups(species, region, np.asarray(co2_kg_per_tree, dtype=float))
+    out = np.empty(target.shape)
+    for i, (sp_name, rg_name) in enumerate(uniques):
+        sp = sim.species[sp_name]
+        rg = sim.regions[rg_name]
+        rows = codes == i
+        biomass = target[rows] / co2_from_carbon_kg(sp.carbon_fraction) / (1.0 + sp.root_shoot_ratio)
+        model = get_growth_model(sp.growth_model)
+        out[rows] = model.time_to_biomass(sp.K_biomass_kg, sp.r_growth * rg.climate_factor, sp.t0_inflection, biomass, sp.growth_shape)
+    return out.reshape(shape)
+
+
+def year_to_reach(sim: "Simulator", species, region, trees_planted, target_tco2, max_years: int = 100):
+    """
+    First simulated year in which total_co2_tons reaches `target_tco2`, or -1 if it does not within max_years.
+    Survival makes the total non-monotonic, so each (species, region) curve is turned into its running
+    maximum once and all targets for that pair are located with a single searchsorted call.
+    """
+    shape, codes, uniques, (trees, target) = _pair_groups(
+        species, region, np.asarray(trees_planted, dtype=float), np.asarray(target_tco2, dtype=float)
+    )
+    out = np.empty(target.shape, dtype=np.int64)
+    for i, (sp_name, rg_name) in enumerate(uniques):
+        rows = codes == i
+        reached = np.maximum.accumulate(per_tree_tco2_curve(sim, sp_name, rg_name, max_years))
+        # total = trees * per-tree curve, so compare per-tree thresholds instead of rebuilding totals
+        year = np.searchsorted(reached, target[rows] / trees[rows], side="left")
+        out[rows] = np.where(year > max_years, -1, year)
+    return out.reshape(shape)
+
+
+def trees_needed(sim: "Simulator", species, region, target_tco2, year):
+    """
+    Trees to plant so the expected total reaches `target_tco2` in `year`. Closed form because the
+    total scales linearly with trees_planted: ceil(target / (survival(year) * CO2 per tree(year))).
+    Gives -1 where a tree holds no CO2 in `year` (e.g. year 0), as no number of trees reaches a positive target.
+    """
+    shape, codes, uniques, (target, years) = _pair_groups(
+        species, region, np.asarray(target_tco2, dtype=float), np.asarray(year, dtype=np.int64)
+    )
+    if (years < 0).any():
+        raise ValueError("year must be >= 0")
+    out = np.empty(target.shape, dtype=np.int64)
+    for i, (sp_name, rg_name) in enumerate(uniques):
+        rows = codes == i
+        per_tree = per_tree_tco2_curve(sim, sp_name, rg_name, int(years[rows].max()))[years[rows]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            trees = np.ceil(np.maximum(target[rows], 0.0) / per_tree - 1e-9)
+        out[rows] = np.where(per_tree > 0, trees, np.where(target[rows] > 0, -1, 0))
+    return out.reshape(shape)
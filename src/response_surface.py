@@ -0,0 +1,152 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_models import SpeciesParams, RegionParams, Scenario, SimulationOutput, YearlyColumns, co2_from_carbon_kg
+from .growth_models import species_biomass, survival_array
+from .harvest import ManagementTable
+from .instrumentation import count, instrumented
+from .parameter_store import ParameterStore, ParameterTable
+from .simulator import BATCH_COLUMNS
+
+
+def _table(params, model, key: str) -> ParameterTable:
+    return params if isinstance(params, ParameterTable) else ParameterTable.from_models(model, key, params.values())
+
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+@dataclass(frozen=True)
+class ResponseSurface:
+    """
+    Per-tree curves for every (species, region) pair and survival curves for every region, years 0..horizon.
+
+    A single-cohort scenario is these curves sliced to its horizon and scaled by trees_planted, so once the
+    surface exists, answering a scenario is an array lookup rather than a simulation. Arrays are read-only
+    and laid out [species, region, year] (survival: [region, year]) so one surface can be shared by threads.
+    """
+    species: pd.Index
+    regions: pd.Index
+    above_kg: np.ndarray
+    below_kg: np.ndarray
+    carbon_kg: np.ndarray
+    co2_kg: np.ndarray
+    survival: np.ndarray
+
+    @property
+    def horizon(self) -> int:
+        return self.survival.shape[1] - 1
+
+    @classmethod
+    @instrumented("surface.build")
+    def build(cls, species: Union[ParameterStore, Mapping[str, SpeciesParams]], regions=None,
+              horizon: int = 100) -> "ResponseSurface":
+        if isinstance(species, ParameterStore):
+            species, regions = species.species, species.regions
+        sp = _table(species, SpeciesParams, "species").columns
+        rg = _table(regions, RegionParams, "region").columns
+        n_sp, n_rg, n_yr = len(sp["species"]), len(rg["region"]), horizon + 1
+        shape = (n_sp, n_rg, n_yr)
+
+        def grid(values: np.ndarray, axis: int) -> np.ndarray:
+            return np.broadcast_to(np.expand_dims(values, [a for a in range(3) if a != axis]), shape).ravel()
+
+        year = np.arange(n_yr)
+        r_eff = sp["r_growth"][:, None] * rg["climate_factor"][None, :]
+        above_kg = species_biomass(
+            grid(sp["growth_model"], 0), grid(sp["K_biomass_kg"], 0), np.repeat(r_eff.ravel(), n_yr),
+            grid(sp["t0_inflection"], 0), grid(year, 2), grid(sp["growth_shape"], 0),
+        ).reshape(shape)
+        count("growth_evaluations", above_kg.size)
+        below_kg = above_kg * sp["root_shoot_ratio"][:, None, None]
+        carbon_kg = (above_kg + below_kg) * sp["carbon_fraction"][:, None, None]
+        survival = survival_array(1.0, year[None, :], rg["survival_rate_year1"][:, None], rg["annual_mortality_rate"][:, None])
+        return cls(
+            species=pd.Index(sp["species"]),
+            regions=pd.Index(rg["region"]),
+            above_kg=_frozen(above_kg),
+            below_kg=_frozen(below_kg),
+            carbon_kg=_frozen(carbon_kg),
+            co2_kg=_frozen(co2_from_carbon_kg(carbon_kg)),
+            survival=_frozen(survival),
+        )
+
+    def _ids(self, species: str, region: str, years: int) -> tuple[int, int]:
+        if years > self.horizon:
+            raise ValueError(f"years={years} is beyond the surface horizon ({self.horizon})")
+        return self.species.get_loc(species), self.regions.get_loc(region)
+
+    def columns(self, species: str, region: str, trees_planted: float, years: int) -> YearlyColumns:
+        s, r = self._ids(species, region, years)
+        n = years + 1
+        co2_kg = self.co2_kg[s, r, :n]
+        living = trees_planted * self.survival[r, :n]
+        return YearlyColumns(
+            year=np.arange(n),
+            living_trees=living,
+            above_biomass_kg_per_tree=self.above_kg[s, r, :n],
+            below_biomass_kg_per_tree=self.below_kg[s, r, :n],
+            carbon_kg_per_tree=self.carbon_kg[s, r, :n],
+            co2_kg_per_tree=co2_kg,
+            total_co2_tons=(living * co2_kg) / 1000.0,
+        )
+
+    def run(self, scenario: Scenario) -> SimulationOutput:
+        """
+        Same result as Simulator.run for a single-cohort scenario within the horizon.
+        """
+        if scenario.planting_schedule is not None:
+            raise ValueError("ResponseSurface covers single-cohort scenarios; use Simulator.run for planting schedules")
+        if scenario.steps_per_year != 1 or scenario.managed:
+            raise ValueError("ResponseSurface holds annual unmanaged curves; use Simulator.run for sub-annual grids, rotations and thinnings")
+        count("scenarios_run")
+        columns = self.columns(scenario.species, scenario.region, scenario.trees_planted, scenario.years)
+        return SimulationOutput(scenario=scenario, columns=columns)
+
+    @instrumented("surface.run_batch")
+    def run_batch(self, scenarios_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Long-format results for a table of single-cohort scenarios, as Simulator.run_batch returns them,
+        gathered from the surface in one indexing pass.
+        """
+        if "steps_per_year" in scenarios_df and (scenarios_df["steps_per_year"] != 1).any():
+            raise ValueError("ResponseSurface holds annual curves; use Simulator.run_batch for sub-annual grids")
+        if ManagementTable.from_frame(scenarios_df) is not None:
+            raise ValueError("ResponseSurface holds unmanaged curves; use Simulator.run_batch for rotations and thinnings")
+        count("scenarios_run", len(scenarios_df))
+        n_years = scenarios_df["years"].to_numpy(dtype=np.int64)
+        if len(n_years) and n_years.max() > self.horizon:
+            raise ValueError(f"years={n_years.max()} is beyond the surface horizon ({self.horizon})")
+        sp_ids = self.species.get_indexer(scenarios_df["species"])
+        rg_ids = self.regions.get_indexer(scenarios_df["region"])
+        for ids, key, names in ((sp_ids, "species", scenarios_df["species"]), (rg_ids, "region", scenarios_df["region"])):
+            if (ids < 0).any():
+                raise KeyError(f"unknown {key}: {list(pd.unique(names[ids < 0])[:5])}")
+
+        lengths = n_years + 1
+        idx = np.repeat(np.arange(len(scenarios_df)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        year = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+        s, r = sp_ids[idx], rg_ids[idx]
+        living = scenarios_df["trees_planted"].to_numpy(dtype=float)[idx] * self.survival[r, year]
+        co2_kg = self.co2_kg[s, r, year]
+        return pd.DataFrame(
+            {
+                "scenario": scenarios_df["scenario"].to_numpy()[idx],
+                "year": year,
+                "living_trees": living,
+                "above_biomass_kg_per_tree": self.above_kg[s, r, year],
+                "below_biomass_kg_per_tree": self.below_kg[s, r, year],
+                "carbon_kg_per_tree": self.carbon_kg[s, r, year],
+                "co2_kg_per_tree": co2_kg,
+                "total_co2_tons": (living * co2_kg) / 1000.0,
+            },
+            columns=BATCH_COLUMNS,
+            copy=False,
+        )
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+from .calibration import calibrate_climate_factor
+from .instrumentation import count
+from .data_models import SpeciesParams, RegionParams, Scenario, SimulationOutput, YearlyColumns
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is then best-effort without a lock
+    fcntl = None
+
+# Bump whenever the simulator or calibration would produce different numbers for the same inputs
+MODEL_VERSION = "2"
+
+
+@dataclass
+class StoreStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+def content_hash(payload: dict) -> str:
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=float)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    On-disk, content-addressed cache of simulation and calibration results shared between processes.
+
+    Each entry is a directory `objects/<hh>/<hash>/` holding one .npy file per array plus meta.json.
+    Entries are written to a private temp directory and renamed into place, so readers only ever see
+    complete entries; arrays are loaded with mmap_mode="r" so a hit costs no recomputation or parsing.
+    meta.json's mtime is refreshed on every hit and the least recently used entries are evicted once
+    the store exceeds `max_bytes`.
+    """
+
+    def __init__(self, root, max_bytes: int = 1 << 30, model_version: str = MODEL_VERSION):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.model_version = model_version
+        self.stats = StoreStats()
+        self._approx_bytes: Optional[int] = None
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+    # Keys -----------------------------------------------------------------
+
+    def simulation_key(self, sp: SpeciesParams, rg: RegionParams, scenario: Scenario) -> str:
+        # The scenario label does not change the numbers, so it is left out of the key
+        return content_hash({
+            "kind": "simulation",
+            "version": self.model_version,
+            "species": sp.model_dump(),
+            "region": rg.model_dump(),
+            "scenario": scenario.model_dump(exclude={"scenario"}),
+        })
+
+    def calibration_key(self, sp: SpeciesParams, stems_per_ha: float, target_cseq_tco2_ha_yr: float, **kwargs) -> str:
+        return content_hash({
+            "kind": "calibration",
+            "version": self.model_version,
+            "species": sp.model_dump(),
+            "stems_per_ha": float(stems_per_ha),
+            "target": float(target_cseq_tco2_ha_yr),
+            "options": kwargs,
+        })
+
+    # Raw entries ----------------------------------------------------------
+
+    def _path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / key
+
+    def get_arrays(self, key: str) -> Optional[dict[str, np.ndarray]]:
+        path = self._path(key)
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+            arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in meta["arrays"]}
+            os.utime(path / "meta.json")
+        except (OSError, ValueError, KeyError):
+            # Missing, or evicted by another process while we were reading
+            self.stats.misses += 1
+            count("result_store.misses")
+            return None
+        self.stats.hits += 1
+        count("result_store.hits")
+        return arrays
+
+    def put_arrays(self, key: str, arrays: dict[str, np.ndarray]) -> None:
+        final = self._path(key)
+        if final.exists():
+            return
+        tmp = self.root / "tmp" / uuid.uuid4().hex
+        tmp.mkdir(parents=True)
+        size = 0
+        for name, a in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(a))
+            size += (tmp / f"{name}.npy").stat().st_size
+        (tmp / "meta.json").write_text(json.dumps({"arrays": list(arrays), "bytes": size, "created": time.time()}))
+        final.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(tmp, final)
+        except OSError:
+            # Another writer got there first; its entry is identical
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.stats.writes += 1
+        # Full scans are only needed once our running estimate crosses the cap
+        if self._approx_bytes is None:
+            self._approx_bytes = self.size_bytes()
+        else:
+            self._approx_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    # Maintenance ----------------------------------------------------------
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for shard in (self.root / "objects").iterdir():
+            for entry in shard.iterdir():
+                try:
+                    meta_path = entry / "meta.json"
+                    size = json.loads(meta_path.read_text())["bytes"]
+                    entries.append((meta_path.stat().st_mtime, size, entry))
+                except (OSError, ValueError, KeyError):
+                    continue
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        Delete least recently used entries until the store fits in max_bytes. Returns entries removed.
+        """
+        with open(self.root / "evict.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                # Rename first so readers never see a half-deleted entry; open mmaps stay valid on POSIX
+                trash = self.root / "tmp" / f"evict-{uuid.uuid4().hex}"
+                try:
+                    os.rename(entry, trash)
+                except OSError:
+                    continue
+                shutil.rmtree(trash, ignore_errors=True)
+                total -= size
+                removed += 1
+        self._approx_bytes = total
+        self.stats.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root / "objects", ignore_errors=True)
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+
+    def summary(self) -> dict[str, int]:
+        return {**asdict(self.stats), "bytes": self.size_bytes()}
+
+    # Typed helpers --------------------------------------------------------
+
+    def get_simulation(self, sp: SpeciesParams, rg: RegionParams, scenario: Scenario) -> Optional[SimulationOutput]:
+        arrays = self.get_arrays(self.simulation_key(sp, rg, scenario))
+        if arrays is None:
+            return None
+        return SimulationOutput(scenario=scenario, columns=YearlyColumns(**arrays))
+
+    def put_simulation(self, sp: SpeciesParams, rg: RegionParams, output: SimulationOutput) -> None:
+        arrays = output.columns.arrays()
+        self.put_arrays(self.simulation_key(sp, rg, output.scenario), arrays)
+
+    def calibrate_climate_factor(self, sp: SpeciesParams, stems_per_ha: float, target_cseq_tco2_ha_yr: float,
+                                 **kwargs) -> tuple[float, float]:
+        """
+        calibrate_climate_factor with results memoized in the store. Keyword arguments are passed through.
+        """
+        key = self.calibration_key(sp, stems_per_ha, target_cseq_tco2_ha_yr, **kwargs)
+        arrays = self.get_arrays(key)
+        if arrays is not None:
+            factor, modeled = arrays["result"]
+            return float(factor), float(modeled)
+        factor, modeled = calibrate_climate_factor(sp, stems_per_ha, target_cseq_tco2_ha_yr, **kwargs)
+        self.put_arrays(key, {"result": np.array([factor, modeled])})
+        return factor, modeled
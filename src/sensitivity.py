@@ -0,0 +1,270 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_models import SpeciesParams, RegionParams
+from .parameter_store import ParameterStore
+from .simulator import Simulator
+
+PARAMETERS = (
+    "K_biomass_kg",
+    "r_growth",
+    "t0_inflection",
+    "carbon_fraction",
+    "root_shoot_ratio",
+    "survival_rate_year1",
+    "annual_mortality_rate",
+    "climate_factor",
+)
+
+# Hard limits from the SpeciesParams/RegionParams field constraints
+_LIMITS = {
+    "carbon_fraction": (1e-6, 1 - 1e-6),
+    "survival_rate_year1": (1e-6, 1 - 1e-6),
+    "annual_mortality_rate": (0.0, 1 - 1e-6),
+}
+
+
+@dataclass(frozen=True)
+class ParameterSpace:
+    """
+    Independent uniform ranges for the model parameters (every entry of PARAMETERS), under a fixed
+    growth model.
+    """
+    bounds: dict[str, tuple[float, float]]
+    growth_model: str = "logistic"
+    growth_shape: Optional[float] = None
+
+    @classmethod
+    def around(cls, sp: SpeciesParams, rg: RegionParams, rel: float = 0.2) -> "ParameterSpace":
+        """
+        +/- `rel` around the point estimates of one species/region pair, clipped to valid ranges.
+        t0_inflection is varied by +/- rel of its value in years.
+        """
+        point = {**sp.model_dump(), **rg.model_dump()}
+        bounds = {}
+        for name in PARAMETERS:
+            v = float(point[name])
+            lo, hi = v - abs(v) * rel, v + abs(v) * rel
+            if name in _LIMITS:
+                lo, hi = max(lo, _LIMITS[name][0]), min(hi, _LIMITS[name][1])
+            bounds[name] = (lo, hi)
+        return cls(bounds, sp.growth_model, sp.growth_shape)
+
+    def scale(self, unit: np.ndarray) -> np.ndarray:
+        lo = np.array([self.bounds[p][0] for p in PARAMETERS])
+        hi = np.array([self.bounds[p][1] for p in PARAMETERS])
+        return lo + unit * (hi - lo)
+
+
+def sample_store(X: np.ndarray, growth_model: str = "logistic", growth_shape: Optional[float] = None) -> ParameterStore:
+    """
+    ParameterStore with one species and one region per row of X (columns as in PARAMETERS), both named
+    "p<row>", so every parameter set is a (species, region) pair the simulator can run.
+    """
+    names = np.char.add("p", np.arange(len(X)).astype(str)).astype(object)
+    columns = {name: X[:, i] for i, name in enumerate(PARAMETERS)}
+    species = pd.DataFrame({"species": names, **{c: columns[c] for c in SpeciesParams.model_fields if c in columns},
+                            "growth_model": growth_model, "growth_shape": growth_shape})
+    regions = pd.DataFrame({"region": names, **{c: columns[c] for c in RegionParams.model_fields if c in columns}})
+    return ParameterStore.from_frames(species, regions)
+
+
+def evaluate_total_co2(X: np.ndarray, years: int, trees_planted: float = 1.0, growth_model: str = "logistic",
+                       growth_shape: Optional[float] = None, **scenario_fields) -> np.ndarray:
+    """
+    Simulator.run_batch over parameter sets: X has one column per entry of PARAMETERS and the result is
+    total_co2_tons with shape (len(X), steps + 1). Extra Scenario fields (steps_per_year, rotation_years,
+    thinning_ages, ...) apply to every row; planting schedules are not supported, as in run_batch.
+    """
+    store = sample_store(X, growth_model, growth_shape)
+    names = list(store.species)
+    scenarios = pd.DataFrame({"scenario": np.arange(len(X)), "species": names, "region": names,
+                              "trees_planted": trees_planted, "years": years, **scenario_fields})
+    # Every row is its own (species, region) pair, so skip the per-pair curve cache
+    yearly = Simulator(store, cache_size=0).run_batch(scenarios)
+    return yearly["total_co2_tons"].to_numpy().reshape(len(X), -1)
+
+
+def _evaluate_batched(space: ParameterSpace, X: np.ndarray, years: int, trees_planted: float, batch_size: int) -> np.ndarray:
+    out = np.empty((len(X), years + 1))
+    for start in range(0, len(X), batch_size):
+        out[start:start + batch_size] = evaluate_total_co2(
+            X[start:start + batch_size], years, trees_planted, space.growth_model, space.growth_shape
+        )
+    return out
+
+
+def _max_change(a: Optional[pd.DataFrame], b: pd.DataFrame, columns: list[str]) -> float:
+    if a is None:
+        return np.inf
+    return float(np.nanmax(np.abs(a[columns].to_numpy() - b[columns].to_numpy())))
+
+
+class SobolAnalysis:
+    """
+    Saltelli-design Sobol indices of total_co2_tons for every year 0..years.
+
+    Samples come from a scrambled Sobol sequence in 2k dimensions (k = len(PARAMETERS)) split into the
+    A and B matrices. Each extension appends new rows to the same sequence and only updates running
+    sums, so earlier model evaluations are never repeated. First-order indices use the Saltelli (2010)
+    estimator and total indices the Jansen estimator.
+    """
+
+    def __init__(self, space: ParameterSpace, years: int, trees_planted: float = 1.0, seed: Optional[int] = None,
+                 batch_size: int = 65_536):
+        from scipy.stats import qmc
+
+        self.space = space
+        self.years = years
+        self.trees_planted = trees_planted
+        self.batch_size = batch_size
+        self._engine = qmc.Sobol(2 * len(PARAMETERS), scramble=True, seed=seed)
+        k, n_t = len(PARAMETERS), years + 1
+        self.n = 0
+        self._sum = np.zeros(n_t)
+        self._sum_sq = np.zeros(n_t)
+        self._first = np.zeros((k, n_t))
+        self._total = np.zeros((k, n_t))
+
+    @property
+    def n_evaluations(self) -> int:
+        return self.n * (len(PARAMETERS) + 2)
+
+    def extend(self, n: int) -> "SobolAnalysis":
+        """
+        Add `n` base samples (n * (k + 2) model evaluations). Powers of two keep the Sobol balance.
+        """
+        k = len(PARAMETERS)
+        unit = self._engine.random(n)
+        A = self.space.scale(unit[:, :k])
+        B = self.space.scale(unit[:, k:])
+        fA = _evaluate_batched(self.space, A, self.years, self.trees_planted, self.batch_size)
+        fB = _evaluate_batched(self.space, B, self.years, self.trees_planted, self.batch_size)
+        self._sum += fA.sum(axis=0) + fB.sum(axis=0)
+        self._sum_sq += (fA ** 2).sum(axis=0) + (fB ** 2).sum(axis=0)
+        for i in range(k):
+            AB = A.copy()
+            AB[:, i] = B[:, i]
+            fAB = _evaluate_batched(self.space, AB, self.years, self.trees_planted, self.batch_size)
+            self._first[i] += (fB * (fAB - fA)).sum(axis=0)
+            self._total[i] += ((fA - fAB) ** 2).sum(axis=0)
+        self.n += n
+        return self
+
+    def indices(self) -> pd.DataFrame:
+        """
+        Long-format table: year, parameter, S1 (first order), ST (total).
+        """
+        m = 2 * self.n
+        var = self._sum_sq / m - (self._sum / m) ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            S1 = np.where(var > 0, (self._first / self.n) / var, np.nan)
+            ST = np.where(var > 0, (self._total / (2 * self.n)) / var, np.nan)
+        years = np.arange(self.years + 1)
+        return pd.DataFrame({
+            "year": np.tile(years, len(PARAMETERS)),
+            "parameter": np.repeat(PARAMETERS, len(years)),
+            "S1": S1.ravel(),
+            "ST": ST.ravel(),
+        })
+
+    def run(self, tol: float = 0.01, n_start: int = 1024, max_n: int = 1 << 20) -> pd.DataFrame:
+        """
+        Double the sample until no S1/ST value moves by more than `tol` between rounds (or max_n is reached).
+        The table's attrs record the final base sample size and whether it converged.
+        """
+        previous = None
+        if self.n == 0:
+            self.extend(n_start)
+        while True:
+            current = self.indices()
+            change = _max_change(previous, current, ["S1", "ST"])
+            converged = change <= tol
+            if converged or self.n * 2 > max_n:
+                current.attrs.update(n=self.n, converged=converged, max_change=change)
+                return current
+            previous = current
+            self.extend(self.n)
+
+
+class MorrisAnalysis:
+    """
+    Morris elementary-effects screening of total_co2_tons per year. Each trajectory moves one parameter
+    at a time by `delta` on a `levels`-point grid of the unit cube; every trajectory's k + 1 points are
+    evaluated in one vectorized batch. Reports mu_star (mean |EE|) and sigma (std of EE) per parameter.
+    """
+
+    def __init__(self, space: ParameterSpace, years: int, trees_planted: float = 1.0, levels: int = 4,
+                 seed: Optional[int] = None):
+        self.space = space
+        self.years = years
+        self.trees_planted = trees_planted
+        self.levels = levels
+        self.delta = levels / (2.0 * (levels - 1))
+        self.rng = np.random.default_rng(seed)
+        k, n_t = len(PARAMETERS), years + 1
+        self.r = 0
+        self._abs = np.zeros((k, n_t))
+        self._sum = np.zeros((k, n_t))
+        self._sum_sq = np.zeros((k, n_t))
+
+    def extend(self, r: int) -> "MorrisAnalysis":
+        k = len(PARAMETERS)
+        grid = np.arange(self.levels // 2) / (self.levels - 1)
+        start = self.rng.choice(grid, size=(r, k))
+        order = np.argsort(self.rng.random((r, k)), axis=1)
+        sign = self.rng.choice([-1.0, 1.0], size=(r, k))
+        # Steps go up from the lower half of the grid, or down from the matching upper point
+        start = np.where(sign > 0, start, start + self.delta)
+        rows = np.arange(r)
+        points = np.empty((r, k + 1, k))
+        points[:, 0] = start
+        for j in range(k):
+            points[:, j + 1] = points[:, j]
+            points[rows, j + 1, order[:, j]] += sign[rows, order[:, j]] * self.delta
+        f = evaluate_total_co2(self.space.scale(points.reshape(-1, k)), self.years, self.trees_planted,
+                               self.space.growth_model, self.space.growth_shape)
+        f = f.reshape(r, k + 1, -1)
+        by_param = np.empty((r, k, f.shape[-1]))
+        for j in range(k):
+            step = sign[rows, order[:, j]] * self.delta
+            by_param[rows, order[:, j]] = (f[:, j + 1] - f[:, j]) / step[:, None]
+        self._abs += np.abs(by_param).sum(axis=0)
+        self._sum += by_param.sum(axis=0)
+        self._sum_sq += (by_param ** 2).sum(axis=0)
+        self.r += r
+        return self
+
+    def indices(self) -> pd.DataFrame:
+        mu = self._sum / self.r
+        sigma = np.sqrt(np.maximum(self._sum_sq / self.r - mu ** 2, 0.0))
+        years = np.arange(self.years + 1)
+        return pd.DataFrame({
+            "year": np.tile(years, len(PARAMETERS)),
+            "parameter": np.repeat(PARAMETERS, len(years)),
+            "mu_star": (self._abs / self.r).ravel(),
+            "mu": mu.ravel(),
+            "sigma": sigma.ravel(),
+        })
+
+    def run(self, rtol: float = 0.05, r_start: int = 50, max_r: int = 100_000) -> pd.DataFrame:
+        """
+        Double the number of trajectories until mu_star changes by at most `rtol` relative to its largest value.
+        """
+        previous = None
+        if self.r == 0:
+            self.extend(r_start)
+        while True:
+            current = self.indices()
+            scale = max(float(current["mu_star"].max()), 1e-300)
+            change = _max_change(previous, current, ["mu_star"]) / scale
+            converged = change <= rtol
+            if converged or self.r * 2 > max_r:
+                current.attrs.update(r=self.r, converged=converged, max_change=change)
+                return current
+            previous = current
+            self.extend(self.r)
@@ -0,0 +1,468 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+
+from .calibration import calibrate_climate_factors, species_param_table
+from .data_models import MANAGEMENT_FIELDS, Scenario, YEARLY_FIELDS
+from .instrumentation import count
+from .parameter_store import ParameterStore
+from .simulator import Simulator
+from . import queries
+
+
+class Overloaded(Exception):
+    """
+    Raised by MicroBatcher.submit when its queue is full; the server answers 503 with Retry-After.
+    """
+
+
+@dataclass
+class BatchStats:
+    batches: int = 0
+    items: int = 0
+    max_size: int = 0
+    rejected: int = 0
+    busy_s: float = 0.0
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent submit() calls into batches for a vectorized handler.
+
+    A batch closes once it holds `max_batch` items or `max_wait_s` after its first item arrived,
+    whichever comes first; the handler runs on a worker thread so the event loop keeps accepting
+    requests meanwhile. It receives a list of items and returns a list of results aligned with them
+    (an Exception instance in place of a result fails just that item). At most `max_queue` items may
+    wait; beyond that submit() raises Overloaded instead of letting latency grow without bound.
+    """
+
+    def __init__(self, name: str, handler: Callable[[list], list], max_batch: int = 256, max_wait_s: float = 0.002,
+                 max_queue: int = 10_000, executor: Optional[ThreadPoolExecutor] = None):
+        self.name = name
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.max_queue = max_queue
+        self.executor = executor
+        self.stats = BatchStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, item) -> Any:
+        if self._queue.qsize() >= self.max_queue:
+            self.stats.rejected += 1
+            raise Overloaded(f"{self.name}: {self._queue.qsize()} requests queued")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _timed(self, items: list) -> list:
+        start = time.perf_counter()
+        try:
+            return self.handler(items)
+        finally:
+            self.stats.busy_s += time.perf_counter() - start
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            live = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not live:
+                continue
+            try:
+                results = await loop.run_in_executor(self.executor, self._timed, [item for item, _ in live])
+            except Exception as e:
+                results = [e] * len(live)
+            self.stats.batches += 1
+            self.stats.items += len(live)
+            self.stats.max_size = max(self.stats.max_size, len(live))
+            count(f"service.{self.name}.batches")
+            for (_, fut), result in zip(live, results):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    errors: int = 0
+    rejected: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=20_000))
+
+
+class Metrics:
+    """
+    Request counts and a sliding window of latencies per endpoint, plus throughput since start.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.endpoints: dict[str, EndpointMetrics] = {}
+
+    def observe(self, endpoint: str, seconds: float, status: int) -> None:
+        m = self.endpoints.setdefault(endpoint, EndpointMetrics())
+        m.requests += 1
+        m.latencies.append(seconds)
+        if status == 503:
+            m.rejected += 1
+        elif status >= 400:
+            m.errors += 1
+
+    def snapshot(self) -> dict:
+        uptime = time.perf_counter() - self.started
+        out = {"uptime_s": uptime, "endpoints": {}}
+        for name, m in sorted(self.endpoints.items()):
+            lat = np.asarray(m.latencies) * 1e3
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if len(lat) else (np.nan,) * 3
+            out["endpoints"][name] = {
+                "requests": m.requests, "errors": m.errors, "rejected": m.rejected,
+                "throughput_rps": m.requests / uptime if uptime > 0 else 0.0,
+                "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": float(lat.max()) if len(lat) else np.nan,
+            }
+        return out
+
+
+def _records(items: list[dict], *columns: str) -> dict[str, np.ndarray]:
+    return {c: np.array([item[c] for item in items]) for c in columns}
+
+
+class SimulationService:
+    """
+    Loads the parameter catalogs once and answers simulate / calibrate / query requests through one
+    MicroBatcher per kind, each feeding a vectorized path (Simulator.run_batch, calibrate_climate_factors,
+    queries.year_to_reach / trees_needed). Requests are validated on arrival, so one bad request cannot
+    fail the batch it would have joined.
+    """
+
+    def __init__(self, store: ParameterStore, max_batch: int = 256, max_wait_s: float = 0.002, max_queue: int = 10_000):
+        self.store = store
+        self.sim = Simulator(store)
+        self.metrics = Metrics()
+        # One worker thread: batches run back to back, and the curve cache is never used concurrently
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch")
+        options = {"max_batch": max_batch, "max_wait_s": max_wait_s, "max_queue": max_queue, "executor": self.executor}
+        self.batchers = {
+            "simulate": MicroBatcher("simulate", self._simulate_batch, **options),
+            "calibrate": MicroBatcher("calibrate", self._calibrate_batch, **options),
+            "year_to_reach": MicroBatcher("year_to_reach", self._year_to_reach_batch, **options),
+            "trees_needed": MicroBatcher("trees_needed", self._trees_needed_batch, **options),
+        }
+
+    def start(self) -> None:
+        for b in self.batchers.values():
+            b.start()
+
+    async def stop(self) -> None:
+        for b in self.batchers.values():
+            await b.stop()
+        self.executor.shutdown(wait=False)
+
+    def metrics_snapshot(self) -> dict:
+        snap = self.metrics.snapshot()
+        snap["batchers"] = {
+            name: {
+                "queue_depth": b.depth, "batches": b.stats.batches, "items": b.stats.items,
+                "mean_batch": b.stats.items / b.stats.batches if b.stats.batches else 0.0,
+                "max_batch": b.stats.max_size, "rejected": b.stats.rejected,
+                "utilization": b.stats.busy_s / snap["uptime_s"] if snap["uptime_s"] > 0 else 0.0,
+            }
+            for name, b in self.batchers.items()
+        }
+        return snap
+
+    # Validation (on arrival) ------------------------------------------------
+
+    def _check(self, species: Optional[str] = None, region: Optional[str] = None) -> None:
+        if species is not None and species not in self.store.species:
+            raise ValueError(f"unknown species: {species!r}")
+        if region is not None and region not in self.store.regions:
+            raise ValueError(f"unknown region: {region!r}")
+
+    def validate(self, kind: str, payload: dict):
+        if not isinstance(payload, dict):
+            raise ValueError("request body must be a JSON object (or a list of them)")
+        if kind == "simulate":
+            scenario = Scenario(**{k: v for k, v in payload.items() if k != "columns"})
+            fields = YEARLY_FIELDS + (("t_years",) if scenario.steps_per_year > 1 else ())
+            fields += MANAGEMENT_FIELDS if scenario.managed else ()
+            columns = payload.get("columns", fields)
+            if not set(columns) <= set(fields):
+                raise ValueError(f"unknown columns: {sorted(set(columns) - set(fields))}")
+            self._check(scenario.species, scenario.region)
+            return scenario, list(columns)
+        if kind == "calibrate":
+            item = {"age_years": 10, **payload}
+            self._check(item["species"])
+            for key in ("stems_per_ha", "target_cseq_tco2_ha_yr"):
+                item[key] = float(item[key])
+            item["age_years"] = int(item["age_years"])
+            return item
+        if kind == "year_to_reach":
+            item = {"max_years": 100, **payload}
+            self._check(item["species"], item["region"])
+            return {**item, "trees_planted": float(item["trees_planted"]), "target_tco2": float(item["target_tco2"]),
+                    "max_years": int(item["max_years"])}
+        if kind == "trees_needed":
+            self._check(payload["species"], payload["region"])
+            item = {**payload, "target_tco2": float(payload["target_tco2"]), "year": int(payload["year"])}
+            if item["year"] < 0:
+                raise ValueError("year must be >= 0")
+            return item
+        raise KeyError(kind)
+
+    # Batch handlers (worker thread) -----------------------------------------
+
+    def _simulate_batch(self, items: list[tuple[Scenario, list[str]]]) -> list:
+        results: list = [None] * len(items)
+        cohort = [i for i, (sc, _) in enumerate(items) if sc.planting_schedule is None]
+        if cohort:
+            scenarios = [items[i][0] for i in cohort]
+            df = pd.DataFrame({
+                "scenario": np.arange(len(scenarios)),
+                "species": [sc.species for sc in scenarios],
+                "region": [sc.region for sc in scenarios],
+                "trees_planted": [sc.trees_planted for sc in scenarios],
+                "years": [sc.years for sc in scenarios],
+                "steps_per_year": [sc.steps_per_year for sc in scenarios],
+            })
+            if any(sc.managed for sc in scenarios):
+                for name in ("rotation_years", "thinning_ages", "thinning_fraction", "product_fraction",
+                             "product_half_life_years", "deadwood_half_life_years"):
+                    df[name] = [getattr(sc, name) for sc in scenarios]
+            yearly = self.sim.run_batch(df)
+            ends = np.cumsum(df["years"].to_numpy() * df["steps_per_year"].to_numpy() + 1)
+            arrays = {c: yearly[c].to_numpy() for c in yearly.columns.drop("scenario")}
+            for k, i in enumerate(cohort):
+                sl = slice(ends[k - 1] if k else 0, ends[k])
+                sc, columns = items[i]
+                results[i] = {"scenario": sc.scenario, **{c: arrays[c][sl].tolist() for c in columns}}
+        for i, (sc, columns) in enumerate(items):
+            if results[i] is None:
+                out = self.sim.run(sc).columns
+                results[i] = {"scenario": sc.scenario, **{c: getattr(out, c).tolist() for c in columns}}
+        return results
+
+    def _calibrate_batch(self, items: list[dict]) -> list:
+        results: list = [None] * len(items)
+        ages = np.array([item["age_years"] for item in items])
+        for age in np.unique(ages):
+            rows = np.flatnonzero(ages == age)
+            sub = [items[i] for i in rows]
+            params = species_param_table(self.store.species, [item["species"] for item in sub])
+            cols = _records(sub, "stems_per_ha", "target_cseq_tco2_ha_yr")
+            res = calibrate_climate_factors(params, cols["stems_per_ha"], cols["target_cseq_tco2_ha_yr"], int(age))
+            for k, i in enumerate(rows):
+                results[i] = {"factor": float(res.factor[k]), "modeled_cseq_tco2_ha_yr": float(res.modeled[k]),
+                              "converged": bool(res.converged[k])}
+        return results
+
+    def _year_to_reach_batch(self, items: list[dict]) -> list:
+        results: list = [None] * len(items)
+        horizons = np.array([item["max_years"] for item in items])
+        for max_years in np.unique(horizons):
+            rows = np.flatnonzero(horizons == max_years)
+            cols = _records([items[i] for i in rows], "species", "region", "trees_planted", "target_tco2")
+            years = queries.year_to_reach(self.sim, cols["species"], cols["region"], cols["trees_planted"],
+                                          cols["target_tco2"], int(max_years))
+            for k, i in enumerate(rows):
+                results[i] = {"year": int(years[k])}
+        return results
+
+    def _trees_needed_batch(self, items: list[dict]) -> list:
+        cols = _records(items, "species", "region", "target_tco2", "year")
+        trees = queries.trees_needed(self.sim, cols["species"], cols["region"], cols["target_tco2"], cols["year"])
+        return [{"trees_planted": int(t)} for t in trees]
+
+
+ROUTES = {
+    "/simulate": "simulate",
+    "/calibrate": "calibrate",
+    "/query/year_to_reach": "year_to_reach",
+    "/query/trees_needed": "trees_needed",
+}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+MAX_BODY_BYTES = 16 << 20
+
+
+def _json_default(o):
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"not JSON serializable: {type(o).__name__}")
+
+
+class SimulationServer:
+    """
+    Minimal HTTP/1.1 JSON front end (keep-alive, Content-Length bodies) for a SimulationService.
+
+        POST /simulate              Scenario fields (+ optional "columns") -> yearly columns
+        POST /calibrate             {species, stems_per_ha, target_cseq_tco2_ha_yr[, age_years]} -> factor
+        POST /query/year_to_reach   {species, region, trees_planted, target_tco2[, max_years]} -> year
+        POST /query/trees_needed    {species, region, target_tco2, year} -> trees_planted (-1 if unreachable)
+        GET  /metrics, GET /health
+
+    A POST body may also be a JSON list of requests; each joins the micro-batches individually.
+    """
+
+    def __init__(self, service: SimulationService, host: str = "127.0.0.1", port: int = 8765):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> int:
+        self.service.start()
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.service.stop()
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = headers.get("content-length", "0")
+                # The body cannot be framed after either error, so answer and drop the connection
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                if not length.isdigit():
+                    await self._respond(writer, 400, {"error": f"invalid Content-Length: {length!r}"}, keep_alive=False)
+                    break
+                method, path, _ = parts
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                start = time.perf_counter()
+                status, payload, extra = await self._dispatch(method, path.split("?", 1)[0], body)
+                endpoint = ROUTES.get(path, path.strip("/") or "root")
+                self.service.metrics.observe(endpoint, time.perf_counter() - start, status)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple[int, Any, dict]:
+        if path == "/health":
+            return 200, {"status": "ok", "species": len(self.service.store.species), "regions": len(self.service.store.regions)}, {}
+        if path == "/metrics":
+            return 200, self.service.metrics_snapshot(), {}
+        kind = ROUTES.get(path)
+        if kind is None:
+            return 404, {"error": f"no route {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "use POST"}, {"Allow": "POST"}
+        try:
+            payload = json.loads(body or b"null")
+            many = isinstance(payload, list)
+            items = [self.service.validate(kind, p) for p in (payload if many else [payload])]
+        except (ValueError, KeyError, TypeError, ValidationError) as e:
+            return 400, {"error": f"{type(e).__name__}: {e}"}, {}
+        batcher = self.service.batchers[kind]
+        try:
+            results = await asyncio.gather(*(batcher.submit(item) for item in items))
+        except Overloaded as e:
+            return 503, {"error": str(e)}, {"Retry-After": "1"}
+        except (ValueError, KeyError) as e:
+            return 400, {"error": f"{type(e).__name__}: {e}"}, {}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}, {}
+        return 200, results if many else results[0], {}
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool = True,
+                       extra: Optional[dict] = None) -> None:
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def request_json(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                       payload: Any = None) -> tuple[int, Any]:
+    """
+    One request on an open keep-alive connection to a SimulationServer; returns (status, decoded body).
+    """
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split(b" ", 2)[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
@@ -1,47 +1,312 @@
 from __future__ import annotations
-from typing import Dict
-from .data_models import SpeciesParams, RegionParams, Scenario, YearlyResult, SimulationOutput, co2_from_carbon_kg
-from .growth_models import LogisticGrowth, annual_survival
+from typing import Dict, Optional, Union
+from .data_models import SpeciesParams, RegionParams, Scenario, SimulationOutput, YearlyColumns, co2_from_carbon_kg
+from .growth_models import continuous_survival, convolve_cohorts, replanting_schedule, species_biomass, survival_array, time_grid
+from .curve_cache import CurveCache
+from .harvest import ManagementTable, above_share, carbon_pools, managed_cohort, stand_cycle
+from .instrumentation import count, instrumented, stage
+from .parameter_store import ParameterStore, indexed
+from .result_store import ResultStore
+from . import queries
+from .uncertainty import MonteCarloConfig, UncertaintyOutput, run_monte_carlo
+
+import numpy as np
+import pandas as pd
+
+BATCH_COLUMNS = [
+    "scenario",
+    "year",
+    "living_trees",
+    "above_biomass_kg_per_tree",
+    "below_biomass_kg_per_tree",
+    "carbon_kg_per_tree",
+    "co2_kg_per_tree",
+    "total_co2_tons",
+]
+
+def _time_columns(years: int, steps_per_year: int) -> dict[str, np.ndarray]:
+    if steps_per_year == 1:
+        return {"year": np.arange(0, years + 1)}
+    return {"year": np.arange(years * steps_per_year + 1) // steps_per_year, "t_years": time_grid(years, steps_per_year)}
+
+
+def _planted_per_step(scenario: Scenario, rg: RegionParams) -> np.ndarray:
+    # Trees planted at each step of a schedule scenario; on sub-annual grids at the first step of each year
+    planted = np.asarray(scenario.planting_schedule, dtype=float)
+    if scenario.replant_first_year_losses:
+        planted = replanting_schedule(planted, rg.survival_rate_year1, scenario.years + 1)
+    steps = scenario.steps_per_year
+    if steps > 1:
+        placed = np.zeros(scenario.years * steps + 1)
+        placed[: len(planted) * steps : steps] = planted
+        planted = placed
+    return planted
 
-import math
 
 class Simulator:
-    def __init__(self, species: Dict[str, SpeciesParams], regions: Dict[str, RegionParams]):
+    def __init__(self, species: Union[Dict[str, SpeciesParams], ParameterStore], regions: Optional[Dict[str, RegionParams]] = None,
+                 cache_size: int = 1024, store: Optional[ResultStore] = None):
+        # A ParameterStore supplies both catalogs; its tables are Mappings, so lookups by name still work
+        if isinstance(species, ParameterStore):
+            species, regions = species.species, species.regions
         self.species = species
         self.regions = regions
+        self.curves = CurveCache(cache_size)
+        self.store = store
 
+    @instrumented("simulate.run")
     def run(self, scenario: Scenario) -> SimulationOutput:
+        count("scenarios_run")
         sp = self.species[scenario.species]
         rg = self.regions[scenario.region]
+        if self.store is not None:
+            cached = self.store.get_simulation(sp, rg, scenario)
+            if cached is not None:
+                return cached
 
-        growth = LogisticGrowth(K=sp.K_biomass_kg, r=sp.r_growth * rg.climate_factor, t0=sp.t0_inflection)
-
-        yearly: list[YearlyResult] = []
-        for year in range(0, scenario.years + 1):
-            above_kg = growth.biomass_at(year)
-            below_kg = above_kg * sp.root_shoot_ratio
-            total_biomass = above_kg + below_kg
-            carbon_kg_per_tree = total_biomass * sp.carbon_fraction
-            co2_kg_per_tree = co2_from_carbon_kg(carbon_kg_per_tree)
-
-            living = annual_survival(
-                starting=scenario.trees_planted,
-                year=year,
-                p_year1=rg.survival_rate_year1,
-                p_mortality=rg.annual_mortality_rate,
+        # Per-tree curves depend only on species/region; the scenario just scales them
+        steps = scenario.steps_per_year
+        curve = self.curves.growth_curve(sp, sp.r_growth * rg.climate_factor, scenario.years, steps)
+        survival = self.curves.survival_curve(rg, scenario.years, steps)
+        removals = None
+        if scenario.managed:
+            # Rotations and thinnings only re-index the cohort curves; removals are tracked alongside
+            curve, survival, *removals = managed_cohort(curve, survival, scenario)
+        if scenario.planting_schedule is not None:
+            columns = self._run_schedule(scenario, rg, curve, survival)
+        else:
+            living = scenario.trees_planted * survival
+            total_co2_tons = (living * curve.co2_kg) / 1000.0
+            columns = YearlyColumns(
+                **_time_columns(scenario.years, steps),
+                living_trees=living,
+                above_biomass_kg_per_tree=curve.above_kg,
+                below_biomass_kg_per_tree=curve.below_kg,
+                carbon_kg_per_tree=curve.carbon_kg,
+                co2_kg_per_tree=curve.co2_kg,
+                total_co2_tons=total_co2_tons,
             )
-            total_co2_tons = (living * co2_kg_per_tree) / 1000.0
-
-            yearly.append(
-                YearlyResult(
-                    year=year,
-                    living_trees=living,
-                    above_biomass_kg_per_tree=above_kg,
-                    below_biomass_kg_per_tree=below_kg,
-                    carbon_kg_per_tree=carbon_kg_per_tree,
-                    co2_kg_per_tree=co2_kg_per_tree,
-                    total_co2_tons=total_co2_tons,
-                )
+        if removals is not None:
+            columns = self._with_pools(scenario, rg, columns, *removals)
+        out = SimulationOutput(scenario=scenario, columns=columns)
+        if self.store is not None:
+            self.store.put_simulation(sp, rg, out)
+        return out
+
+    @staticmethod
+    @instrumented("simulate.schedule")
+    def _run_schedule(scenario: Scenario, rg: RegionParams, curve, survival: np.ndarray) -> YearlyColumns:
+        """
+        Multi-cohort portfolio: each year's planting follows the single-cohort survival x per-tree curves
+        shifted by its planting year, so every column is one convolution with the schedule.
+        Per-tree columns are averages over the living trees of all cohorts. On a sub-annual grid each
+        year's cohort is planted at the first step of its year.
+        """
+        steps = scenario.steps_per_year
+        n = scenario.years * steps + 1
+        planted = _planted_per_step(scenario, rg)
+        living = convolve_cohorts(planted, survival, n)
+        safe = np.where(living > 0, living, 1.0)
+
+        def per_tree(values: np.ndarray) -> np.ndarray:
+            return np.where(living > 0, convolve_cohorts(planted, survival * values, n) / safe, 0.0)
+
+        co2_kg_per_tree = per_tree(curve.co2_kg)
+        return YearlyColumns(
+            **_time_columns(scenario.years, steps),
+            living_trees=living,
+            above_biomass_kg_per_tree=per_tree(curve.above_kg),
+            below_biomass_kg_per_tree=per_tree(curve.below_kg),
+            carbon_kg_per_tree=per_tree(curve.carbon_kg),
+            co2_kg_per_tree=co2_kg_per_tree,
+            total_co2_tons=convolve_cohorts(planted, survival * curve.co2_kg, n) / 1000.0,
+        )
+
+    @staticmethod
+    def _with_pools(scenario: Scenario, rg: RegionParams, columns: YearlyColumns, removed_above: np.ndarray,
+                    removed_below: np.ndarray) -> YearlyColumns:
+        # Removals per planted tree -> per scenario, like every other column
+        if scenario.planting_schedule is None:
+            removed_above, removed_below = scenario.trees_planted * removed_above, scenario.trees_planted * removed_below
+        else:
+            planted = _planted_per_step(scenario, rg)
+            removed_above = convolve_cohorts(planted, removed_above, len(columns))
+            removed_below = convolve_cohorts(planted, removed_below, len(columns))
+        pools = carbon_pools(removed_above, removed_below, columns.total_co2_tons, scenario.product_fraction,
+                             scenario.product_half_life_years, scenario.deadwood_half_life_years, scenario.steps_per_year)
+        return YearlyColumns(**columns.arrays(), **pools)
+
+    def year_to_reach(self, species, region, trees_planted, target_tco2, max_years: int = 100):
+        """
+        First year a planting reaches target_tco2 (-1 if never within max_years). Arguments broadcast as arrays.
+        """
+        return queries.year_to_reach(self, species, region, trees_planted, target_tco2, max_years)
+
+    def trees_needed(self, species, region, target_tco2, year):
+        """
+        Trees to plant so the total reaches target_tco2 by `year` (-1 if unreachable). Arguments broadcast as arrays.
+        """
+        return queries.trees_needed(self, species, region, target_tco2, year)
+
+    def age_to_reach_per_tree_co2(self, species, region, co2_kg_per_tree):
+        """
+        Continuous tree age at which per-tree CO2 reaches co2_kg_per_tree (analytic logistic inverse).
+        """
+        return queries.age_to_reach_per_tree_co2(self, species, region, co2_kg_per_tree)
+
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        return self.curves.stats()
+
+    def run_monte_carlo(self, scenario: Scenario, config: MonteCarloConfig = MonteCarloConfig()) -> UncertaintyOutput:
+        """
+        Stochastic mode: per-year mean and quantiles (P10/P50/P90 by default) of sequestration under
+        binomial mortality and random growth parameters. See uncertainty.run_monte_carlo.
+        """
+        return run_monte_carlo(self.species[scenario.species], self.regions[scenario.region], scenario, config)
+
+    @instrumented("simulate.run_batch")
+    def run_batch(self, scenarios_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run every row of a scenarios table (columns as in data/scenarios.csv) in one array pass.
+        Returns a long-format DataFrame with one row per (scenario, year), matching run() row for row.
+        Only single-cohort scenarios are supported; use run() for planting schedules. An optional
+        steps_per_year column puts scenarios on sub-annual grids; the result then has one row per step
+        and a t_years column.
+        """
+        if "planting_schedule" in scenarios_df and scenarios_df["planting_schedule"].notna().any():
+            raise ValueError("run_batch does not support planting_schedule; use run() for multi-cohort scenarios")
+        count("scenarios_run", len(scenarios_df))
+        n_years = scenarios_df["years"].to_numpy(dtype=np.int64)
+        trees = scenarios_df["trees_planted"].to_numpy(dtype=float)
+
+        with stage("batch.index"):
+            sp_table, sp_ids = indexed(self.species, scenarios_df["species"], SpeciesParams, "species")
+            rg_table, rg_ids = indexed(self.regions, scenarios_df["region"], RegionParams, "region")
+
+        steps = scenarios_df["steps_per_year"].to_numpy(dtype=np.int64) if "steps_per_year" in scenarios_df else None
+        sub_annual = steps is not None and bool((steps > 1).any())
+        plan = ManagementTable.from_frame(scenarios_df)
+
+        # Flatten the ragged (scenario x year) grid so differing horizons waste no work
+        lengths = n_years * steps + 1 if sub_annual else n_years + 1
+        idx = np.repeat(np.arange(len(scenarios_df)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        step = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+        row_steps = steps[idx] if sub_annual else 1
+        year, t_years = (step // row_steps, step / row_steps) if sub_annual else (step, None)
+
+        # Stand age (in steps) at which every row's per-tree curves are read; rotations restart it
+        age, cycle, cut = step, None, None
+        if plan is not None:
+            per_year = steps if sub_annual else np.ones(len(scenarios_df), dtype=np.int64)
+            thin = np.round(plan.thin_ages * per_year[plan.thin_rows]).astype(np.int64)
+            cycle = stand_cycle(step, plan.rotation_years[idx] * row_steps, plan.thinning_fraction[idx],
+                                plan.thin_rows[thin > 0], thin[thin > 0], row_ids=idx)
+            age = cycle.age
+            cut = np.flatnonzero(cycle.removed > 0)
+
+        n_rg = len(rg_table)
+        pair_keys, pair_codes = np.unique(sp_ids.astype(np.int64) * n_rg + rg_ids, return_inverse=True)
+        if not sub_annual and len(pair_keys) <= self.curves.growth.maxsize:
+            # Few distinct (species, region) pairs: gather from cached per-tree curves
+            horizon = int(n_years.max(initial=0))
+            curves = []
+            for k in pair_keys:
+                sp, rg = sp_table.row(int(k // n_rg)), rg_table.row(int(k % n_rg))
+                curves.append(self.curves.growth_curve(sp, sp.r_growth * rg.climate_factor, horizon))
+            rg_used, rg_codes = np.unique(rg_ids, return_inverse=True)
+            survival = [self.curves.survival_curve(rg_table.row(int(i)), horizon) for i in rg_used]
+            pair = pair_codes.reshape(-1)[idx]
+            rg_rows = rg_codes.reshape(-1)[idx]
+
+            def stacked(rows: list[np.ndarray]) -> np.ndarray:
+                return np.stack(rows) if rows else np.empty((0, horizon + 1))
+
+            tables = [stacked([getattr(c, f) for c in curves]) for f in ("above_kg", "below_kg", "carbon_kg", "co2_kg")]
+            survival = stacked(survival)
+
+            def evaluate(rows, at_age: np.ndarray) -> tuple[np.ndarray, ...]:
+                p = pair[rows]
+                return (*(t[p, at_age] for t in tables), survival[rg_rows[rows], at_age])
+        else:
+            sp_cols, rg_cols = sp_table.columns, rg_table.columns
+            K = sp_cols["K_biomass_kg"][sp_ids]
+            r_eff = sp_cols["r_growth"][sp_ids] * rg_cols["climate_factor"][rg_ids]
+            t0 = sp_cols["t0_inflection"][sp_ids]
+            carbon_fraction = sp_cols["carbon_fraction"][sp_ids]
+            root_shoot = sp_cols["root_shoot_ratio"][sp_ids]
+            models = sp_cols["growth_model"][sp_ids]
+            shape = sp_cols["growth_shape"][sp_ids]
+            p_year1 = rg_cols["survival_rate_year1"][rg_ids]
+            p_mortality = rg_cols["annual_mortality_rate"][rg_ids]
+            survival = continuous_survival if sub_annual else survival_array
+
+            def evaluate(rows, at_age: np.ndarray) -> tuple[np.ndarray, ...]:
+                at = idx[rows]
+                t = at_age / steps[at] if sub_annual else at_age
+                with stage("growth"):
+                    above = species_biomass(models[at], K[at], r_eff[at], t0[at], t, shape[at])
+                count("growth_evaluations", len(t))
+                below = above * root_shoot[at]
+                carbon = (above + below) * carbon_fraction[at]
+                with stage("survival"):
+                    alive = survival(1.0, t, p_year1[at], p_mortality[at])
+                return above, below, carbon, co2_from_carbon_kg(carbon), alive
+
+        above_kg, below_kg, carbon_kg_per_tree, co2_kg_per_tree, alive = evaluate(slice(None), age)
+        living = trees[idx] * alive if cycle is None else trees[idx] * alive * cycle.kept
+        total_co2_tons = (living * co2_kg_per_tree) / 1000.0
+
+        with stage("batch.frame"):
+            frame = pd.DataFrame(
+                {
+                    "scenario": scenarios_df["scenario"].to_numpy()[idx],
+                    "year": year,
+                    "living_trees": living,
+                    "above_biomass_kg_per_tree": above_kg,
+                    "below_biomass_kg_per_tree": below_kg,
+                    "carbon_kg_per_tree": carbon_kg_per_tree,
+                    "co2_kg_per_tree": co2_kg_per_tree,
+                    "total_co2_tons": total_co2_tons,
+                },
+                columns=BATCH_COLUMNS,
+                copy=False,
             )
+            if t_years is not None:
+                frame["t_years"] = t_years
+        if plan is not None:
+            with stage("batch.pools"):
+                for name, values in self._batch_pools(plan, idx, step, lengths, steps if sub_annual else None, cut,
+                                                      cycle, trees, evaluate, total_co2_tons).items():
+                    frame[name] = values
+        return frame
+
+    @staticmethod
+    def _batch_pools(plan: ManagementTable, idx, step, lengths, steps, cut, cycle, trees, evaluate, total_co2_tons) -> dict:
+        """
+        Removals and decaying pools for the managed rows of a run_batch table. Removed trees are valued
+        at their cut age; each managed scenario's removals are laid out as one row of a (scenario, step)
+        grid so every pool is a single batched FFT convolution.
+        """
+        above, below, _, co2, alive = evaluate(cut, cycle.cut_age[cut])
+        removed_tco2 = trees[idx[cut]] * alive * cycle.removed[cut] * co2 / 1000.0
+        share = above_share(above, below)
+        removed_above, removed_below = np.zeros(len(idx)), np.zeros(len(idx))
+        removed_above[cut], removed_below[cut] = removed_tco2 * share, removed_tco2 * (1.0 - share)
 
-        return SimulationOutput(scenario=scenario, yearly=yearly)
+        managed = np.flatnonzero(plan.managed)
+        rows = plan.managed[idx]
+        slot = np.cumsum(plan.managed)[idx[rows]] - 1
+        grid_above, grid_below = (np.zeros((len(managed), int(lengths[managed].max()))) for _ in range(2))
+        grid_above[slot, step[rows]] = removed_above[rows]
+        grid_below[slot, step[rows]] = removed_below[rows]
+        # Half-lives in steps, since scenarios may use different grids
+        per_year = 1 if steps is None else steps[managed]
+        pools = carbon_pools(grid_above, grid_below, 0.0, plan.product_fraction[managed],
+                             plan.product_half_life_years[managed] * per_year, plan.deadwood_half_life_years[managed] * per_year)
+        out = {"removed_co2_tons": removed_above + removed_below}
+        for name in ("products_co2_tons", "deadwood_co2_tons"):
+            out[name] = np.zeros(len(idx))
+            out[name][rows] = pools[name][slot, step[rows]]
+        out["stored_co2_tons"] = total_co2_tons + out["products_co2_tons"] + out["deadwood_co2_tons"]
+        return out
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Iterator, Literal, Optional
+
+import pandas as pd
+
+from .analysis import SummaryAccumulator, add_rankings
+from .data_models import Scenario, validate_frame
+from .instrumentation import instrumented
+from .simulator import Simulator
+
+OutputFormat = Literal["parquet", "csv"]
+
+
+def iter_scenario_chunks(path, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """
+    Read a scenarios CSV in bounded-memory chunks, validating each chunk column-wise against Scenario.
+    """
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield validate_frame(Scenario, chunk)
+
+
+class ChunkedWriter:
+    """
+    Appends DataFrames to a partitioned dataset: one part file per chunk under `out_dir/<table>/`.
+    Parquet needs pyarrow; csv is the dependency-free fallback.
+    """
+
+    def __init__(self, out_dir, fmt: OutputFormat = "parquet"):
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Parquet output requires pyarrow (pip install pyarrow) or use fmt='csv'") from e
+        elif fmt != "csv":
+            raise ValueError(f"unknown output format: {fmt}")
+        self.out_dir = Path(out_dir)
+        self.fmt = fmt
+        self.parts: dict[str, int] = {}
+
+    @instrumented("write")
+    def write(self, table: str, df: pd.DataFrame) -> Path:
+        part = self.parts.get(table, 0)
+        table_dir = self.out_dir / table
+        table_dir.mkdir(parents=True, exist_ok=True)
+        if part == 0:
+            # Drop parts left over from an earlier, longer run into the same directory
+            for stale in table_dir.glob(f"part-*.{self.fmt}"):
+                stale.unlink()
+        path = table_dir / f"part-{part:05d}.{self.fmt}"
+        if self.fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        self.parts[table] = part + 1
+        return path
+
+    def read(self, table: str, columns: list[str]) -> pd.DataFrame:
+        """
+        `columns` of every part written to `table` so far, in write order.
+        """
+        paths = [self.out_dir / table / f"part-{i:05d}.{self.fmt}" for i in range(self.parts.get(table, 0))]
+        if self.fmt == "parquet":
+            frames = [pd.read_parquet(p, columns=columns) for p in paths]
+        else:
+            frames = [pd.read_csv(p, usecols=columns)[columns] for p in paths]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def run_streaming(sim: Simulator, scenarios_path, out_dir, chunksize: int = 50_000, fmt: OutputFormat = "parquet",
+                  write_yearly: bool = True, progress: Optional[Callable[[int, dict[str, int]], None]] = None,
+                  stems_per_ha: Optional[float] = None, establishment_kg_co2_per_tree: Optional[float] = None,
+                  rank: bool = False) -> dict[str, int]:
+    """
+    Stream a scenarios CSV through Simulator.run_batch chunk by chunk, appending yearly rows and
+    per-scenario summaries (see analysis.summarize_results) to `out_dir/yearly/` and `out_dir/summary/`.
+    Memory is bounded by `chunksize`. Returns row counts written per table.
+
+    rank=True also writes rankings across all scenarios to `out_dir/rankings/` at the end, from the
+    summary parts read back from disk. This is off by default because it is not constant-memory: it holds
+    the scenario, final total and average rate of every scenario at once.
+    """
+    writer = ChunkedWriter(out_dir, fmt)
+    accumulator = SummaryAccumulator(stems_per_ha=stems_per_ha, establishment_kg_co2_per_tree=establishment_kg_co2_per_tree,
+                                     keep=False)
+    counts = {"scenarios": 0, "yearly": 0, "summary": 0}
+    for i, chunk in enumerate(iter_scenario_chunks(scenarios_path, chunksize)):
+        yearly = sim.run_batch(chunk)
+        summary = accumulator.add(yearly)
+        if write_yearly:
+            writer.write("yearly", yearly)
+            counts["yearly"] += len(yearly)
+        writer.write("summary", summary)
+        counts["summary"] += len(summary)
+        counts["scenarios"] += len(chunk)
+        if progress is not None:
+            progress(i, counts)
+    # The last scenario is held back by the accumulator until the stream ends
+    rest = accumulator.flush()
+    if len(rest):
+        writer.write("summary", rest)
+        counts["summary"] += len(rest)
+    if rank:
+        rate = "avg_co2_tons_per_year" if stems_per_ha is None else "avg_tco2_per_ha_per_year"
+        ranked = add_rankings(writer.read("summary", ["scenario", "final_total_co2_tons", rate]))
+        writer.write("rankings", ranked[["scenario", "rank_final_co2", "rank_avg_rate"]])
+    return counts
@@ -0,0 +1,217 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_models import SpeciesParams, RegionParams, Scenario, co2_from_carbon_kg
+from .growth_models import continuous_survival, get_growth_model, survival_array, time_grid
+
+DistributionKind = Literal["fixed", "normal", "lognormal", "uniform", "triangular"]
+
+
+@dataclass(frozen=True)
+class ParamDistribution:
+    """
+    Distribution of a multiplier applied to a point estimate (median/mean 1.0 for the symmetric kinds).
+    - fixed: always 1.0
+    - normal: N(1, spread), truncated to stay positive
+    - lognormal: exp(N(0, spread))
+    - uniform: U(low, high)
+    - triangular: Tri(low, 1.0, high)
+    """
+    kind: DistributionKind = "fixed"
+    spread: float = 0.0
+    low: float = 1.0
+    high: float = 1.0
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.kind == "fixed":
+            return np.ones(n)
+        if self.kind == "normal":
+            return np.maximum(rng.normal(1.0, self.spread, n), 1e-6)
+        if self.kind == "lognormal":
+            return np.exp(rng.normal(0.0, self.spread, n))
+        if self.kind == "uniform":
+            return rng.uniform(self.low, self.high, n)
+        if self.kind == "triangular":
+            return rng.triangular(self.low, 1.0, self.high, n)
+        raise ValueError(f"unknown distribution kind: {self.kind}")
+
+
+@dataclass(frozen=True)
+class MonteCarloConfig:
+    n_draws: int = 10_000
+    chunk_size: int = 50_000
+    seed: Optional[int] = None
+    r_growth: ParamDistribution = field(default_factory=ParamDistribution)
+    K_biomass_kg: ParamDistribution = field(default_factory=ParamDistribution)
+    climate_factor: ParamDistribution = field(default_factory=ParamDistribution)
+    binomial_mortality: bool = True
+    quantiles: tuple[float, ...] = (0.1, 0.5, 0.9)
+    n_bins: int = 4096
+
+
+class StreamingQuantiles:
+    """
+    Per-column streaming quantile estimator for a stream of (draws x columns) chunks.
+    Keeps one fixed-size histogram per column; when a chunk falls outside a column's range, bins are
+    merged in powers of two so the range grows without revisiting earlier draws. Memory is
+    O(columns * n_bins) no matter how many draws are added, and quantiles are accurate to one bin width.
+    """
+
+    def __init__(self, n_columns: int, n_bins: int = 4096):
+        self.n_columns = n_columns
+        self.n_bins = n_bins
+        self.counts = np.zeros((n_columns, n_bins), dtype=np.int64)
+        self.lo = np.zeros(n_columns)
+        self.width = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+        self.total = np.zeros(n_columns)
+        self.n = 0
+
+    def update(self, chunk: np.ndarray) -> None:
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.ndim != 2 or chunk.shape[1] != self.n_columns:
+            raise ValueError(f"expected a (draws, {self.n_columns}) array, got {chunk.shape}")
+        if chunk.shape[0] == 0:
+            return
+        cmin = chunk.min(axis=0)
+        cmax = chunk.max(axis=0)
+        if self.n == 0:
+            self._init_range(cmin, cmax)
+        else:
+            self._extend_range(cmin, cmax)
+        self.min = np.minimum(self.min, cmin)
+        self.max = np.maximum(self.max, cmax)
+        self.total += chunk.sum(axis=0)
+        self.n += chunk.shape[0]
+
+        bins = np.floor((chunk - self.lo) / self.width).astype(np.int64)
+        np.clip(bins, 0, self.n_bins - 1, out=bins)
+        flat = bins + np.arange(self.n_columns) * self.n_bins
+        self.counts += np.bincount(flat.ravel(), minlength=self.n_columns * self.n_bins).reshape(self.n_columns, self.n_bins)
+
+    def _init_range(self, cmin: np.ndarray, cmax: np.ndarray) -> None:
+        span = cmax - cmin
+        pad = 0.1 * span
+        floor = np.maximum(np.abs(cmin), 1.0) * 1e-9
+        self.lo = cmin - pad
+        self.width = np.maximum((span + 2 * pad) / self.n_bins, floor)
+
+    def _extend_range(self, cmin: np.ndarray, cmax: np.ndarray) -> None:
+        hi = self.lo + self.width * self.n_bins
+        for j in np.flatnonzero((cmin < self.lo) | (cmax >= hi)):
+            new_min = min(cmin[j], self.lo[j])
+            new_max = max(cmax[j], hi[j])
+            k = 1
+            while True:
+                factor = 2 ** k
+                W = self.width[j] * factor
+                m = int(np.ceil((self.lo[j] - new_min) / W))
+                if self.lo[j] - m * W + self.n_bins * W > new_max and m + -(-self.n_bins // factor) <= self.n_bins:
+                    break
+                k += 1
+            old = self.counts[j]
+            merged = np.zeros(self.n_bins, dtype=np.int64)
+            np.add.at(merged, m + np.arange(self.n_bins) // factor, old)
+            self.counts[j] = merged
+            self.lo[j] -= m * W
+            self.width[j] = W
+
+    def mean(self) -> np.ndarray:
+        return self.total / max(self.n, 1)
+
+    def quantile(self, q: float) -> np.ndarray:
+        if self.n == 0:
+            return np.full(self.n_columns, np.nan)
+        cum = np.cumsum(self.counts, axis=1)
+        rank = q * self.n
+        idx = np.minimum((cum < rank).sum(axis=1), self.n_bins - 1)
+        rows = np.arange(self.n_columns)
+        before = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0)
+        in_bin = self.counts[rows, idx]
+        frac = np.where(in_bin > 0, (rank - before) / np.maximum(in_bin, 1), 0.5)
+        value = self.lo + (idx + np.clip(frac, 0.0, 1.0)) * self.width
+        return np.clip(value, self.min, self.max)
+
+
+@dataclass
+class UncertaintyOutput:
+    scenario: Scenario
+    n_draws: int
+    years: np.ndarray
+    stats: dict[str, np.ndarray]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        if self.years.dtype.kind == "f":
+            # Sub-annual grid: same time columns as Simulator.run
+            time = {"year": np.floor(self.years).astype(np.int64), "t_years": self.years}
+            return pd.DataFrame({**time, **self.stats}, copy=False)
+        return pd.DataFrame({"year": self.years, **self.stats}, copy=False)
+
+
+def _quantile_label(q: float) -> str:
+    return f"p{round(q * 100):g}"
+
+
+def run_monte_carlo(sp: SpeciesParams, rg: RegionParams, scenario: Scenario, config: MonteCarloConfig) -> UncertaintyOutput:
+    """
+    Stochastic counterpart of Simulator.run. Each draw samples r_growth, K_biomass_kg and climate_factor
+    multipliers and, with binomial_mortality, follows the cohort through Binomial survival. Draws are
+    generated in chunks and folded into streaming per-year quantiles, so memory is bounded by chunk_size.
+    Results are reproducible for a given (seed, chunk_size).
+    """
+    if scenario.managed:
+        raise ValueError("run_monte_carlo does not model rotations or thinnings; use Simulator.run")
+    if scenario.planting_schedule is not None:
+        raise ValueError("run_monte_carlo follows a single year-0 cohort; use Simulator.run for planting_schedule")
+    steps = scenario.steps_per_year
+    years = time_grid(scenario.years, steps)
+    n_years = years.size
+    metrics = ("total_co2_tons", "living_trees", "co2_kg_per_tree")
+    acc = {m: StreamingQuantiles(n_years, config.n_bins) for m in metrics}
+
+    n_chunks = -(-config.n_draws // config.chunk_size)
+    seeds = np.random.SeedSequence(config.seed).spawn(n_chunks)
+    remaining = config.n_draws
+    for seed in seeds:
+        m = min(config.chunk_size, remaining)
+        remaining -= m
+        rng = np.random.default_rng(seed)
+        K = sp.K_biomass_kg * config.K_biomass_kg.sample(rng, m)
+        r = sp.r_growth * config.r_growth.sample(rng, m)
+        climate = rg.climate_factor * config.climate_factor.sample(rng, m)
+
+        above_kg = get_growth_model(sp.growth_model).biomass(
+            K[:, None], (r * climate)[:, None], sp.t0_inflection, years[None, :], sp.growth_shape
+        )
+        co2_kg_per_tree = co2_from_carbon_kg((above_kg + above_kg * sp.root_shoot_ratio) * sp.carbon_fraction)
+
+        if config.binomial_mortality:
+            living = np.empty((m, n_years))
+            living[:, 0] = scenario.trees_planted
+            alive = np.full(m, scenario.trees_planted, dtype=np.int64)
+            # Per-step survival of the continuous-hazard model; whole years compound to the annual rates
+            p_first, p_later = rg.survival_rate_year1 ** (1.0 / steps), (1.0 - rg.annual_mortality_rate) ** (1.0 / steps)
+            for y in range(1, n_years):
+                alive = rng.binomial(alive, p_first if y <= steps else p_later)
+                living[:, y] = alive
+        else:
+            survival = survival_array if steps == 1 else continuous_survival
+            living = np.broadcast_to(
+                survival(scenario.trees_planted, years, rg.survival_rate_year1, rg.annual_mortality_rate), (m, n_years)
+            )
+
+        acc["total_co2_tons"].update(living * co2_kg_per_tree / 1000.0)
+        acc["living_trees"].update(living)
+        acc["co2_kg_per_tree"].update(co2_kg_per_tree)
+
+    stats: dict[str, np.ndarray] = {}
+    for name, a in acc.items():
+        stats[f"{name}_mean"] = a.mean()
+        for q in config.quantiles:
+            stats[f"{name}_{_quantile_label(q)}"] = a.quantile(q)
+    return UncertaintyOutput(scenario=scenario, n_draws=config.n_draws, years=years, stats=stats)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from src.analysis import SummaryAccumulator, summarize_results
+from src.data_models import SpeciesParams, RegionParams
+from src.simulator import Simulator
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {"TestRegion": RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)}
+scenarios = pd.DataFrame({
+    "scenario": [f"s{i}" for i in range(6)],
+    "species": "Test",
+    "region": "TestRegion",
+    "trees_planted": [100, 200, 300, 400, 500, 600],
+    "years": [3, 10, 20, 7, 1, 15],
+})
+
+
+def test_summarize_results_metrics():
+    yearly = Simulator(species, regions).run_batch(scenarios)
+    summary = summarize_results(yearly, stems_per_ha=400, establishment_kg_co2_per_tree=30.0)
+    for row in summary.to_dict(orient="records"):
+        df = yearly[yearly["scenario"] == row["scenario"]]
+        increment = df["total_co2_tons"].diff().to_numpy()
+        area = df["living_trees"].iloc[0] / 400
+        assert row["trees_planted"] == df["living_trees"].iloc[0]
+        assert np.isclose(row["final_tco2_per_ha"], df["total_co2_tons"].iloc[-1] / area)
+        if len(df) > 1:
+            assert row["peak_increment_year"] == df["year"].iloc[np.nanargmax(increment)]
+        paid = df["year"][df["total_co2_tons"] >= df["living_trees"].iloc[0] * 0.03]
+        assert row["payback_year"] == (paid.iloc[0] if len(paid) else -1)
+    assert (summarize_results(yearly[yearly["year"] == 0])["peak_increment_year"] == -1).all()
+    assert sorted(summary["rank_final_co2"]) == list(range(1, 7))
+    assert summary.loc[summary["final_total_co2_tons"].idxmax(), "rank_final_co2"] == 1
+
+    # Row order does not matter; contiguous year-ordered input just skips the sort
+    shuffled = summarize_results(yearly.sample(frac=1.0, random_state=0), stems_per_ha=400, establishment_kg_co2_per_tree=30.0)
+    pd.testing.assert_frame_equal(shuffled.set_index("scenario").loc[summary["scenario"]].reset_index(), summary)
+
+
+def test_accumulator_matches_one_pass_across_chunk_boundaries():
+    yearly = Simulator(species, regions).run_batch(scenarios)
+    acc = SummaryAccumulator(stems_per_ha=400)
+    completed = sum(len(acc.add(yearly.iloc[i:i + 7])) for i in range(0, len(yearly), 7))
+    assert completed == len(scenarios) - 1  # the last scenario waits for the end of the stream
+    pd.testing.assert_frame_equal(acc.result(), summarize_results(yearly, stems_per_ha=400))
+
+
+def test_monthly_grid_summarizes_per_year():
+    sim = Simulator(species, regions)
+    options = {"stems_per_ha": 400, "establishment_kg_co2_per_tree": 30.0}
+    annual = summarize_results(sim.run_batch(scenarios), **options)
+    monthly = summarize_results(sim.run_batch(scenarios.assign(steps_per_year=12)), **options)
+    pd.testing.assert_frame_equal(monthly, annual, check_exact=False, rtol=1e-9)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+from benchmarks.suite import BenchResult, compare, regressions, save_baseline, load_baseline, time_callable
+
+
+def test_regression_gate(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline([BenchResult("a", 1.0, 0.9, 5), BenchResult("b", 2.0, 1.8, 5)], "quick", path)
+    save_baseline([BenchResult("a", 9.0, 9.0, 5)], "full", path)
+    current = [BenchResult("a", 1.2, 1.15, 5), BenchResult("b", 3.0, 2.9, 5), BenchResult("new", 1.0, 1.0, 5)]
+    cmps = compare(current, load_baseline(path), "quick")
+    assert [c.name for c in regressions(cmps, threshold=0.25)] == ["b"]
+    assert [c.name for c in regressions(cmps, threshold=0.1)] == ["a", "b"]
+    assert cmps[2].baseline_s is None and not cmps[2].regressed(0.0)
+
+    # A slow median with fast rounds is noise, not a regression
+    noisy = compare([BenchResult("a", 1.5, 1.05, 5)], load_baseline(path), "quick")
+    assert not regressions(noisy, threshold=0.25)
+    # Sub-millisecond jitter stays under the absolute noise floor
+    tiny = compare([BenchResult("tiny", 0.0009, 0.0008, 200)], {"quick": {"results": {"tiny": {"median_s": 0.0004}}}}, "quick")
+    assert not regressions(tiny) and regressions(tiny, min_delta_s=0.0)
+
+
+def test_time_callable_counts_rounds():
+    calls = []
+    result = time_callable("noop", lambda: calls.append(1), min_time=0.0, min_rounds=4)
+    assert result.rounds == 4 and len(calls) == 5  # plus one warm-up call
+    assert 0 <= result.best_s <= result.median_s
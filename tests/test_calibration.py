@@ -0,0 +1,59 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from src.data_models import SpeciesParams
+from src.calibration import (
+    build_calibration_report,
+    calibrate_climate_factor,
+    calibrate_climate_factors,
+    modeled_cseq_tco2_ha_per_year,
+    modeled_cseq_with_derivative,
+    species_param_table,
+)
+
+species = {
+    "Sal": SpeciesParams(species="Sal", K_biomass_kg=600.0, r_growth=0.26, t0_inflection=9.0, carbon_fraction=0.47, root_shoot_ratio=0.28),
+    "Oak": SpeciesParams(species="Oak", K_biomass_kg=400.0, r_growth=0.22, t0_inflection=10.0, carbon_fraction=0.48, root_shoot_ratio=0.35),
+}
+
+
+def test_vectorized_model_and_derivative_match_scalar():
+    params = species_param_table(species, ["Sal", "Oak"])
+    stems = np.array([756.0, 884.0])
+    for factor in (0.3, 1.0, 1.7):
+        value, deriv = modeled_cseq_with_derivative(params, factor, stems)
+        for i, key in enumerate(["Sal", "Oak"]):
+            scalar = modeled_cseq_tco2_ha_per_year(species[key], factor, stems[i])
+            assert abs(value[i] - scalar) < 1e-9
+            h = 1e-6
+            numeric = (modeled_cseq_tco2_ha_per_year(species[key], factor + h, stems[i])
+                       - modeled_cseq_tco2_ha_per_year(species[key], factor - h, stems[i])) / (2 * h)
+            assert abs(deriv[i] - numeric) < 1e-4
+
+
+def test_calibrate_climate_factors_agrees_with_bisection():
+    keys = ["Sal", "Oak", "Oak"]
+    stems = np.array([756.0, 884.0, 1200.0])
+    targets = np.array([4.63, 4.47, 3.0]) * (44.0 / 12.0)
+    result = calibrate_climate_factors(species_param_table(species, keys), stems, targets)
+    assert result.converged.all()
+    for i, key in enumerate(keys):
+        factor, modeled = calibrate_climate_factor(species[key], stems[i], targets[i])
+        assert abs(result.modeled[i] - targets[i]) <= 1e-3
+        assert abs(result.factor[i] - factor) < 1e-3
+    assert result.n_evaluations == result.evaluations.sum() > 0
+
+
+def test_build_calibration_report_flags_unknown_species():
+    bench = pd.DataFrame({
+        "species_group": ["Sal", "Unknown"],
+        "region_class": ["Subtropical", "Tropical"],
+        "stems_per_ha": [756, 500],
+        "cseq_mgc_ha_yr": [4.63, 3.0],
+        "reference": ["a", "b"],
+    })
+    report = build_calibration_report(species, bench)
+    assert pd.isna(report.loc[0, "note"])
+    assert abs(report.loc[0, "modeled_at_factor_tco2_ha_yr"] - 4.63 * 44.0 / 12.0) <= 1e-3
+    assert report.loc[1, "note"] == "species not found in species_params.csv"
+    assert np.isnan(report.loc[1, "recommended_climate_factor"])
@@ -0,0 +1,35 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from src.comparison import downsample, gapped_lines, lttb, mean_annual_rate_per_ha, scenario_grid
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(500.0)
+    y = np.vstack([np.sin(x / 40.0), np.where(x == 321, 10.0, 0.0)])
+    idx = lttb(x, y, 25)
+    assert idx.shape == (2, 25)
+    assert (idx[:, 0] == 0).all() and (idx[:, -1] == 499).all()
+    assert (np.diff(idx, axis=1) > 0).all()
+    assert 321 in idx[1]  # a lone spike survives
+    assert np.array_equal(lttb(x[:10], y[:, :10], 25), np.tile(np.arange(10), (2, 1)))
+
+
+def test_downsample_and_gapped_lines():
+    scenarios = scenario_grid(["A", "B"], ["R"], [100, 200, 300], years=99)
+    assert list(scenarios["scenario"])[:2] == ["A | R | 100", "A | R | 200"]
+    df = pd.DataFrame({
+        "scenario": np.repeat(scenarios["scenario"].to_numpy(), 100),
+        "year": np.tile(np.arange(100), 6),
+        "total_co2_tons": np.tile(np.sqrt(np.arange(100.0)), 6),
+    })
+    small = downsample(df, "year", "total_co2_tons", "scenario", max_points=120)
+    assert len(small) == 120 and small["scenario"].nunique() == 6
+    assert downsample(df, "year", "total_co2_tons", "scenario", max_points=10_000) is df
+
+    x, y, label = gapped_lines(small, "year", "total_co2_tons", "scenario")
+    assert len(x) == 125 and np.isnan(y).sum() == 5 and label[20] is None
+
+    rate = mean_annual_rate_per_ha(df, scenarios.assign(years=99), stems_per_ha=100)
+    assert np.isclose(rate["A | R | 100"], np.sqrt(99.0) / 100)
+    assert np.isclose(rate["B | R | 300"], np.sqrt(99.0) / 100 / 3)
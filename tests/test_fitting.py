@@ -0,0 +1,67 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from src.data_models import SpeciesParams
+from src.fitting import FitPrior, JointFit, fit_growth_parameters
+from src.growth_models import species_biomass
+
+TRUE = {
+    "Sal": SpeciesParams(species="Sal", K_biomass_kg=600.0, r_growth=0.26, t0_inflection=9.0, carbon_fraction=0.47, root_shoot_ratio=0.28),
+    "Oak": SpeciesParams(species="Oak", K_biomass_kg=400.0, r_growth=0.22, t0_inflection=10.0, carbon_fraction=0.48, root_shoot_ratio=0.35),
+}
+
+
+def synthetic_stands(factors: dict[str, float]) -> pd.DataFrame:
+    rows = []
+    for (name, sp), region in zip(TRUE.items(), factors):
+        for age in (4, 8, 12, 16, 25):
+            r = sp.r_growth * factors[region]
+            b0, b1 = (species_biomass(sp.growth_model, sp.K_biomass_kg, r, sp.t0_inflection, a) for a in (age, age + 1))
+            scale = (1.0 + sp.root_shoot_ratio) * sp.carbon_fraction  # 1000 stems/ha, kg -> Mg
+            rows.append({"species_group": name, "region_class": region, "stems_per_ha": 1000, "age_years": age,
+                         "cseq_mgc_ha_yr": (b1 - b0) * scale, "c_stock_mgc_ha": b0 * scale})
+    return pd.DataFrame(rows)
+
+
+def catalog(shift: float) -> dict[str, SpeciesParams]:
+    return {k: sp.model_copy(update={"K_biomass_kg": sp.K_biomass_kg * (1 + shift), "r_growth": sp.r_growth * (1 - shift),
+                                     "t0_inflection": sp.t0_inflection + 10 * shift}) for k, sp in TRUE.items()}
+
+
+def test_joint_fit_recovers_parameters_from_stand_series():
+    bench = synthetic_stands({"Subtropical": 1.0, "Temperate": 1.0})
+    fit = fit_growth_parameters(catalog(0.2), bench, prior=FitPrior(weight=1e-4), fit_regions=False)
+    assert fit.success
+    for name, sp in TRUE.items():
+        got = fit.species.loc[name]
+        assert abs(got["K_biomass_kg"] / sp.K_biomass_kg - 1) < 1e-3
+        assert abs(got["r_growth"] / sp.r_growth - 1) < 1e-3
+        assert abs(got["t0_inflection"] - sp.t0_inflection) < 1e-2
+    assert np.allclose(fit.residuals["modeled_cseq_mgc_ha_yr"], bench["cseq_mgc_ha_yr"], rtol=1e-3)
+
+
+def test_region_factor_absorbs_rows_of_unknown_species():
+    bench = synthetic_stands({"Subtropical": 1.0, "Temperate": 1.0})
+    # Oak-like stands listed under an uncatalogued species and grown 20% faster in their region class
+    fast = synthetic_stands({"Subtropical": 1.0, "Temperate": 1.2}).query("species_group == 'Oak'")
+    bench = pd.concat([bench[bench["species_group"] == "Sal"], fast.assign(species_group="Quercus")], ignore_index=True)
+    fit = fit_growth_parameters(TRUE, bench, region_ref_species={"Temperate": "Oak"}, prior=FitPrior(weight=1e-4))
+    assert list(fit.species.index) == ["Sal"]
+    factors = fit.region_overrides().set_index("region")["recommended_climate_factor"]
+    assert abs(factors["Temperate"] - 1.2) < 1e-3
+    assert abs(factors["Subtropical"] - 1.0) < 1e-3
+    assert list(fit.regions.columns) == ["region", "recommended_climate_factor", "n_benchmarks"]
+
+
+def test_warm_start_from_saved_fit(tmp_path):
+    bench = synthetic_stands({"Subtropical": 0.9, "Temperate": 1.1})
+    first = fit_growth_parameters(catalog(0.3), bench)
+    first.save(tmp_path / "fit.json")
+    again = fit_growth_parameters(catalog(0.3), bench, warm_start=JointFit.load(tmp_path / "fit.json"))
+    assert again.nfev < first.nfev
+    assert abs(again.cost - first.cost) < 1e-6 * max(first.cost, 1.0)
+    pd.testing.assert_frame_equal(again.species, first.species, rtol=1e-4)
+
+    frame = pd.DataFrame([sp.model_dump() for sp in TRUE.values()])
+    updated = again.species_frame(frame)
+    assert np.allclose(updated["K_biomass_kg"], again.species.loc[frame["species"], "K_biomass_kg"])
@@ -0,0 +1,84 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+from src.calibration import modeled_cseq_with_derivative, species_param_table
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.growth_models import GROWTH_MODELS, get_growth_model, logistic_biomass, species_biomass
+from src.simulator import Simulator
+
+species = {
+    "Logi": SpeciesParams(species="Logi", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3),
+    "Gomp": SpeciesParams(species="Gomp", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3,
+                          growth_model="gompertz"),
+    "Chap": SpeciesParams(species="Chap", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3,
+                          growth_model="chapman_richards", growth_shape=2.0),
+}
+
+
+def chapman_richards_closed_form(K, r, t0, t, p):
+    v = r * (np.asarray(t, dtype=float) - t0) + np.log(p)
+    return np.where(v > 0, K * (1.0 - np.exp(-np.maximum(v, 0.0))) ** p, 0.0)
+
+regions = {"R": RegionParams(region="R", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.2)}
+
+
+@pytest.mark.parametrize("name", sorted(GROWTH_MODELS))
+def test_derivatives_and_inverse(name):
+    model = get_growth_model(name)
+    K, r, t0, h = 120.0, 0.4, 6.0, 1e-6
+    p = 2.5 if name == "chapman_richards" else None  # a non-integer exponent
+    t = np.linspace(0.5, 25.0, 40)
+
+    def biomass(K, r, t0, t):
+        return model.biomass(K, r, t0, t, p)
+
+    d = model.derivatives(K, r, t0, t, p)
+    assert np.allclose(d["K"], (biomass(K + h, r, t0, t) - biomass(K - h, r, t0, t)) / (2 * h), atol=1e-6)
+    assert np.allclose(d["r"], (biomass(K, r + h, t0, t) - biomass(K, r - h, t0, t)) / (2 * h), atol=1e-5)
+    assert np.allclose(d["t0"], (biomass(K, r, t0 + h, t) - biomass(K, r, t0 - h, t)) / (2 * h), atol=1e-5)
+    assert np.allclose(d["t"], (biomass(K, r, t0, t + h) - biomass(K, r, t0, t - h)) / (2 * h), atol=1e-5)
+    b = biomass(K, r, t0, t)
+    assert np.isfinite(b).all() and (b >= 0).all()
+    if name == "chapman_richards":
+        assert np.allclose(b, chapman_richards_closed_form(K, r, t0, t, p))
+    grown = b > 0  # Chapman-Richards starts at zero some years before t0
+    assert np.allclose(model.time_to_biomass(K, r, t0, b[grown], p), t[grown])
+    # t0 is the inflection year for every model
+    assert abs(d["t"][np.argmin(np.abs(t - t0))] - d["t"].max()) < 0.05 * d["t"].max()
+
+
+def test_species_biomass_dispatch_and_unknown_model():
+    models = np.array(["logistic", "gompertz", "logistic"], dtype=object)
+    got = species_biomass(models, 100.0, 0.5, 5.0, np.array([3.0, 3.0, 8.0]))
+    assert np.isclose(got[0], logistic_biomass(100.0, 0.5, 5.0, 3.0))
+    assert np.isclose(got[1], get_growth_model("gompertz").biomass(100.0, 0.5, 5.0, 3.0))
+    with pytest.raises(ValueError):
+        SpeciesParams(species="X", K_biomass_kg=1.0, r_growth=0.1, t0_inflection=1.0, carbon_fraction=0.5,
+                      root_shoot_ratio=0.2, growth_model="richards?")
+
+
+def test_simulator_and_calibration_use_species_model():
+    sim = Simulator(species, regions)
+    years = np.arange(21)
+    for name, sp in species.items():
+        df = sim.run(Scenario(scenario="s", species=name, region="R", trees_planted=10, years=20)).to_dataframe()
+        if sp.growth_model == "chapman_richards":
+            expected = chapman_richards_closed_form(100.0, 0.5 * 1.2, 5.0, years, sp.growth_shape)
+        else:
+            expected = get_growth_model(sp.growth_model).biomass(100.0, 0.5 * 1.2, 5.0, years, sp.growth_shape)
+        assert np.allclose(df["above_biomass_kg_per_tree"], expected)
+
+    batch = sim.run_batch(pd.DataFrame({
+        "scenario": list(species), "species": list(species), "region": "R", "trees_planted": 10, "years": 20,
+    }))
+    for name in species:
+        single = sim.run(Scenario(scenario=name, species=name, region="R", trees_planted=10, years=20)).to_dataframe()
+        assert np.allclose(batch[batch["scenario"] == name]["total_co2_tons"], single["total_co2_tons"])
+
+    params = species_param_table(species, list(species))
+    value, deriv = modeled_cseq_with_derivative(params, 1.3, 800.0)
+    h = 1e-6
+    up, _ = modeled_cseq_with_derivative(params, 1.3 + h, 800.0)
+    down, _ = modeled_cseq_with_derivative(params, 1.3 - h, 800.0)
+    assert np.allclose(deriv, (up - down) / (2 * h), rtol=1e-5)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.harvest import pool_stock
+from src.simulator import Simulator
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {"R": RegionParams(region="R", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)}
+base = dict(species="Test", region="R", trees_planted=1000)
+
+
+def test_pool_stock_is_first_order_decay():
+    inflow = np.zeros(50)
+    inflow[[3, 10]] = [8.0, 4.0]
+    stock, expected, level = pool_stock(inflow, 5.0), np.zeros(50), 0.0
+    for t in range(50):
+        level = level * 0.5 ** (1 / 5.0) + inflow[t]
+        expected[t] = level
+    np.testing.assert_allclose(stock, expected, rtol=1e-12, atol=1e-12)
+    # rows of a 2-D inflow use their own half-lives
+    both = pool_stock(np.stack([inflow, inflow]), np.array([5.0, 1.0]))
+    np.testing.assert_allclose(both[0], expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(both[1], pool_stock(inflow, 1.0), rtol=1e-9, atol=1e-9)
+
+
+def test_rotation_thinning_and_pools():
+    sim = Simulator(species, regions)
+    plain = sim.run(Scenario(scenario="p", **base, years=60)).to_dataframe()
+    managed = sim.run(Scenario(scenario="m", **base, years=60, rotation_years=20, thinning_ages=[8], thinning_fraction=0.25,
+                               product_fraction=0.6, product_half_life_years=10.0)).to_dataframe()
+    # every rotation restarts from the replanted cohort, with a 25% thinning at age 8
+    for start in (0, 20, 40):
+        np.testing.assert_allclose(managed["co2_kg_per_tree"].iloc[start:start + 20], plain["co2_kg_per_tree"].iloc[:20])
+        np.testing.assert_allclose(managed["living_trees"].iloc[start:start + 8], plain["living_trees"].iloc[:8])
+        np.testing.assert_allclose(managed["living_trees"].iloc[start + 8:start + 20], 0.75 * plain["living_trees"].iloc[8:20])
+    removed = managed["removed_co2_tons"].to_numpy()
+    assert np.flatnonzero(removed).tolist() == [8, 20, 28, 40, 48, 60]
+    assert removed[8] == pytest.approx(0.25 * plain["total_co2_tons"].iloc[8])
+    assert removed[20] == pytest.approx(0.75 * plain["total_co2_tons"].iloc[20])
+    # products decay with their half-life between removals; all pools add up to the stored total
+    products = managed["products_co2_tons"].to_numpy()
+    assert products[18] == pytest.approx(products[8] * 0.5)
+    np.testing.assert_allclose(managed["stored_co2_tons"],
+                               managed["total_co2_tons"] + products + managed["deadwood_co2_tons"])
+
+    scenarios = pd.DataFrame([
+        {"scenario": "m", **base, "years": 60, "rotation_years": 20, "thinning_ages": "8", "thinning_fraction": 0.25,
+         "product_fraction": 0.6, "product_half_life_years": 10.0},
+        {"scenario": "q", **base, "years": 45, "rotation_years": 12, "thinning_ages": None, "steps_per_year": 4},
+        {"scenario": "p", **base, "years": 30},
+    ]).assign(steps_per_year=lambda d: d["steps_per_year"].fillna(1).astype(int))
+    for cache_size in (1024, 0):
+        batch = Simulator(species, regions, cache_size=cache_size).run_batch(scenarios)
+        for row in scenarios.to_dict(orient="records"):
+            expected = sim.run(Scenario(**{k: v for k, v in row.items() if not pd.isna(v)})).to_dataframe()
+            got = batch[batch["scenario"] == row["scenario"]].drop(columns="scenario").reset_index(drop=True)
+            pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False, rtol=1e-9, atol=1e-9)
+
+    with pytest.raises(ValueError):
+        Scenario(scenario="x", **base, years=30, rotation_years=10, thinning_ages=[12])
+
+
+def test_schedule_with_rotation_sums_shifted_cohorts():
+    sim = Simulator(species, regions)
+    common = dict(species="Test", region="R", years=30, rotation_years=10, thinning_ages=[4])
+    portfolio = sim.run(Scenario(scenario="s", planting_schedule=[600, 0, 400], **common)).to_dataframe()
+    first = sim.run(Scenario(scenario="a", trees_planted=600, **common)).to_dataframe()
+    second = sim.run(Scenario(scenario="b", trees_planted=400, **common)).to_dataframe()
+    for column in ("living_trees", "total_co2_tons", "removed_co2_tons", "products_co2_tons", "deadwood_co2_tons"):
+        expected = first[column].to_numpy().copy()
+        expected[2:] += second[column].to_numpy()[:-2]
+        np.testing.assert_allclose(portfolio[column], expected, rtol=1e-9, atol=1e-9)
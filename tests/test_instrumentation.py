@@ -0,0 +1,54 @@
+from __future__ import annotations
+import pandas as pd
+from src import instrumentation
+from src.calibration import calibrate_climate_factor
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.instrumentation import Profiler, count, stage
+from src.simulator import Simulator
+
+species = {"Teak": SpeciesParams(species="Teak", K_biomass_kg=500.0, r_growth=0.35, t0_inflection=8.0, carbon_fraction=0.47, root_shoot_ratio=0.25)}
+regions = {"Trop": RegionParams(region="Trop", survival_rate_year1=0.85, annual_mortality_rate=0.03, climate_factor=1.1)}
+scenarios = pd.DataFrame({"scenario": ["a", "b"], "species": "Teak", "region": "Trop", "trees_planted": [100, 200], "years": [10, 20]})
+
+
+def test_profiler_records_stages_and_counters():
+    sim = Simulator(species, regions)
+    sc = Scenario(scenario="s", species="Teak", region="Trop", trees_planted=10, years=15)
+    with Profiler() as prof:
+        sim.run(sc).to_dataframe()
+        sim.run(sc)
+        sim.run_batch(scenarios)
+        calibrate_climate_factor(species["Teak"], 1100, 8.0)
+    assert instrumentation._ACTIVE is None
+    assert {"simulate.run", "simulate.run_batch", "to_dataframe", "calibrate.scalar", "growth"} <= set(prof.stages)
+    assert prof.counters["scenarios_run"] == 4
+    assert prof.counters["curve_cache.hits"] > 0
+    assert prof.counters["calibration.bisection_iterations"] > 0
+    assert prof.stages["simulate.run"].calls == 2
+
+    trace = prof.chrome_trace()
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert len(complete) == sum(s.calls for s in prof.stages.values())
+    assert all(e["dur"] >= 0 and e["ts"] >= 0 for e in complete)
+    assert {e["name"] for e in trace["traceEvents"] if e["ph"] == "C"} == set(prof.counters)
+
+
+def test_allocation_tracking_nests():
+    with Profiler(track_allocations=True) as prof:
+        with stage("outer"):
+            with stage("inner"):
+                block = bytearray(4_000_000)
+            del block
+    assert prof.stages["inner"].peak_bytes >= 4_000_000
+    # The child's peak counts toward the parent even though it was freed before the parent exited
+    assert prof.stages["outer"].peak_bytes >= 4_000_000
+    assert prof.stages["outer"].net_bytes < 1_000_000
+
+
+def test_disabled_hooks_record_nothing():
+    prof = Profiler()
+    count("x")
+    with stage("y"):
+        pass
+    Simulator(species, regions).run_batch(scenarios)
+    assert not prof.stages and not prof.counters
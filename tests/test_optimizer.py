@@ -0,0 +1,58 @@
+from __future__ import annotations
+import pandas as pd
+import pytest
+from src.data_models import SpeciesParams, RegionParams
+from src.optimizer import optimize_portfolio, per_tree_tco2_at
+from src.simulator import Simulator
+
+species = {
+    "Fast": SpeciesParams(species="Fast", K_biomass_kg=300.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3),
+    "Slow": SpeciesParams(species="Slow", K_biomass_kg=600.0, r_growth=0.2, t0_inflection=12.0, carbon_fraction=0.47, root_shoot_ratio=0.3),
+}
+regions = {
+    "Good": RegionParams(region="Good", survival_rate_year1=0.9, annual_mortality_rate=0.02, climate_factor=1.1),
+    "Poor": RegionParams(region="Poor", survival_rate_year1=0.6, annual_mortality_rate=0.06, climate_factor=0.8),
+}
+costs = pd.DataFrame({
+    "species": ["Fast", "Fast", "Slow", "Slow"],
+    "region": ["Good", "Poor", "Good", "Poor"],
+    "cost_per_tree": [2.0, 1.5, 3.0, 2.5],
+})
+
+
+def test_budget_allocation_respects_limits_and_matches_simulation():
+    sim = Simulator(species, regions)
+    alloc = optimize_portfolio(sim, costs, horizon=20, budget=10_000.0, region_limits={"Good": 2_000, "Poor": 3_000})
+    assert alloc.total_cost <= 10_000.0
+    by_region = alloc.table.groupby("region")["trees_planted"].sum()
+    assert by_region.get("Good", 0) <= 2_000 and by_region.get("Poor", 0) <= 3_000
+    simulated = sim.run_batch(alloc.to_scenarios())
+    final = simulated[simulated["year"] == 20]["total_co2_tons"].sum()
+    assert abs(final - alloc.total_tco2) < 1e-6 * alloc.total_tco2
+    greedy = optimize_portfolio(sim, costs, horizon=20, budget=10_000.0, region_limits={"Good": 2_000, "Poor": 3_000}, method="greedy")
+    assert greedy.total_tco2 <= alloc.total_tco2 * (1 + 1e-6)
+
+
+def test_target_at_minimum_cost():
+    sim = Simulator(species, regions)
+    alloc = optimize_portfolio(sim, costs, horizon=20, target_tco2=100.0)
+    assert alloc.total_tco2 >= 100.0
+    # without limits the pair with the most tCO2 per unit cost does everything
+    ratio = per_tree_tco2_at(sim, costs["species"], costs["region"], 20) / costs["cost_per_tree"].to_numpy()
+    best = costs.iloc[ratio.argmax()]
+    assert len(alloc.table) == 1
+    assert (alloc.table.loc[0, "species"], alloc.table.loc[0, "region"]) == (best["species"], best["region"])
+    with pytest.raises(ValueError):
+        optimize_portfolio(sim, costs, horizon=20, target_tco2=1e9, region_limits={"Good": 10, "Poor": 10})
+
+
+def test_target_rounding_stays_within_caps():
+    sim = Simulator(species, regions)
+    per_tree = per_tree_tco2_at(sim, costs["species"], costs["region"], 20)
+    # caps that bind at a fraction of a tree: rounding every pair up would overshoot them
+    limits = {"Good": 400.5, "Poor": 10_000}
+    target = float(per_tree[[0, 2]].max() * 400.5 + per_tree[1] * 0.5)
+    for method in ("lp", "greedy"):
+        alloc = optimize_portfolio(sim, costs, horizon=20, target_tco2=target, region_limits=limits, method=method)
+        by_region = alloc.table.groupby("region")["trees_planted"].sum()
+        assert by_region.get("Good", 0) <= 400 and alloc.total_tco2 >= target
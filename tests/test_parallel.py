@@ -0,0 +1,41 @@
+from __future__ import annotations
+import pandas as pd
+import pytest
+from src.data_models import SpeciesParams, RegionParams
+from src.parallel import PortfolioError, run_parallel
+from src.simulator import Simulator
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {"TestRegion": RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)}
+
+
+def _portfolio(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "scenario": [f"s{i}" for i in range(n)],
+        "species": "Test",
+        "region": "TestRegion",
+        "trees_planted": [100 + i for i in range(n)],
+        "years": [5 + i % 7 for i in range(n)],
+    })
+
+
+def test_run_parallel_matches_run_batch_in_order():
+    sim = Simulator(species, regions)
+    scenarios = _portfolio(50)
+    seen = []
+    result = run_parallel(sim, scenarios, n_workers=2, shard_size=8, progress=seen.append)
+    pd.testing.assert_frame_equal(result.frame, sim.run_batch(scenarios))
+    assert sorted(r.shard for r in seen) == list(range(7))
+    assert not result.failed
+
+
+def test_run_parallel_reports_failed_shards():
+    sim = Simulator(species, regions)
+    scenarios = _portfolio(20)
+    scenarios.loc[13, "species"] = "Missing"
+    with pytest.raises(PortfolioError) as info:
+        run_parallel(sim, scenarios, n_workers=2, shard_size=5)
+    assert [s.shard for s in info.value.failed] == [2]
+    partial = run_parallel(sim, scenarios, n_workers=2, shard_size=5, raise_on_error=False)
+    assert len(partial.failed) == 1
+    assert set(partial.frame["scenario"]) == set(scenarios["scenario"]) - {f"s{i}" for i in range(10, 15)}
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pytest
+from src.calibration import species_param_table
+from src.data_models import SpeciesParams, RegionParams
+from src.parameter_store import ParameterStore
+from src.simulator import Simulator
+
+species_df = pd.DataFrame({
+    "species": ["A", "B"],
+    "K_biomass_kg": [100.0, 300.0],
+    "r_growth": [0.5, 0.3],
+    "t0_inflection": [5.0, 8.0],
+    "carbon_fraction": [0.47, 0.48],
+    "root_shoot_ratio": [0.3, 0.25],
+    "growth_model": ["logistic", None],
+})
+regions_df = pd.DataFrame({
+    "region": ["Wet", "Dry"],
+    "survival_rate_year1": [0.8, 0.6],
+    "annual_mortality_rate": [0.05, 0.1],
+    "climate_factor": [1.0, 0.8],
+})
+
+
+def test_store_matches_pydantic_rows_and_applies_overrides():
+    overrides = pd.DataFrame({"region": ["Dry", "New"], "recommended_climate_factor": [0.5, 1.2],
+                              "survival_rate_year1": [np.nan, 0.9], "annual_mortality_rate": [np.nan, 0.02]})
+    store = ParameterStore.from_frames(species_df, regions_df, overrides)
+    for row in species_df.assign(growth_model="logistic").to_dict(orient="records"):
+        assert store.species[row["species"]] == SpeciesParams(**row)
+    assert list(store.regions) == ["Wet", "Dry", "New"]
+    assert store.regions["Dry"] == RegionParams(region="Dry", survival_rate_year1=0.6, annual_mortality_rate=0.1, climate_factor=0.5)
+    assert store.regions.columns["climate_factor"].dtype == np.float64
+    assert list(store.species.ids(["B", "A", "B"])) == [1, 0, 1]
+    with pytest.raises(KeyError):
+        store.species.ids(["A", "Nope"])
+
+
+def test_store_validates_in_bulk():
+    bad = species_df.copy()
+    bad.loc[1, "carbon_fraction"] = 1.5
+    with pytest.raises(ValueError, match="carbon_fraction: must be < 1"):
+        ParameterStore.from_frames(bad, regions_df)
+    with pytest.raises(ValueError, match="unknown growth model"):
+        ParameterStore.from_frames(species_df.assign(growth_model="cubic"), regions_df)
+    with pytest.raises(ValueError, match="duplicate region"):
+        ParameterStore.from_frames(species_df, pd.concat([regions_df, regions_df]))
+
+
+def test_simulator_accepts_store():
+    store = ParameterStore.from_frames(species_df, regions_df)
+    species = {r["species"]: SpeciesParams(**r) for r in species_df.assign(growth_model="logistic").to_dict(orient="records")}
+    regions = {r["region"]: RegionParams(**r) for r in regions_df.to_dict(orient="records")}
+    scenarios = pd.DataFrame({
+        "scenario": ["s1", "s2", "s3"], "species": ["A", "B", "B"], "region": ["Dry", "Wet", "Dry"],
+        "trees_planted": [100, 200, 300], "years": [5, 12, 8],
+    })
+    expected = Simulator(species, regions).run_batch(scenarios)
+    pd.testing.assert_frame_equal(Simulator(store).run_batch(scenarios), expected)
+    # Direct (uncached) path gathers straight from the store's arrays
+    pd.testing.assert_frame_equal(Simulator(store, cache_size=0).run_batch(scenarios), expected)
+    pd.testing.assert_frame_equal(species_param_table(store.species, ["B", "X"]), species_param_table(species, ["B", "X"]))
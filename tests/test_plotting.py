@@ -0,0 +1,52 @@
+from __future__ import annotations
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Import-time budget for `import src.simulator` in a fresh interpreter, in seconds. The project's own
+# modules are budgeted separately from numpy/pandas/pydantic, whose cost we do not control.
+SIMULATOR_IMPORT_BUDGET_S = 3.0
+PROJECT_IMPORT_BUDGET_S = 0.3
+HEAVY_MODULES = ("matplotlib", "seaborn", "scipy", "plotly", "streamlit")
+
+
+def _import_profile(module: str) -> tuple[dict[str, tuple[int, int]], set[str]]:
+    code = f"import sys, {module}; print(','.join(sorted(m.split('.')[0] for m in sys.modules)))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          check=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self" not in line:
+            self_us, cum_us, name = (p.strip() for p in line[len("import time:"):].split("|"))
+            times[name] = (int(self_us), int(cum_us))
+    return times, set(proc.stdout.strip().split(","))
+
+
+def test_simulator_import_budget():
+    times, loaded = _import_profile("src.simulator")
+    assert not loaded & set(HEAVY_MODULES)
+    assert times["src.simulator"][1] / 1e6 < SIMULATOR_IMPORT_BUDGET_S
+    project = sum(s for name, (s, _) in times.items() if name == "src" or name.startswith("src."))
+    assert project / 1e6 < PROJECT_IMPORT_BUDGET_S
+
+
+def test_render_pngs_reuses_one_figure(tmp_path):
+    from src.plotting import render_pngs
+    import matplotlib.pyplot as plt
+
+    before = len(plt.get_fignums())
+    years = np.arange(11)
+    jobs = [
+        (pd.DataFrame({"year": years, "total_co2_tons": years * k}), tmp_path / f"s{k}.png", f"scenario {k}")
+        for k in range(1, 6)
+    ]
+    paths = render_pngs(jobs)
+    assert [p.name for p in paths] == [f"s{k}.png" for k in range(1, 6)]
+    assert all(p.stat().st_size > 0 and p.read_bytes()[:4] == b"\x89PNG" for p in paths)
+    assert len(plt.get_fignums()) == before
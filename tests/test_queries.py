@@ -0,0 +1,60 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.growth_models import LogisticGrowth
+from src.simulator import Simulator
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {
+    "TestRegion": RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0),
+    "Harsh": RegionParams(region="Harsh", survival_rate_year1=0.6, annual_mortality_rate=0.1, climate_factor=0.8),
+}
+
+
+def test_logistic_inverse_roundtrip():
+    g = LogisticGrowth(K=100.0, r=0.5, t0=5.0)
+    t = np.array([0.0, 2.5, 5.0, 11.0])
+    assert np.allclose(g.time_to_biomass([g.biomass_at(x) for x in t]), t)
+    assert g.time_to_biomass(100.0) == np.inf
+
+
+def test_year_to_reach_matches_simulation_scan():
+    sim = Simulator(species, regions)
+    targets = np.array([0.5, 5.0, 20.0, 35.0, 1e6])
+    got = sim.year_to_reach("Test", "TestRegion", 1000, targets, max_years=40)
+    df = sim.run(Scenario(scenario="s", species="Test", region="TestRegion", trees_planted=1000, years=40)).to_dataframe()
+    for target, year in zip(targets, got):
+        hit = df.index[df["total_co2_tons"] >= target]
+        assert year == (df.loc[hit[0], "year"] if len(hit) else -1)
+
+
+def test_trees_needed_reaches_target_in_one_call():
+    sim = Simulator(species, regions)
+    regions_col = np.array(["TestRegion", "Harsh", "Harsh"])
+    targets = np.array([10.0, 10.0, 3.0])
+    years = np.array([10, 10, 20])
+    trees = sim.trees_needed("Test", regions_col, targets, years)
+    for rg, target, year, n in zip(regions_col, targets, years, trees):
+        df = sim.run(Scenario(scenario="s", species="Test", region=rg, trees_planted=int(n), years=int(year))).to_dataframe()
+        assert df["total_co2_tons"].iloc[-1] >= target
+        fewer = sim.run(Scenario(scenario="s", species="Test", region=rg, trees_planted=int(n) - 1, years=int(year))).to_dataframe()
+        assert fewer["total_co2_tons"].iloc[-1] < target
+
+
+def test_trees_needed_flags_unreachable_and_rejects_negative_years():
+    cr = SpeciesParams(species="CR", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47,
+                       root_shoot_ratio=0.3, growth_model="chapman_richards")
+    sim = Simulator({**species, "CR": cr}, regions)
+    # Chapman-Richards trees hold no CO2 in year 0: a positive target is unreachable, a zero one needs no trees
+    assert list(sim.trees_needed("CR", "TestRegion", [10.0, 0.0], 0)) == [-1, 0]
+    assert sim.trees_needed("CR", "TestRegion", 10.0, 10) > 0
+    with pytest.raises(ValueError):
+        sim.trees_needed("Test", "TestRegion", 10.0, -1)
+
+
+def test_age_to_reach_per_tree_co2_inverts_curve():
+    sim = Simulator(species, regions)
+    df = sim.run(Scenario(scenario="s", species="Test", region="Harsh", trees_planted=1, years=12)).to_dataframe()
+    ages = sim.age_to_reach_per_tree_co2("Test", "Harsh", df["co2_kg_per_tree"].to_numpy())
+    assert np.allclose(ages, df["year"])
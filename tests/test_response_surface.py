@@ -0,0 +1,47 @@
+from __future__ import annotations
+import pandas as pd
+import pytest
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.response_surface import ResponseSurface
+from src.simulator import Simulator
+
+species = {
+    "Teak": SpeciesParams(species="Teak", K_biomass_kg=500.0, r_growth=0.35, t0_inflection=8.0, carbon_fraction=0.47, root_shoot_ratio=0.25),
+    "Pine": SpeciesParams(species="Pine", K_biomass_kg=300.0, r_growth=0.25, t0_inflection=10.0, carbon_fraction=0.5, root_shoot_ratio=0.2,
+                          growth_model="chapman_richards"),
+}
+regions = {
+    "Trop": RegionParams(region="Trop", survival_rate_year1=0.85, annual_mortality_rate=0.03, climate_factor=1.1),
+    "Temp": RegionParams(region="Temp", survival_rate_year1=0.9, annual_mortality_rate=0.02, climate_factor=0.8),
+}
+
+
+def test_surface_matches_simulator():
+    surface = ResponseSurface.build(species, regions, horizon=30)
+    assert surface.co2_kg.shape == (2, 2, 31) and not surface.co2_kg.flags.writeable
+    sim = Simulator(species, regions)
+    for sp in species:
+        for rg in regions:
+            sc = Scenario(scenario="s", species=sp, region=rg, trees_planted=750, years=23)
+            pd.testing.assert_frame_equal(surface.run(sc).to_dataframe(), sim.run(sc).to_dataframe())
+
+
+def test_surface_rejects_out_of_range():
+    surface = ResponseSurface.build(species, regions, horizon=10)
+    with pytest.raises(ValueError, match="horizon"):
+        surface.run(Scenario(scenario="s", species="Teak", region="Trop", trees_planted=10, years=11))
+    with pytest.raises(KeyError):
+        surface.columns("Oak", "Trop", 10, 5)
+    with pytest.raises(ValueError, match="planting schedules"):
+        surface.run(Scenario(scenario="s", species="Teak", region="Trop", trees_planted=10, years=5, planting_schedule=[5, 5]))
+
+
+def test_surface_batch_matches_simulator():
+    surface = ResponseSurface.build(species, regions, horizon=30)
+    scenarios = pd.DataFrame({
+        "scenario": ["a", "b", "c"], "species": ["Pine", "Teak", "Pine"], "region": ["Temp", "Trop", "Trop"],
+        "trees_planted": [10, 200, 3000], "years": [5, 30, 12],
+    })
+    pd.testing.assert_frame_equal(surface.run_batch(scenarios), Simulator(species, regions).run_batch(scenarios))
+    with pytest.raises(KeyError, match="Oak"):
+        surface.run_batch(scenarios.assign(species="Oak"))
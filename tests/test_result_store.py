@@ -0,0 +1,47 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.result_store import ResultStore
+from src.simulator import Simulator
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {"TestRegion": RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)}
+
+
+def test_simulator_reuses_stored_results_across_instances(tmp_path):
+    sc = Scenario(scenario="a", species="Test", region="TestRegion", trees_planted=1000, years=20)
+    first = Simulator(species, regions, store=ResultStore(tmp_path)).run(sc).to_dataframe()
+
+    store = ResultStore(tmp_path)
+    renamed = sc.model_copy(update={"scenario": "b"})
+    out = Simulator(species, regions, store=store).run(renamed)
+    assert store.stats.hits == 1 and store.stats.misses == 0
+    assert out.scenario.scenario == "b"
+    assert isinstance(out.columns.total_co2_tons.base, np.memmap)
+    pd.testing.assert_frame_equal(out.to_dataframe(), first)
+
+    # any parameter change is a different key
+    other = {"TestRegion": regions["TestRegion"].model_copy(update={"climate_factor": 1.1})}
+    Simulator(species, other, store=store).run(sc)
+    assert store.stats.misses == 1
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = ResultStore(tmp_path, max_bytes=3000)
+    for i in range(6):
+        store.put_arrays(f"{i:064x}", {"a": np.arange(100, dtype=float)})
+        store.get_arrays(f"{0:064x}")  # keep entry 0 hot
+    assert store.size_bytes() <= 3000
+    assert store.stats.evictions > 0
+    assert store.get_arrays(f"{0:064x}") is not None
+    assert store.get_arrays(f"{1:064x}") is None
+
+
+def test_calibration_results_are_memoized(tmp_path):
+    store = ResultStore(tmp_path)
+    sp = species["Test"]
+    first = store.calibrate_climate_factor(sp, 800.0, 10.0, age_years=10)
+    again = ResultStore(tmp_path).calibrate_climate_factor(sp, 800.0, 10.0, age_years=10)
+    assert first == again
+    assert store.stats.writes == 1
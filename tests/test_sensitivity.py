@@ -0,0 +1,52 @@
+from __future__ import annotations
+import numpy as np
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.sensitivity import PARAMETERS, MorrisAnalysis, ParameterSpace, SobolAnalysis, evaluate_total_co2
+from src.simulator import Simulator
+
+sp = SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)
+rg = RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)
+
+
+def test_evaluate_total_co2_matches_simulator():
+    point = {**sp.model_dump(), **rg.model_dump()}
+    X = np.array([[point[p] for p in PARAMETERS]])
+    got = evaluate_total_co2(X, 20, trees_planted=1000)[0]
+    sim = Simulator({"Test": sp}, {"TestRegion": rg})
+    df = sim.run(Scenario(scenario="s", species="Test", region="TestRegion", trees_planted=1000, years=20)).to_dataframe()
+    assert np.allclose(got, df["total_co2_tons"])
+
+    # Same model path as the simulator, so grids, management and growth models carry over
+    chap = sp.model_copy(update={"growth_model": "chapman_richards", "growth_shape": 2.5})
+    managed = {"steps_per_year": 4, "rotation_years": 12, "thinning_ages": "6"}
+    got = evaluate_total_co2(X, 30, trees_planted=1000, growth_model="chapman_richards", growth_shape=2.5, **managed)[0]
+    sim = Simulator({"Test": chap}, {"TestRegion": rg})
+    df = sim.run(Scenario(scenario="s", species="Test", region="TestRegion", trees_planted=1000, years=30, **managed)).to_dataframe()
+    assert np.allclose(got, df["total_co2_tons"])
+
+
+def test_sobol_attributes_variance_to_the_only_varying_parameters():
+    point = {**sp.model_dump(), **rg.model_dump()}
+    bounds = {p: (point[p], point[p]) for p in PARAMETERS}
+    bounds["K_biomass_kg"] = (80.0, 120.0)
+    bounds["annual_mortality_rate"] = (0.01, 0.1)
+    analysis = SobolAnalysis(ParameterSpace(bounds), years=30, seed=1)
+    table = analysis.run(tol=0.02, n_start=512)
+    assert table.attrs["converged"]
+    assert analysis.n_evaluations == analysis.n * (len(PARAMETERS) + 2)
+    late = table[table["year"] == 30].set_index("parameter")
+    assert late.loc[["K_biomass_kg", "annual_mortality_rate"], "ST"].sum() > 0.95
+    assert abs(late.loc["r_growth", "ST"]) < 1e-9
+    # year 0 has no mortality yet, so K explains everything
+    first = table[table["year"] == 0].set_index("parameter")
+    assert abs(first.loc["K_biomass_kg", "S1"] - 1.0) < 0.05
+
+
+def test_morris_screens_out_fixed_parameters():
+    space = ParameterSpace.around(sp, rg, rel=0.2)
+    fixed = dict(space.bounds, t0_inflection=(5.0, 5.0))
+    table = MorrisAnalysis(ParameterSpace(fixed), years=15, seed=0).run(r_start=20)
+    late = table[table["year"] == 15].set_index("parameter")
+    assert late.loc["t0_inflection", "mu_star"] == 0.0
+    assert late.loc["K_biomass_kg", "mu_star"] > 0
+    assert late.loc["annual_mortality_rate", "mu"] < 0
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import asyncio
+import time
+from pathlib import Path
+import numpy as np
+import pytest
+from src.calibration import calibrate_climate_factor
+from src.data_models import Scenario
+from src.parameter_store import ParameterStore
+from src.queries import year_to_reach
+from src.service import MicroBatcher, Overloaded, SimulationServer, SimulationService, request_json
+from src.simulator import Simulator
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+
+
+def serve(check, **options):
+    store = ParameterStore.load(DATA, overrides=False)
+
+    async def main():
+        server = SimulationServer(SimulationService(store, **options), port=0)
+        port = await server.start()
+        try:
+            return await check(store, port)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+async def post_all(port, path, bodies):
+    async def one(body):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return await request_json(reader, writer, "POST", path, body)
+        finally:
+            writer.close()
+
+    return await asyncio.gather(*(one(b) for b in bodies))
+
+
+def test_concurrent_requests_are_batched_and_match_direct_calls():
+    bodies = [{"scenario": f"s{i}", "species": sp, "region": rg, "trees_planted": 100 + i, "years": 5 + i % 7}
+              for i, (sp, rg) in enumerate([("Teak", "Tropical"), ("Oak", "Temperate"), ("Sal", "Subtropical")] * 10)]
+    bodies.append({**bodies[0], "scenario": "sched", "planting_schedule": [100, 0, 0, 50], "trees_planted": 150})
+
+    async def check(store, port):
+        replies = await post_all(port, "/simulate", bodies)
+        ytr = await post_all(port, "/query/year_to_reach",
+                             [{"species": "Teak", "region": "Tropical", "trees_planted": 1000, "target_tco2": t} for t in (5, 50)])
+        cal = await post_all(port, "/calibrate", [{"species": "Oak", "stems_per_ha": 1100, "target_cseq_tco2_ha_yr": 5.0}])
+        bad = await post_all(port, "/simulate", [{**bodies[0], "species": "Nope"}])
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        _, metrics = await request_json(reader, writer, "GET", "/metrics")
+        writer.close()
+        return store, replies, ytr, cal, bad, metrics
+
+    store, replies, ytr, cal, bad, metrics = serve(check, max_wait_s=0.05)
+    sim = Simulator(store)
+    for body, (status, reply) in zip(bodies, replies):
+        assert status == 200 and reply["scenario"] == body["scenario"]
+        expected = sim.run(Scenario(**body)).columns
+        np.testing.assert_allclose(reply["total_co2_tons"], expected.total_co2_tons, rtol=1e-12)
+        assert reply["year"] == list(expected.year)
+    assert [r["year"] for _, r in ytr] == list(year_to_reach(sim, "Teak", "Tropical", 1000, [5, 50]))
+    factor, _ = calibrate_climate_factor(store.species["Oak"], 1100, 5.0)
+    assert cal[0][1]["factor"] == pytest.approx(factor, rel=1e-2)
+    assert bad[0][0] == 400
+    batches = metrics["batchers"]["simulate"]
+    assert batches["items"] == len(bodies) and batches["batches"] < len(bodies)
+    assert metrics["endpoints"]["simulate"]["requests"] == len(bodies) + 1
+    assert metrics["endpoints"]["simulate"]["errors"] == 1
+
+
+def test_trees_needed_rejects_negative_year():
+    async def check(store, port):
+        return await post_all(port, "/query/trees_needed",
+                              [{"species": "Teak", "region": "Tropical", "target_tco2": 10.0, "year": y} for y in (-1, 10)])
+
+    (bad, _), (ok, reply) = serve(check)
+    assert bad == 400 and ok == 200 and reply["trees_planted"] > 0
+
+
+def test_malformed_requests_get_400():
+    async def send(port, raw):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        status = (await reader.readline()).split(b" ", 2)[1]
+        writer.close()
+        return int(status)
+
+    async def check(store, port):
+        return [await send(port, raw) for raw in (
+            b"GARBAGE\r\n\r\n",
+            b"POST /simulate HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+            b"POST /simulate HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+        )]
+
+    assert serve(check) == [400, 400, 400]
+
+
+def test_batcher_applies_backpressure():
+    def slow(items):
+        time.sleep(0.05)
+        return [i * 2 for i in items]
+
+    async def main():
+        batcher = MicroBatcher("slow", slow, max_batch=2, max_wait_s=0.0, max_queue=3)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(8)), return_exceptions=True)
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    rejected = [r for r in results if isinstance(r, Overloaded)]
+    assert rejected and batcher.stats.rejected == len(rejected)
+    assert [r for r in results if not isinstance(r, Exception)] == [2 * i for i, r in enumerate(results) if not isinstance(r, Exception)]
+    assert batcher.stats.max_size <= 2
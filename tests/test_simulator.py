@@ -1,5 +1,6 @@
 from __future__ import annotations
 import pandas as pd
+import pytest
 from src.data_models import SpeciesParams, RegionParams, Scenario
 from src.simulator import Simulator
 
@@ -33,3 +34,144 @@ def test_simulation_reasonable_outputs():
     assert (df["co2_kg_per_tree"].diff().fillna(0) >= -1e-6).all()
     # living trees should not increase over time
     assert (df["living_trees"].diff().fillna(0) <= 1e-6).all()
+
+
+def test_run_batch_matches_run():
+    sim = Simulator(species, regions)
+    scenarios_df = pd.DataFrame([
+        {"scenario": "a", "species": "Test", "region": "TestRegion", "trees_planted": 1000, "years": 20},
+        {"scenario": "b", "species": "Test", "region": "TestRegion", "trees_planted": 250, "years": 7},
+        {"scenario": "c", "species": "Test", "region": "TestRegion", "trees_planted": 1, "years": 1},
+    ])
+    batch = sim.run_batch(scenarios_df)
+    assert len(batch) == 21 + 8 + 2
+    for row in scenarios_df.to_dict(orient="records"):
+        expected = sim.run(Scenario(**row)).to_dataframe()
+        got = batch[batch["scenario"] == row["scenario"]].drop(columns="scenario").reset_index(drop=True)
+        pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False, rtol=1e-12)
+
+
+def test_simulation_output_columns_and_yearly_list():
+    import numpy as np
+    from src.data_models import SimulationOutput, YearlyResult
+    from src.growth_models import LogisticGrowth, annual_survival
+
+    sim = Simulator(species, regions)
+    sc = Scenario(scenario="test", species="Test", region="TestRegion", trees_planted=1000, years=10)
+    out = sim.run(sc)
+    # legacy list interface still yields pydantic rows matching the scalar model
+    growth = LogisticGrowth(K=100.0, r=0.5, t0=5.0)
+    assert len(out.yearly) == 11
+    for row in out.yearly:
+        assert isinstance(row, YearlyResult)
+        assert abs(row.living_trees - annual_survival(1000, row.year, 0.8, 0.05)) < 1e-9
+        assert abs(row.above_biomass_kg_per_tree - growth.biomass_at(row.year)) < 1e-9
+    # to_dataframe wraps the column arrays without copying
+    df = out.to_dataframe()
+    assert np.shares_memory(df["total_co2_tons"].to_numpy(), out.columns.total_co2_tons)
+    # constructing from a list of YearlyResult still works
+    rebuilt = SimulationOutput(scenario=sc, yearly=out.yearly)
+    pd.testing.assert_frame_equal(rebuilt.to_dataframe(), df)
+
+    # dumps keep the yearly list layout and round-trip through JSON
+    dumped = out.model_dump()
+    assert list(dumped) == ["scenario", "yearly"] and dumped["yearly"][3] == out.yearly[3].model_dump()
+    restored = SimulationOutput.model_validate_json(out.model_dump_json())
+    assert restored.scenario == sc
+    pd.testing.assert_frame_equal(restored.to_dataframe(), df)
+    monthly = sim.run(sc.model_copy(update={"steps_per_year": 12}))
+    pd.testing.assert_frame_equal(SimulationOutput.model_validate_json(monthly.model_dump_json()).to_dataframe(),
+                                  monthly.to_dataframe())
+
+
+def test_curve_cache_hits_extends_and_matches_uncached():
+    sim = Simulator(species, regions, cache_size=8)
+    small = sim.run(Scenario(scenario="a", species="Test", region="TestRegion", trees_planted=100, years=10)).to_dataframe()
+    sim.run(Scenario(scenario="b", species="Test", region="TestRegion", trees_planted=5000, years=10))
+    big = sim.run(Scenario(scenario="c", species="Test", region="TestRegion", trees_planted=100, years=30)).to_dataframe()
+    stats = sim.cache_stats()
+    assert stats["growth"] == {"hits": 1, "misses": 1, "extensions": 1, "evictions": 0, "size": 1}
+    assert stats["survival"]["extensions"] == 1
+    pd.testing.assert_frame_equal(big.iloc[:11], small)
+
+    scenarios_df = pd.DataFrame([
+        {"scenario": "x", "species": "Test", "region": "TestRegion", "trees_planted": 10, "years": 40},
+        {"scenario": "y", "species": "Test", "region": "TestRegion", "trees_planted": 20, "years": 3},
+    ])
+    uncached = Simulator(species, regions, cache_size=0).run_batch(scenarios_df)
+    pd.testing.assert_frame_equal(sim.run_batch(scenarios_df), uncached, rtol=1e-12)
+
+
+def test_planting_schedule_is_sum_of_shifted_cohorts():
+    import numpy as np
+
+    sim = Simulator(species, regions)
+    schedule = [100, 0, 250, 50]
+    portfolio = sim.run(Scenario(scenario="p", species="Test", region="TestRegion", planting_schedule=schedule, years=15))
+    assert portfolio.scenario.trees_planted == 400
+    expected = np.zeros(16)
+    living = np.zeros(16)
+    for k, n in enumerate(schedule):
+        if n:
+            single = sim.run(Scenario(scenario="c", species="Test", region="TestRegion", trees_planted=n, years=15 - k)).to_dataframe()
+            expected[k:] += single["total_co2_tons"].to_numpy()
+            living[k:] += single["living_trees"].to_numpy()
+    df = portfolio.to_dataframe()
+    assert np.allclose(df["total_co2_tons"], expected)
+    assert np.allclose(df["living_trees"], living)
+    assert np.allclose(df["co2_kg_per_tree"] * df["living_trees"] / 1000.0, expected)
+
+    # a one-entry schedule is the plain single cohort
+    single = sim.run(Scenario(scenario="s", species="Test", region="TestRegion", trees_planted=100, years=15)).to_dataframe()
+    one = sim.run(Scenario(scenario="o", species="Test", region="TestRegion", planting_schedule=[100], years=15)).to_dataframe()
+    pd.testing.assert_frame_equal(one, single, rtol=1e-12)
+
+
+def test_replanting_first_year_losses_adds_geometric_replacements():
+    import numpy as np
+    from src.growth_models import annual_survival
+
+    sim = Simulator(species, regions)
+    sc = Scenario(scenario="r", species="Test", region="TestRegion", planting_schedule=[1000], years=5, replant_first_year_losses=True)
+    df = sim.run(sc).to_dataframe()
+    # 1000 planted, 200 replaced in year 1, 40 in year 2, ...
+    planted = 1000 * 0.2 ** np.arange(6)
+    surv = np.array([annual_survival(1.0, y, 0.8, 0.05) for y in range(6)])
+    expected_living = [sum(planted[k] * surv[t - k] for k in range(t + 1)) for t in range(6)]
+    assert np.allclose(df["living_trees"], expected_living)
+
+
+def test_sub_annual_grid_matches_annual_at_whole_years():
+    import numpy as np
+    from src.growth_models import continuous_survival, survival_array
+
+    t = np.linspace(0, 30, 361)
+    s = continuous_survival(1.0, t, 0.8, 0.05)
+    assert (np.diff(s) <= 0).all()
+    whole = t == np.floor(t)
+    assert np.array_equal(s[whole], survival_array(1.0, t[whole].astype(int), 0.8, 0.05))
+    # constant hazard within the first year: half a year keeps sqrt(0.8)
+    assert s[6] == pytest.approx(0.8 ** 0.5)
+
+    sim = Simulator(species, regions)
+    annual = sim.run(Scenario(scenario="a", species="Test", region="TestRegion", trees_planted=1000, years=30)).to_dataframe()
+    monthly = sim.run(Scenario(scenario="m", species="Test", region="TestRegion", trees_planted=1000, years=30, steps_per_year=12)).to_dataframe()
+    assert len(monthly) == 30 * 12 + 1
+    assert monthly["year"].tolist() == list(np.arange(361) // 12)
+    on_year = monthly[monthly["t_years"] == monthly["year"]].drop(columns="t_years").reset_index(drop=True)
+    pd.testing.assert_frame_equal(on_year, annual)
+
+    scenarios_df = pd.DataFrame([
+        {"scenario": "m", "species": "Test", "region": "TestRegion", "trees_planted": 1000, "years": 30, "steps_per_year": 12},
+        {"scenario": "q", "species": "Test", "region": "TestRegion", "trees_planted": 10, "years": 5, "steps_per_year": 4},
+    ])
+    batch = sim.run_batch(scenarios_df)
+    assert len(batch) == 361 + 21
+    got = batch[batch["scenario"] == "m"].drop(columns="scenario").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[monthly.columns], monthly, rtol=1e-12)
+
+    # schedules plant each year's cohort at the first step of that year
+    sched = dict(scenario="p", species="Test", region="TestRegion", planting_schedule=[100, 0, 50], years=6)
+    yearly = sim.run(Scenario(**sched)).to_dataframe()
+    quarterly = sim.run(Scenario(**sched, steps_per_year=4)).to_dataframe()
+    np.testing.assert_allclose(quarterly["total_co2_tons"].to_numpy()[::4], yearly["total_co2_tons"], rtol=1e-12)
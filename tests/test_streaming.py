@@ -0,0 +1,75 @@
+from __future__ import annotations
+import pandas as pd
+import pytest
+from src.analysis import summarize_batch, summarize_results, summarize_simulation
+from src.data_models import SpeciesParams, RegionParams, Scenario, validate_frame
+from src.simulator import Simulator
+from src.streaming import run_streaming
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {"TestRegion": RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)}
+
+scenarios = pd.DataFrame({
+    "scenario": [f"s{i}" for i in range(5)],
+    "species": "Test",
+    "region": "TestRegion",
+    "trees_planted": [100, 200, 300, 400, 500],
+    "years": [3, 10, 20, 7, 1],
+})
+
+
+def test_validate_frame_reports_bad_rows():
+    bad = scenarios.astype({"trees_planted": float})
+    bad.loc[1, "years"] = 0
+    bad.loc[3, "trees_planted"] = 2.5
+    with pytest.raises(ValueError) as info:
+        validate_frame(Scenario, bad)
+    msg = str(info.value)
+    assert "years: must be >= 1 (rows [1])" in msg
+    assert "trees_planted: invalid int (rows [3])" in msg
+    assert validate_frame(Scenario, scenarios)["trees_planted"].dtype == "int64"
+
+
+def test_summarize_batch_matches_per_scenario_summary():
+    sim = Simulator(species, regions)
+    batch = summarize_batch(sim.run_batch(scenarios))
+    for i, row in enumerate(scenarios.to_dict(orient="records")):
+        single = summarize_simulation(sim.run(Scenario(**row)).to_dataframe())
+        got = batch.iloc[[i]].drop(columns="scenario").reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, single, check_dtype=False)
+
+
+def test_run_streaming_writes_partitioned_output(tmp_path):
+    src = tmp_path / "scenarios.csv"
+    scenarios.to_csv(src, index=False)
+    sim = Simulator(species, regions)
+    counts = run_streaming(sim, src, tmp_path / "out", chunksize=2, fmt="csv", rank=True)
+    assert counts["scenarios"] == 5
+    parts = sorted((tmp_path / "out" / "yearly").glob("part-*.csv"))
+    assert len(parts) == 3
+    yearly = pd.concat([pd.read_csv(p) for p in parts], ignore_index=True)
+    pd.testing.assert_frame_equal(yearly, sim.run_batch(scenarios), check_dtype=False)
+    summary = pd.concat([pd.read_csv(p) for p in sorted((tmp_path / "out" / "summary").glob("part-*.csv"))], ignore_index=True)
+    assert sorted(summary["scenario"]) == sorted(scenarios["scenario"]) and counts["summary"] == 5
+    rankings = pd.read_csv(tmp_path / "out" / "rankings" / "part-00000.csv")
+    assert rankings.set_index("scenario")["rank_final_co2"].idxmin() == summary.set_index("scenario")["final_total_co2_tons"].idxmax()
+
+
+def test_run_streaming_ranks_from_written_parts(tmp_path):
+    src = tmp_path / "scenarios.csv"
+    scenarios.to_csv(src, index=False)
+    sim = Simulator(species, regions)
+    expected = summarize_results(sim.run_batch(scenarios), stems_per_ha=400)
+    expected = expected.set_index("scenario")[["rank_final_co2", "rank_avg_rate"]]
+    for fmt in ("csv", "parquet"):
+        run_streaming(sim, src, tmp_path / fmt, chunksize=2, fmt=fmt, stems_per_ha=400, rank=True)
+        path = tmp_path / fmt / "rankings" / f"part-00000.{fmt}"
+        rankings = pd.read_csv(path) if fmt == "csv" else pd.read_parquet(path)
+        pd.testing.assert_frame_equal(rankings.set_index("scenario").loc[expected.index], expected)
+
+
+def test_run_streaming_ranks_only_on_request(tmp_path):
+    src = tmp_path / "scenarios.csv"
+    scenarios.to_csv(src, index=False)
+    run_streaming(Simulator(species, regions), src, tmp_path / "out", chunksize=2, fmt="csv")
+    assert (tmp_path / "out" / "summary").exists() and not (tmp_path / "out" / "rankings").exists()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import numpy as np
+import pytest
+from src.data_models import SpeciesParams, RegionParams, Scenario
+from src.simulator import Simulator
+from src.uncertainty import MonteCarloConfig, ParamDistribution, StreamingQuantiles
+
+species = {"Test": SpeciesParams(species="Test", K_biomass_kg=100.0, r_growth=0.5, t0_inflection=5.0, carbon_fraction=0.47, root_shoot_ratio=0.3)}
+regions = {"TestRegion": RegionParams(region="TestRegion", survival_rate_year1=0.8, annual_mortality_rate=0.05, climate_factor=1.0)}
+sc = Scenario(scenario="test", species="Test", region="TestRegion", trees_planted=1000, years=20)
+
+
+def test_streaming_quantiles_close_to_exact():
+    rng = np.random.default_rng(0)
+    est = StreamingQuantiles(2, n_bins=4096)
+    chunks = [rng.normal(i, 1.0 + i, size=(2000, 2)) * [1.0, 100.0] for i in range(10)]
+    for c in chunks:
+        est.update(c)
+    data = np.vstack(chunks)
+    spread = data.max(axis=0) - data.min(axis=0)
+    for q in (0.1, 0.5, 0.9):
+        assert np.all(np.abs(est.quantile(q) - np.quantile(data, q, axis=0)) <= 4 * spread / 4096)
+    assert np.allclose(est.mean(), data.mean(axis=0))
+
+
+def test_monte_carlo_degenerate_matches_deterministic_run():
+    sim = Simulator(species, regions)
+    out = sim.run_monte_carlo(sc, MonteCarloConfig(n_draws=100, chunk_size=30, seed=0, binomial_mortality=False))
+    det = sim.run(sc).to_dataframe()
+    mc = out.to_dataframe()
+    assert np.allclose(mc["total_co2_tons_mean"], det["total_co2_tons"])
+    assert np.allclose(mc["total_co2_tons_p50"], det["total_co2_tons"])
+
+
+def test_monte_carlo_reproducible_and_ordered():
+    sim = Simulator(species, regions)
+    cfg = MonteCarloConfig(
+        n_draws=5000, chunk_size=1000, seed=42,
+        r_growth=ParamDistribution("lognormal", spread=0.2),
+        K_biomass_kg=ParamDistribution("normal", spread=0.1),
+        climate_factor=ParamDistribution("uniform", low=0.9, high=1.1),
+    )
+    a = sim.run_monte_carlo(sc, cfg).to_dataframe()
+    b = sim.run_monte_carlo(sc, cfg).to_dataframe()
+    assert a.equals(b)
+    assert (a["total_co2_tons_p10"] <= a["total_co2_tons_p50"]).all()
+    assert (a["total_co2_tons_p50"] <= a["total_co2_tons_p90"]).all()
+    # binomial mortality keeps whole trees and never exceeds the planted count
+    assert (a["living_trees_p90"] <= 1000).all()
+    det = sim.run(sc).to_dataframe()
+    assert abs(a["living_trees_mean"].iloc[-1] - det["living_trees"].iloc[-1]) < 5
+
+
+def test_monte_carlo_rejects_planting_schedule():
+    staged = sc.model_copy(update={"planting_schedule": [600, 400]})
+    with pytest.raises(ValueError, match="planting_schedule"):
+        Simulator(species, regions).run_monte_carlo(staged, MonteCarloConfig(n_draws=10))